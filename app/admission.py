@@ -0,0 +1,186 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Admission control for live interview sessions.
+
+Each admitted websocket holds a Gemini live session, so the number of
+concurrent sessions is capped. Connections above the cap wait in a bounded
+FIFO queue and receive their position and estimated wait over the usual
+``{"status": ...}`` channel; when the queue is full, or a user opens sessions
+too fast, the connection is refused right away instead of degrading every
+running interview.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", "40"))
+MAX_QUEUED_SESSIONS = int(os.getenv("MAX_QUEUED_SESSIONS", "20"))
+MAX_QUEUE_WAIT_SECONDS = float(os.getenv("MAX_QUEUE_WAIT_SECONDS", "120"))
+USER_SESSIONS_PER_MINUTE = float(os.getenv("USER_SESSIONS_PER_MINUTE", "6"))
+# Interval between queue position updates sent to waiting clients
+STATUS_INTERVAL_SECONDS = 5.0
+# Initial guess for the session duration used in wait estimates
+DEFAULT_SESSION_SECONDS = 600.0
+# Maximum number of users tracked by the rate limiter
+MAX_TRACKED_USERS = 10_000
+
+StatusCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class AdmissionRejected(Exception):
+    """Raised when a session cannot be admitted."""
+
+
+class AdmissionController:
+    """Limits concurrent sessions with a waiting queue and per-user rate limits."""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_SESSIONS,
+        max_queued: int = MAX_QUEUED_SESSIONS,
+        max_wait: float = MAX_QUEUE_WAIT_SECONDS,
+        user_sessions_per_minute: float = USER_SESSIONS_PER_MINUTE,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            max_concurrent: Maximum number of sessions running at the same time.
+            max_queued: Maximum number of sessions waiting for a slot.
+            max_wait: Seconds a session may wait in the queue before being refused.
+            user_sessions_per_minute: Sessions a single user may open per minute.
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.user_rate = user_sessions_per_minute / 60
+        self.user_burst = max(user_sessions_per_minute, 1.0)
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        # user key -> (tokens, last refill time)
+        self._user_buckets: dict[str, tuple[float, float]] = {}
+        self._avg_session_seconds = DEFAULT_SESSION_SECONDS
+
+    @property
+    def queued(self) -> int:
+        """Number of sessions waiting for a slot."""
+        return len(self._waiters)
+
+    def estimated_wait(self, position: int) -> float:
+        """Estimate the seconds until the session at ``position`` is admitted."""
+        return position * self._avg_session_seconds / max(self.max_concurrent, 1)
+
+    def _check_rate_limit(self, user_key: str) -> None:
+        now = time.monotonic()
+        tokens, last = self._user_buckets.pop(user_key, (self.user_burst, now))
+        tokens = min(self.user_burst, tokens + (now - last) * self.user_rate)
+        if tokens < 1:
+            self._user_buckets[user_key] = (tokens, now)
+            raise AdmissionRejected(
+                "Too many sessions started, please wait a minute and try again."
+            )
+        # Re-inserting keeps the dict ordered by last use, oldest first
+        self._user_buckets[user_key] = (tokens - 1, now)
+        if len(self._user_buckets) > MAX_TRACKED_USERS:
+            del self._user_buckets[next(iter(self._user_buckets))]
+
+    async def _wait_for_slot(self, on_status: StatusCallback) -> None:
+        if len(self._waiters) >= self.max_queued:
+            raise AdmissionRejected("Server is at capacity, please try again later.")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        deadline = time.monotonic() + self.max_wait
+        try:
+            while True:
+                position = self._waiters.index(waiter) + 1
+                eta = self.estimated_wait(position)
+                await on_status(
+                    {
+                        "status": f"Server is busy, you are number {position} in "
+                        f"the queue (estimated wait {eta:.0f} seconds)",
+                        "queue_position": position,
+                        "eta_seconds": round(eta),
+                    }
+                )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdmissionRejected(
+                        "Server is at capacity, please try again later."
+                    )
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(waiter),
+                        timeout=min(STATUS_INTERVAL_SECONDS, remaining),
+                    )
+                    return
+                except asyncio.TimeoutError:
+                    continue
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before we gave up, pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot over directly, so newcomers cannot jump the queue
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(
+        self, user_key: str, on_status: StatusCallback
+    ) -> AsyncIterator[None]:
+        """Hold a session slot for the duration of the context.
+
+        Args:
+            user_key: Identifier used for per-user rate limiting.
+            on_status: Coroutine used to send status messages to the client.
+
+        Raises:
+            AdmissionRejected: If the user is rate limited, the queue is full or
+                the wait exceeded the configured maximum.
+        """
+        self._check_rate_limit(user_key)
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+        else:
+            await self._wait_for_slot(on_status)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started
+            self._avg_session_seconds = 0.9 * self._avg_session_seconds + 0.1 * duration
+            self._release_slot()
+            logging.info(
+                f"Session finished after {duration:.0f}s "
+                f"(active={self.active}, queued={self.queued})"
+            )
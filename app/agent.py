@@ -12,29 +12,52 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import logging
 import os
+from functools import lru_cache
+from typing import Any
 
 import google
 import vertexai
 from google import genai
 from google.genai.types import (
     Content,
-    FunctionDeclaration,
     LiveConnectConfig,
-    Tool,
-    Schema
+    PrebuiltVoiceConfig,
+    SpeechConfig,
+    VoiceConfig,
 )
-from langchain_google_vertexai import VertexAIEmbeddings
 
-from app.templates import FORMAT_DOCS, SYSTEM_INSTRUCTION
-from app.vector_store import get_vector_store
-from app.interview_agent import InterviewAgent
+from app.answer_evaluator import BatchEvaluator
+from app.embeddings import EMBEDDING_BACKEND, get_embedding
+from app.interview_agent import InterviewAgent, get_default_model
+from app.observations import ObservationBuffer
+from app.state_store import STATE_TTL_SECONDS, current_run_id, get_state_store
+from app.templates import (
+    DEFAULT_CV,
+    DEFAULT_JOB_OFFER,
+    DEFAULT_LANGUAGE,
+    FORMAT_DOCS,
+    SYSTEM_INSTRUCTION,
+    system_instruction,
+)
+from app.tools import ToolRegistry, ToolSet
+from app.transcript_store import TranscriptStore
+from app.vector_store import (
+    DEFAULT_CORPUS,
+    VectorStoreManager,
+    current_corpus_id,
+    default_persist_path,
+    load_corpora,
+)
 
 # Constants
 VERTEXAI = os.getenv("VERTEXAI", "true").lower() == "true"
 LOCATION = "us-central1"
-EMBEDDING_MODEL = "text-embedding-004"
 MODEL_ID = "gemini-2.0-flash-001"
+# Longest CV or job offer accepted from a client setup message
+MAX_CANDIDATE_CHARS = 20_000
 URLS = [
     "https://cloud.google.com/architecture/deploy-operate-generative-ai-applications"
 ]
@@ -50,14 +73,173 @@ else:
     # API key should be set using GOOGLE_API_KEY environment variable
     genai_client = genai.Client(http_options={"api_version": "v1alpha"})
 
-# Initialize vector store and retriever
-embedding = VertexAIEmbeddings(model_name=EMBEDDING_MODEL)
-vector_store = get_vector_store(embedding=embedding, urls=URLS)
-retriever = vector_store.as_retriever()
+# Vector stores of the retrieval corpora, loaded on first query and shared by
+# every session
+vector_stores = VectorStoreManager(
+    load_corpora(URLS),
+    embedding_factory=get_embedding,
+    persist_root=default_persist_path(EMBEDDING_BACKEND),
+)
+# The default corpus is loaded upfront so the first session does not wait
+vector_stores.get(DEFAULT_CORPUS)
+
+# Interview state lives in a shared store so any worker can serve any session
+state_store = get_state_store()
+# Scores the answers of every session of the worker in batched model calls
+answer_evaluator = BatchEvaluator(get_default_model())
+# Transcripts of every interview, searchable by recruiters
+transcript_store = TranscriptStore()
+# Worker-local cache of agents, keyed by run id, with the store version they hold
+_interview_agents: dict[str, tuple[InterviewAgent, int]] = {}
+# Worker-local locks serializing async tool calls of the same session
+_run_locks: dict[str, asyncio.Lock] = {}
+
+
+def _interview_key(run_id: str) -> str:
+    return f"interview:{run_id}"
+
+
+def get_interview_agent(run_id: str) -> InterviewAgent:
+    """Return the interview agent for a session, synced with the shared store.
+
+    The agent is cached in this worker and only reloaded when another worker
+    saved a newer version of the session state.
+
+    Args:
+        run_id: Identifier of the interview session.
+
+    Returns:
+        The session's InterviewAgent.
+    """
+    agent, version = _interview_agents.get(run_id, (None, 0))
+    if agent is None:
+        agent = InterviewAgent(evaluador=answer_evaluator)
+        agent.thread_id = f"interview_thread_{run_id}"
+    stored = state_store.get(_interview_key(run_id))
+    if stored is not None and stored["version"] != version:
+        agent.load_dict(stored["agent"])
+        version = stored["version"]
+    _interview_agents[run_id] = (agent, version)
+    return agent
+
+
+def save_interview_agent(run_id: str, agent: InterviewAgent) -> None:
+    """Persist the agent state to the shared store as a new version."""
+    _, version = _interview_agents.get(run_id, (agent, 0))
+    stored = state_store.get(_interview_key(run_id))
+    version = max(version, stored["version"] if stored else 0) + 1
+    state_store.set(
+        _interview_key(run_id),
+        {"version": version, "agent": agent.to_dict()},
+        ttl=STATE_TTL_SECONDS,
+    )
+    _interview_agents[run_id] = (agent, version)
+
+
+def load_interview_turn(run_id: str) -> tuple[InterviewAgent, int]:
+    """Load a session's agent and observations for a turn.
+
+    Returns:
+        The agent and the store version it was loaded from, to commit the
+        turn against with ``commit_interview_turn``.
+    """
+    agent = get_interview_agent(run_id)
+    agent.observaciones = load_observations(run_id)
+    return agent, _interview_agents[run_id][1]
+
+
+def commit_interview_turn(run_id: str, agent: InterviewAgent, version: int) -> bool:
+    """Save a turn unless another worker saved the session since it loaded.
+
+    The store lock is only held for the version check and the write, never
+    while the turn runs.
+
+    Returns:
+        Whether the turn was saved. If not, the worker-local agent is dropped
+        so the next turn reloads the state the other worker saved.
+    """
+    with state_store.lock(_interview_key(run_id)):
+        stored = state_store.get(_interview_key(run_id))
+        if (stored["version"] if stored else 0) == version:
+            save_interview_agent(run_id, agent)
+            return True
+    _interview_agents.pop(run_id, None)
+    agent.cancelar_evaluaciones()
+    return False
+
+
+def _observations_key(run_id: str) -> str:
+    return f"nervous:{run_id}"
+
+
+def load_observations(run_id: str) -> ObservationBuffer:
+    """Return the bounded buffer of behaviour observations for a session."""
+    stored = state_store.get(_observations_key(run_id))
+    if stored is None:
+        return ObservationBuffer()
+    return ObservationBuffer.from_dict(stored)
+
+
+def checkpoint_interview_agent(run_id: str) -> None:
+    """Make sure the shared store holds a session's latest state.
+
+    Called before this worker shuts down. Turns are saved as they complete,
+    so this only rewrites the worker-local agent when the store lost it or
+    holds an older version. A turn still running is not saved halfway: the
+    store keeps the state from before it, and the client repeats the answer
+    after reconnecting.
+    """
+    agent, version = _interview_agents.get(run_id, (None, 0))
+    run_lock = _run_locks.get(run_id)
+    if agent is None or (run_lock is not None and run_lock.locked()):
+        return
+    with state_store.lock(_interview_key(run_id)):
+        stored = state_store.get(_interview_key(run_id))
+        if stored is None or stored["version"] < version:
+            save_interview_agent(run_id, agent)
+
+
+def record_transcript(run_id: str, agent: InterviewAgent) -> None:
+    """Append a session's latest turns to its transcript.
+
+    A transcript that cannot be written is logged, not raised, so it never
+    interrupts the interview.
+    """
+    try:
+        agent.guardar_transcripcion(transcript_store, run_id)
+    except Exception as e:
+        logging.error(f"Could not record the transcript of {run_id}: {e!s}")
+
+
+def release_interview_agent(run_id: str) -> None:
+    """Drop the worker-local copy of a session. The shared state is kept.
+
+    Scores still pending for it are cancelled; the report scores any answer
+    left without one.
+    """
+    agent, _ = _interview_agents.pop(run_id, (None, 0))
+    if agent is not None:
+        agent.cancelar_evaluaciones()
+    _run_locks.pop(run_id, None)
+
+
+def _session_vector_store() -> Any:
+    """Vector store of the current session's corpus, or the default one."""
+    corpus_id = current_corpus_id.get()
+    if corpus_id not in vector_stores:
+        corpus_id = DEFAULT_CORPUS
+    return vector_stores.get(corpus_id)
+
 
-# Crear una instancia global del agente entrevistador
-interview_agent = InterviewAgent()
+# Tools the live model can call; declarations are built once from the
+# handlers' docstrings
+tool_registry = ToolRegistry(vertexai=VERTEXAI)
+# Seconds the model waits for a tool before getting an error instead
+RETRIEVE_DOCS_TIMEOUT_SECONDS = 10.0
+INTERVIEW_TOOL_TIMEOUT_SECONDS = 60.0
 
+
+@tool_registry.register(blocking=True, timeout=RETRIEVE_DOCS_TIMEOUT_SECONDS)
 def retrieve_docs(query: str) -> dict[str, str]:
     """
     Retrieves pre-formatted documents about MLOps (Machine Learning Operations),
@@ -69,19 +251,12 @@ def retrieve_docs(query: str) -> dict[str, str]:
     Returns:
         A set of relevant, pre-formatted documents.
     """
-    docs = retriever.invoke(query)
+    docs = _session_vector_store().as_retriever().invoke(query)
     formatted_docs = FORMAT_DOCS.format(docs=docs)
     return {"output": formatted_docs}
 
 
-# Configure tools and live connection
-retrieve_docs_tool = Tool(
-    function_declarations=[
-        FunctionDeclaration.from_callable(client=genai_client, callable=retrieve_docs)
-    ]
-)
-
-
+@tool_registry.register
 def developer_interview_python(anwser: str) -> dict[str, str]:
     """
     Asistente .
@@ -97,13 +272,7 @@ def developer_interview_python(anwser: str) -> dict[str, str]:
     return {"question": "¿Cual es tu experiencia en FastAPI?, ¿Cual es tu experiencia en SQLAlchemy?"}
 
 
-# Add the developer interview tool
-developer_interview_tool_python = Tool(
-    function_declarations=[
-        FunctionDeclaration.from_callable(client=genai_client, callable=developer_interview_python)
-    ]
-)
-
+@tool_registry.register
 def developer_interview_company(anwser: str) -> dict[str, str]:
     """
     Asistente .
@@ -118,27 +287,38 @@ def developer_interview_company(anwser: str) -> dict[str, str]:
     print(anwser)
     return {"question": "El horario de trabajo es de 9 a 18, con un horario de almuerzo de 1 hora. El salario es de 40.000€ brutos anuales. Hay tickets restaurante y de transporte."}
 
-nervous_data = []
 
+@tool_registry.register(blocking=True)
 def developer_interview_nervous(anwser: str) -> dict[str, str]:
     """
-    Asistente .
+    Herramienta para anotar si el candidato parece nervioso o puede estar
+    mintiendo sobre su experiencia. Las observaciones se incluyen en el
+    informe final.
 
     Args:
-        anwser: user answer.
+        anwser: Observación sobre el comportamiento del candidato.
 
     Returns:
-        response to the user
+        Confirmación de que la observación se ha guardado.
     """
     print("SE LLAMA !!!!!!!!!!!!!!!!!!")
-    print(anwser)   
-    nervous_data.append(anwser)
-    print(nervous_data)
+    print(anwser)
+    run_id = current_run_id.get()
+    # Buffer and aggregates are bounded, so this costs the same on every call
+    with state_store.lock(_observations_key(run_id)):
+        observations = load_observations(run_id)
+        observations.record(anwser)
+        state_store.set(
+            _observations_key(run_id), observations.to_dict(), ttl=STATE_TTL_SECONDS
+        )
     return {"question": "OK"}
 
-def developer_interview(anwser: str) -> dict[str, str]:
+
+@tool_registry.register(timeout=INTERVIEW_TOOL_TIMEOUT_SECONDS)
+async def developer_interview(anwser: str) -> dict[str, str]:
     """
-    Asistente que maneja la entrevista de desarrollo.
+    Herramienta para obtener la siguiente pregunta de la entrevista. Tienes que
+    indicar siempre que es lo que ha dicho el usuario.
 
     Args:
         anwser: Respuesta del usuario.
@@ -146,103 +326,98 @@ def developer_interview(anwser: str) -> dict[str, str]:
     Returns:
         Siguiente pregunta o informe final de la entrevista.
     """
-
-
-    response = interview_agent.process_response(anwser)
+    run_id = current_run_id.get()
+    # The asyncio lock serializes the session's calls within this worker.
+    # Across workers the turn is committed with a version check, so the store
+    # lock is only held briefly and never across the model calls
+    async with _run_locks.setdefault(run_id, asyncio.Lock()):
+        interview_agent, version = await asyncio.to_thread(load_interview_turn, run_id)
+        response = await interview_agent.aprocess_response(anwser)
+        if not await asyncio.to_thread(
+            commit_interview_turn, run_id, interview_agent, version
+        ):
+            # Another worker answered this turn first; continue from its state
+            logging.warning(f"Turn of {run_id} lost a race with another worker")
+            interview_agent, _ = await asyncio.to_thread(load_interview_turn, run_id)
+            response = interview_agent.pregunta_actual()
+        await asyncio.to_thread(record_transcript, run_id, interview_agent)
     print(f"response: {response}")
     return response
 
 
-# Add the developer interview tool
-# developer_interview_tool = Tool(
-#     function_declarations=[
-#         FunctionDeclaration.from_callable(client=genai_client, callable=developer_interview_company),
-#         FunctionDeclaration.from_callable(client=genai_client, callable=developer_interview_python)
-#     ]
-# )
-
-developer_interview_tool = Tool(
-    function_declarations=[
-        FunctionDeclaration(
-            name="developer_interview",
-            description="Herramienta para obtener la siguiente pregunta de la entrevista. Tienes que indicar siempre que es lo que ha dicho el usuario",
-            parameters=Schema(
-                type="object",
-                properties={"anwser": {"type": "string", "description": "Respuesta del usuario"}}
-            ),
-            response=Schema(
-                type="object",
-                properties={"question": {"type": "string", "description": "Pregunta para la entrevista"}}
-            )
-        ), 
-        # FunctionDeclaration(
-        #     name="developer_interview_nervous",
-        #     description="Herramienta para obtener la siguiente pregunta de la entrevista. Tienes que indicar siempre que es lo que ha dicho el usuario",
-        #     parameters=Schema(
-        #         type="object",
-        #         properties={"anwser": {"type": "string", "description": "Respuesta del usuario"}}
-        #     ),
-        #     response=Schema(
-        #         type="object",
-        #         properties={"question": {"type": "string", "description": "Pregunta para la entrevista"}}
-        #     )
-        # ), 
-        # FunctionDeclaration(
-        #     name="developer_interview_company",
-        #     description="Herramienta para obtener la siguiente pregunta de la entrevista. Tienes que indicar siempre que es lo que ha dicho el usuario",
-        #     parameters=Schema(
-        #         type="object",
-        #         properties={"anwser": {"type": "string", "description": "Respuesta del usuario"}}
-        #     ),
-        #     response=Schema(
-        #         type="object",
-        #         properties={"question": {"type": "string", "description": "Pregunta para la entrevista"}}
-        #     )
-        # ),
-        # FunctionDeclaration(
-        #     name="developer_interview_python",
-        #     description="Herramienta para obtener la siguiente pregunta de la entrevista. Tienes que indicar siempre que es lo que ha dicho el usuario",
-        #     parameters=Schema(
-        #         type="object",
-        #         properties={"anwser": {"type": "string", "description": "Respuesta del usuario"}}
-        #     ),
-        #     response=Schema(
-        #         type="object",
-        #         properties={"question": {"type": "string", "description": "Pregunta para la entrevista"}}
-        #     )
-        # )
-    ]
+# Tools of each interview role, chosen with the setup's "role"
+DEFAULT_ROLE = "developer"
+ROLE_TOOLS = {
+    DEFAULT_ROLE: ("developer_interview", "developer_interview_nervous"),
+    # Grounds technical follow-ups on the retrieval corpus
+    "mlops": ("developer_interview", "developer_interview_nervous", "retrieve_docs"),
+}
+role_tool_sets = tool_registry.tool_sets(ROLE_TOOLS)
+tool_functions = role_tool_sets[DEFAULT_ROLE].functions
+
+live_connect_config = LiveConnectConfig(
+    response_modalities=["AUDIO"],
+    tools=role_tool_sets[DEFAULT_ROLE].tools,
+    system_instruction=Content(parts=[{"text": SYSTEM_INSTRUCTION}]),
 )
+# Config of each role, so a session only copies it to set its candidate
+_role_live_configs = {
+    role: live_connect_config.model_copy(update={"tools": tool_set.tools})
+    for role, tool_set in role_tool_sets.items()
+}
 
 
+def get_tool_set(setup: dict[str, Any] | None) -> ToolSet:
+    """Tools of the role requested in a session's setup, or the default ones."""
+    role = (setup or {}).get("role") or DEFAULT_ROLE
+    return role_tool_sets.get(role, role_tool_sets[DEFAULT_ROLE])
 
-def retrieve_docs(query: str) -> dict[str, str]:
-    """
-    Retrieves pre-formatted documents about MLOps (Machine Learning Operations),
-      Gen AI lifecycle, and production deployment best practices.
 
-    Args:
-        query: Search query string related to MLOps, Gen AI, or production deployment.
+def get_tool_functions(setup: dict[str, Any] | None) -> dict[str, Any]:
+    """Callables of the tools a session's live model is given."""
+    return get_tool_set(setup).functions
 
-    Returns:
-        A set of relevant, pre-formatted documents.
-    """
-    docs = retriever.invoke(query)
-    formatted_docs = FORMAT_DOCS.format(docs=docs)
-    return {"output": formatted_docs}
 
+@lru_cache(maxsize=256)
+def _candidate_system_instruction(cv: str, job_offer: str, language: str) -> Content:
+    return Content(parts=[{"text": system_instruction(cv, job_offer, language)}])
 
 
-tool_functions = {
-    # "retrieve_docs": retrieve_docs,
-    # "developer_interview_python": developer_interview_python,
-    # "developer_interview_company": developer_interview_company,
-    # "developer_interview_nervous": developer_interview_nervous,
-    "developer_interview": developer_interview
-}
+@lru_cache(maxsize=32)
+def _speech_config(voice: str) -> SpeechConfig:
+    return SpeechConfig(
+        voice_config=VoiceConfig(
+            prebuilt_voice_config=PrebuiltVoiceConfig(voice_name=voice)
+        )
+    )
 
-live_connect_config = LiveConnectConfig(
-    response_modalities=["AUDIO"],
-    tools=[developer_interview_tool],
-    system_instruction=Content(parts=[{"text": SYSTEM_INSTRUCTION}]),
-)
+
+def get_live_connect_config(setup: dict[str, Any] | None) -> LiveConnectConfig:
+    """Build the live connection config for a session's candidate and offer.
+
+    Only the tools of the role and the candidate section of the system
+    instruction change between sessions, so this is at most a shallow copy
+    of the role's precomputed config.
+
+    Args:
+        setup: The client's setup message, which may carry ``cv``,
+            ``job_offer``, ``language``, ``role`` and ``voice``.
+
+    Returns:
+        The config to open the Gemini live session with.
+    """
+    setup = setup or {}
+    role = setup.get("role") or DEFAULT_ROLE
+    config = _role_live_configs.get(role, live_connect_config)
+    cv = str(setup.get("cv") or DEFAULT_CV)[:MAX_CANDIDATE_CHARS]
+    job_offer = str(setup.get("job_offer") or DEFAULT_JOB_OFFER)[:MAX_CANDIDATE_CHARS]
+    language = str(setup.get("language") or DEFAULT_LANGUAGE)[:50]
+    update: dict[str, Any] = {}
+    if (cv, job_offer, language) != (DEFAULT_CV, DEFAULT_JOB_OFFER, DEFAULT_LANGUAGE):
+        update["system_instruction"] = _candidate_system_instruction(
+            cv, job_offer, language
+        )
+    if setup.get("voice"):
+        # Prebuilt voice name, e.g. "Puck"; also keys the canned prompt audio
+        update["speech_config"] = _speech_config(str(setup["voice"]))
+    return config.model_copy(update=update) if update else config
@@ -0,0 +1,348 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of the model's audio for the fixed interview prompts.
+
+The scripted questions and the tool's status messages are the same text in
+every interview, yet the live model synthesizes them again in each session.
+The first time a session needs one, a dedicated live session whose only
+instruction is to read the text aloud generates its audio in the background,
+stored under a hash of the text, voice and language. Candidate sessions never
+feed the cache, since their model turns can add remarks about the candidate.
+Later sessions stream the stored audio to the client as soon as the tool
+returns the text, instead of waiting for the model to speak it.
+
+Each prompt is stored as one compact file: a small header with the sample
+rate, followed by the raw PCM. No base64 or per-frame JSON is kept. Files
+live in ``AUDIO_CACHE_DIR``, so they survive restarts and are shared by
+workers on the same disk, and the least recently used ones are evicted
+beyond ``AUDIO_CACHE_MAX_MB``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from google.genai.types import (
+    Content,
+    LiveConnectConfig,
+    PrebuiltVoiceConfig,
+    SpeechConfig,
+    VoiceConfig,
+)
+
+from app.relay_protocol import model_audio
+from app.templates import DEFAULT_LANGUAGE, PROMPT_READER_INSTRUCTION
+
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", ".audio_cache")
+AUDIO_CACHE_MAX_MB = float(os.getenv("AUDIO_CACHE_MAX_MB", "64"))
+# Voice of sessions that do not choose one
+DEFAULT_VOICE = "default"
+# 200 ms of 24 kHz 16-bit mono audio per frame sent to the client
+CHUNK_BYTES = 9600
+SUFFIX = ".pcm"
+# Prompt audio generated at once, and how long one may take
+MAX_CONCURRENT_SYNTHESIS = int(os.getenv("AUDIO_SYNTHESIS_CONCURRENCY", "2"))
+SYNTHESIS_TIMEOUT_SECONDS = 30.0
+
+_MAGIC = b"CAUD"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")
+
+
+@dataclass(frozen=True, slots=True)
+class CannedAudio:
+    """Audio of a prompt as spoken by the model."""
+
+    sample_rate: int
+    pcm: bytes
+
+    def chunks(self, size: int = CHUNK_BYTES) -> Iterator[bytes]:
+        """Split the audio in frames of at most ``size`` bytes."""
+        # Whole 16-bit samples per frame
+        size -= size % 2
+        for start in range(0, len(self.pcm), size):
+            yield self.pcm[start : start + size]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the audio in the on-disk format."""
+        return _HEADER.pack(_MAGIC, _VERSION, self.sample_rate) + self.pcm
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CannedAudio":
+        """Rebuild audio serialized with ``to_bytes``.
+
+        Raises:
+            ValueError: If the data is not canned audio.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Truncated canned audio")
+        magic, version, sample_rate = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not canned audio")
+        return cls(sample_rate, data[_HEADER.size :])
+
+
+class AudioCapture:
+    """Collects the audio of a model turn."""
+
+    def __init__(self) -> None:
+        self.sample_rate: int | None = None
+        self._pcm: list[bytes] = []
+        # Audio at several rates cannot be stored as a single prompt
+        self.valid = True
+
+    def add(self, message: dict) -> None:
+        """Add the model audio of a Gemini server message."""
+        for sample_rate, pcm in model_audio(message):
+            if self.sample_rate is None:
+                self.sample_rate = sample_rate
+            elif sample_rate != self.sample_rate:
+                self.valid = False
+            self._pcm.append(pcm)
+
+    def audio(self) -> CannedAudio | None:
+        """The captured audio, or None if there is nothing to store."""
+        if not self.valid or self.sample_rate is None:
+            return None
+        return CannedAudio(self.sample_rate, b"".join(self._pcm))
+
+
+class AudioCache:
+    """Bounded LRU store of prompt audio, in memory and optionally on disk."""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = int(AUDIO_CACHE_MAX_MB * 1024 * 1024),
+    ) -> None:
+        """Create a cache.
+
+        Args:
+            directory: Directory the audio is stored in. Without one, the
+                cache is kept in memory only.
+            max_bytes: Maximum size of the stored audio.
+        """
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        # Size of each entry, and its audio once loaded (None until then)
+        self._entries: OrderedDict[str, tuple[int, CannedAudio | None]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            paths = sorted(
+                self.directory.glob(f"*{SUFFIX}"), key=lambda p: p.stat().st_mtime
+            )
+            for path in paths:
+                size = path.stat().st_size
+                self._entries[path.stem] = (size, None)
+                self._bytes += size
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the stored audio."""
+        return self._bytes
+
+    @staticmethod
+    def key(text: str, voice: str = DEFAULT_VOICE, language: str = "") -> str:
+        """Hash a prompt and the voice and language it is spoken in."""
+        data = json.dumps([text.strip(), voice, language], ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> CannedAudio | None:
+        """Return the audio stored under ``key``, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.directory is not None:
+            # Possibly stored by another worker sharing the directory
+            try:
+                entry = (self._path(key).stat().st_size, None)
+            except OSError:
+                pass
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        size, audio = entry
+        if audio is None:
+            try:
+                audio = CannedAudio.from_bytes(self._path(key).read_bytes())
+            except (OSError, ValueError) as e:
+                # Evicted by another worker sharing the directory, or corrupt
+                logging.debug(f"Could not load canned audio {key}: {e}")
+                with self._lock:
+                    if self._entries.pop(key, None) is not None:
+                        self._bytes -= size
+                    self.misses += 1
+                return None
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[0]
+                self._entries[key] = (size, audio)
+                self._bytes += size
+                self._evict()
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def put(self, key: str, audio: CannedAudio) -> None:
+        """Store the audio of a prompt, evicting the least recently used."""
+        data = audio.to_bytes()
+        if len(data) > self.max_bytes:
+            return
+        if self.directory is not None:
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                logging.warning(f"Could not store canned audio {key}: {e!s}")
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0]
+            self._entries[key] = (len(data), audio)
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            key, (size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            if self.directory is not None:
+                self._path(key).unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=1)
+def get_audio_cache() -> AudioCache:
+    """Audio cache shared by every session of the process."""
+    return AudioCache(AUDIO_CACHE_DIR or None)
+
+
+class PromptSynthesizer:
+    """Generates the audio of fixed prompts in prompt-only live sessions."""
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        cache: AudioCache,
+        max_concurrent: int = MAX_CONCURRENT_SYNTHESIS,
+    ) -> None:
+        """Create a synthesizer.
+
+        Args:
+            client: The google-genai client the live sessions are opened with
+            model: The live model, the same the interviews speak with
+            cache: Cache the generated audio is stored in
+            max_concurrent: Prompt-only sessions open at once
+        """
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Keys being generated, so a prompt is only requested once
+        self._pending: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def request(
+        self, text: str, voice: str = DEFAULT_VOICE, language: str = DEFAULT_LANGUAGE
+    ) -> None:
+        """Generate and store the audio of a prompt in the background."""
+        key = self.cache.key(text, voice, language)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        task = asyncio.create_task(self._store(key, text, voice, language))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _store(self, key: str, text: str, voice: str, language: str) -> None:
+        try:
+            async with self._semaphore:
+                audio = await asyncio.wait_for(
+                    self.synthesize(text, voice, language),
+                    timeout=SYNTHESIS_TIMEOUT_SECONDS,
+                )
+            if audio is not None and audio.pcm:
+                await asyncio.to_thread(self.cache.put, key, audio)
+        except Exception as e:
+            logging.warning(f"Could not generate prompt audio {key}: {e!s}")
+        finally:
+            self._pending.discard(key)
+
+    def _config(self, voice: str, language: str) -> LiveConnectConfig:
+        config = LiveConnectConfig(
+            response_modalities=["AUDIO"],
+            system_instruction=Content(
+                parts=[{"text": PROMPT_READER_INSTRUCTION.format(language=language)}]
+            ),
+        )
+        if voice != DEFAULT_VOICE:
+            config.speech_config = SpeechConfig(
+                voice_config=VoiceConfig(
+                    prebuilt_voice_config=PrebuiltVoiceConfig(voice_name=voice)
+                )
+            )
+        return config
+
+    async def synthesize(
+        self, text: str, voice: str = DEFAULT_VOICE, language: str = DEFAULT_LANGUAGE
+    ) -> CannedAudio | None:
+        """Have the live model read a prompt aloud in a session of its own.
+
+        Returns:
+            The audio of the model turn, or None if it was cut short or
+            carried no audio.
+        """
+        capture = AudioCapture()
+        async with self.client.aio.live.connect(
+            model=self.model, config=self._config(voice, language)
+        ) as session:
+            await session.send(input=text, end_of_turn=True)
+            while result := await session._ws.recv(decode=False):
+                payload = json.loads(result)
+                capture.add(payload)
+                server_content = payload.get("serverContent", {})
+                if server_content.get("interrupted"):
+                    return None
+                if server_content.get("turnComplete"):
+                    return capture.audio()
+        # Closed before the prompt was fully read
+        return None
@@ -0,0 +1,243 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline batch evaluation of past interviews.
+
+Each record holds a CV, a job offer and the candidate's answers:
+
+    {"id": "c-001", "cv": "...", "job_offer": "...", "transcript": ["...", ...]}
+
+``transcript`` may also be a list of ``{"role", "content"}`` turns, in which
+case only the candidate turns (``candidate`` or ``user``) are used. Records
+are read from a JSONL file or from a directory of ``.json`` and ``.jsonl``
+files.
+
+The answers are driven through the ``InterviewAgent`` graph in a process
+pool, and the final reports are generated with a bounded number of
+concurrent model calls. Results are appended to a JSONL file as they
+complete, so an interrupted run resumes where it stopped:
+
+    python -m app.batch_evaluation interviews.jsonl --output reports.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.interview_agent import InterviewAgent, get_default_model
+from app.report_cache import ReportCache
+from app.retry import gemini_retry
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_MODEL_CONCURRENCY = int(os.getenv("BATCH_MODEL_CONCURRENCY", "8"))
+CANDIDATE_ROLES = ("candidate", "user")
+
+
+class _DeferredReport:
+    """Chat model stand-in so the graph does not call Gemini in the workers.
+
+    Reports are generated afterwards in the event loop, where model calls
+    are bounded and retried together.
+    """
+
+    def invoke(self, messages: Any, **kwargs: Any) -> AIMessage:
+        return AIMessage(content="")
+
+
+def load_records(source: str | Path) -> Iterator[dict[str, Any]]:
+    """Read interview records from a JSONL file or a directory.
+
+    Records without an ``id`` get one derived from their file and line.
+    """
+    source = Path(source)
+    paths = sorted(source.iterdir()) if source.is_dir() else [source]
+    for path in paths:
+        if path.suffix == ".json":
+            with open(path, encoding="utf-8") as f:
+                yield {"id": path.stem, **json.load(f)}
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield {"id": f"{path.stem}:{line_number}", **json.loads(line)}
+
+
+def candidate_answers(record: dict[str, Any]) -> list[str]:
+    """Extract the candidate's answers from a record's transcript."""
+    answers = []
+    for turn in record.get("transcript", []):
+        if isinstance(turn, str):
+            answers.append(turn)
+        elif turn.get("role") in CANDIDATE_ROLES:
+            answers.append(turn["content"])
+    return answers
+
+
+def completed_ids(output: str | Path) -> set[str]:
+    """Ids of the records already evaluated without errors in ``output``."""
+    done: set[str] = set()
+    if not Path(output).exists():
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of a run that was killed mid-write
+                continue
+            if "error" not in result:
+                done.add(result["id"])
+    return done
+
+
+def _silence_worker() -> None:
+    """Discard the agent's console output in worker processes."""
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_interview(record: dict[str, Any]) -> dict[str, Any]:
+    """Drive a record's answers through the interview graph.
+
+    Runs in a worker process.
+
+    Returns:
+        The information collected by the graph and the report prompt.
+    """
+    # A private cache keeps the placeholder reports out of the shared one
+    agent = InterviewAgent(model=_DeferredReport(), report_cache=ReportCache())
+    for answer in candidate_answers(record):
+        agent.process_response(answer)
+    info = agent.current_state["informacion_recopilada"]
+    prompt = agent.prompt_informe(info, agent.current_state["turnos"])
+    context = (
+        f"Oferta de empleo:\n{record.get('job_offer', 'No proporcionada')}\n\n"
+        f"CV del candidato:\n{record.get('cv', 'No proporcionado')}\n"
+    )
+    return {
+        "id": record["id"],
+        "completed": agent.is_completed(),
+        "informacion_recopilada": info,
+        "prompt": context + prompt,
+    }
+
+
+async def evaluate_batch(
+    source: str | Path,
+    output: str | Path,
+    workers: int = BATCH_WORKERS,
+    concurrency: int = BATCH_MODEL_CONCURRENCY,
+    model: Any | None = None,
+) -> dict[str, int]:
+    """Evaluate every record in ``source`` that is not yet in ``output``.
+
+    Args:
+        source: JSONL file or directory of interview records.
+        output: JSONL file results are appended to.
+        workers: Processes driving the interview graph. With 0, the graph
+            runs in threads of the current process.
+        concurrency: Maximum number of concurrent report generations.
+        model: Chat model used for the reports. Defaults to the shared
+            Gemini model.
+
+    Returns:
+        Counts of evaluated, skipped and failed records.
+    """
+    model = model or get_default_model()
+    done = completed_ids(output)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    stats = {"evaluated": 0, "skipped": 0, "failed": 0}
+    pool: Executor | None = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_silence_worker,
+        )
+    # Bounds the records held in memory, whatever the size of the input
+    max_in_flight = max(workers, 1) * 2 + concurrency
+
+    with open(output, "a", encoding="utf-8") as out:
+
+        async def evaluate(record: dict[str, Any]) -> None:
+            started = time.monotonic()
+            try:
+                result = await loop.run_in_executor(pool, run_interview, record)
+                async with semaphore:
+                    report = await gemini_retry.run(
+                        lambda: model.ainvoke([HumanMessage(content=result["prompt"])])
+                    )
+                del result["prompt"]
+                line = {
+                    **result,
+                    "report": report.content,
+                    "seconds": round(time.monotonic() - started, 2),
+                }
+                stats["evaluated"] += 1
+            except Exception as e:
+                logging.error(f"Error evaluating record {record['id']}: {e!s}")
+                line = {"id": record["id"], "error": str(e)}
+                stats["failed"] += 1
+            out.write(json.dumps(line, ensure_ascii=False) + "\n")
+            out.flush()
+
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            for record in load_records(source):
+                if record["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                if len(pending) >= max_in_flight:
+                    _, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                pending.add(asyncio.create_task(evaluate(record)))
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    return stats
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="JSONL file or directory")
+    parser.add_argument("--output", type=Path, required=True, help="Results JSONL")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=BATCH_MODEL_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    stats = asyncio.run(
+        evaluate_batch(
+            args.source, args.output, workers=args.workers, concurrency=args.concurrency
+        )
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
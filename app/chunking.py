@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic chunking of documents for retrieval.
+
+Documents are first split on their structure: paragraphs, headings, and
+sentences within paragraphs that are too long. Neighboring blocks are then
+merged while they are similar enough and fit in a chunk. The similarities of
+all neighboring blocks of a document are computed at once, from a single
+batch of local hashed embeddings, so chunking makes no model calls.
+
+Chunks are kept small, so each retrieved document adds little to the tool
+response, and chunks repeated across pages (navigation, footers) are only
+embedded once.
+"""
+
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.embeddings import HashingEmbeddings
+
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "800"))
+CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", "200"))
+# Cosine similarity above which neighboring blocks are merged
+CHUNK_SIMILARITY_THRESHOLD = float(os.getenv("CHUNK_SIMILARITY_THRESHOLD", "0.2"))
+MAX_HEADING_CHARS = 80
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"[ \t]+")
+
+
+def _is_heading(block: str) -> bool:
+    """Whether a block looks like a title: one short line without a period."""
+    if "\n" in block or len(block) > MAX_HEADING_CHARS:
+        return False
+    return block.startswith("#") or block[-1] not in ".!?:;,"
+
+
+def _split_long(text: str, max_chars: int) -> Iterator[str]:
+    """Pack the sentences of a long paragraph into pieces of ``max_chars``."""
+    piece = ""
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > max_chars:
+            if piece:
+                yield piece
+                piece = ""
+            yield sentence[:max_chars]
+            sentence = sentence[max_chars:]
+        if piece and len(piece) + 1 + len(sentence) > max_chars:
+            yield piece
+            piece = ""
+        piece = f"{piece} {sentence}" if piece else sentence
+    if piece:
+        yield piece
+
+
+def split_blocks(text: str, max_chars: int = CHUNK_MAX_CHARS) -> Iterator[str]:
+    """Split a text on its structure into blocks of at most ``max_chars``."""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = _WHITESPACE.sub(" ", paragraph).strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+        else:
+            yield from _split_long(paragraph, max_chars)
+
+
+class SemanticChunker:
+    """Splits documents on structure and merges similar neighboring blocks."""
+
+    def __init__(
+        self,
+        max_chars: int = CHUNK_MAX_CHARS,
+        min_chars: int = CHUNK_MIN_CHARS,
+        threshold: float = CHUNK_SIMILARITY_THRESHOLD,
+        embedding: HashingEmbeddings | None = None,
+    ) -> None:
+        """Initialize the chunker.
+
+        Args:
+            max_chars: Maximum length of a chunk.
+            min_chars: Chunks shorter than this are merged with the next
+                block whatever their similarity, e.g. headings and lists of
+                short links.
+            threshold: Minimum cosine similarity of two neighboring blocks to
+                merge them.
+            embedding: Embeds the blocks to compare them. Defaults to
+                ``HashingEmbeddings``.
+        """
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.threshold = threshold
+        self.embedding = embedding or HashingEmbeddings()
+
+    def similarities(self, blocks: list[str]) -> np.ndarray:
+        """Cosine similarity of each block with the next one."""
+        if len(blocks) < 2:
+            return np.zeros(0, dtype=np.float32)
+        vectors = self.embedding.embed_array(blocks)
+        return np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+
+    def split_text(self, text: str) -> list[str]:
+        """Split a text into chunks."""
+        blocks = list(split_blocks(text, self.max_chars))
+        if not blocks:
+            return []
+        similar = self.similarities(blocks) >= self.threshold
+        chunks = []
+        current = [blocks[0]]
+        size = len(blocks[0])
+        for block, is_similar in zip(blocks[1:], similar, strict=True):
+            # A heading opens a new chunk, unless the current one is too short
+            related = is_similar and not _is_heading(block)
+            if size + 2 + len(block) <= self.max_chars and (
+                related or size < self.min_chars
+            ):
+                current.append(block)
+                size += 2 + len(block)
+            else:
+                chunks.append("\n\n".join(current))
+                current = [block]
+                size = len(block)
+        chunks.append("\n\n".join(current))
+        return chunks
+
+    def split_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Split documents as they are read, skipping repeated chunks.
+
+        Chunks keep the metadata of their document.
+        """
+        seen: set[str] = set()
+        duplicates = 0
+        for document in documents:
+            for chunk in self.split_text(document.page_content):
+                if chunk in seen:
+                    duplicates += 1
+                    continue
+                seen.add(chunk)
+                yield Document(page_content=chunk, metadata=dict(document.metadata))
+        logging.info(f"# of repeated chunks skipped = {duplicates}")
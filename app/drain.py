@@ -0,0 +1,164 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Graceful drain of live sessions on shutdown.
+
+Rolling deploys and scale-in stop instances with SIGTERM, and Cloud Run kills
+them a few seconds later. Instead of dropping every interview, the instance
+drains first:
+
+1. New ``/ws`` connections are refused with close code 1013 (try again
+   later), so the load balancer's retry lands on another instance.
+2. Running sessions get a status message and a few seconds to finish their
+   in-flight tool calls.
+3. Each session's interview state is checkpointed to the shared state store.
+4. Sessions are closed with code 1012 (service restart). Clients reconnect
+   with the same ``run_id`` and resume the interview on another instance.
+
+Only then is uvicorn's own shutdown handler run.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any
+
+DRAIN_GRACE_SECONDS = float(os.getenv("DRAIN_GRACE_SECONDS", "8"))
+# WebSocket close codes
+SERVICE_RESTART = 1012
+TRY_AGAIN_LATER = 1013
+_POLL_SECONDS = 0.1
+
+Checkpoint = Callable[[str], None]
+
+
+class SessionRegistry:
+    """Live sessions of this process, drained together on shutdown."""
+
+    def __init__(self, grace_seconds: float = DRAIN_GRACE_SECONDS) -> None:
+        """Initialize the registry.
+
+        Args:
+            grace_seconds: Time sessions get to finish in-flight tool calls
+                before they are checkpointed and closed.
+        """
+        self.grace_seconds = grace_seconds
+        self.draining = False
+        # GeminiSession instances and the tasks running them
+        self._sessions: dict[Any, asyncio.Task[Any] | None] = {}
+        self._drain_task: asyncio.Task[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def sessions(self) -> list[Any]:
+        """Sessions currently running."""
+        return list(self._sessions)
+
+    def task(self, session: Any) -> asyncio.Task[Any] | None:
+        """Task running a session, so it can be cancelled."""
+        return self._sessions.get(session)
+
+    @contextmanager
+    def register(self, session: Any) -> Iterator[None]:
+        """Track a session run by the current task while in the context."""
+        self._sessions[session] = asyncio.current_task()
+        try:
+            yield
+        finally:
+            self._sessions.pop(session, None)
+
+    async def drain(self, checkpoint: Checkpoint) -> int:
+        """Stop admitting sessions, checkpoint and close the running ones.
+
+        Args:
+            checkpoint: Saves the interview state of a session, given its
+                state key.
+
+        Returns:
+            Number of sessions drained.
+        """
+        self.draining = True
+        sessions = list(self._sessions)
+        logging.warning(f"Draining {len(sessions)} live sessions")
+        for session in sessions:
+            try:
+                await session.websocket.send_json(
+                    {
+                        "status": "Server is restarting, your interview will "
+                        "resume in a few seconds...",
+                        "resume_run_id": session.state_key,
+                    }
+                )
+            except Exception as e:
+                logging.debug(f"Could not notify session {session.state_key}: {e}")
+
+        deadline = time.monotonic() + self.grace_seconds
+        while time.monotonic() < deadline and any(
+            session.pending_tool_calls for session in sessions
+        ):
+            await asyncio.sleep(_POLL_SECONDS)
+
+        for session in sessions:
+            try:
+                checkpoint(session.state_key)
+            except Exception as e:
+                logging.error(f"Could not checkpoint {session.state_key}: {e!s}")
+            try:
+                await session.websocket.close(
+                    code=SERVICE_RESTART, reason="Server restarting"
+                )
+            except Exception as e:
+                logging.debug(f"Could not close session {session.state_key}: {e}")
+        logging.warning(f"Drained {len(sessions)} live sessions")
+        return len(sessions)
+
+    def install_signal_handler(self, checkpoint: Checkpoint) -> None:
+        """Drain on SIGTERM, then hand the signal to the previous handler.
+
+        Must be called from the event loop, e.g. in the app lifespan. A second
+        SIGTERM skips the drain. Does nothing outside the main thread, where
+        signal handlers cannot be installed.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def forward(signum: int, frame: FrameType | None) -> None:
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                signal.signal(signal.SIGTERM, previous)
+                signal.raise_signal(signum)
+
+        def handle(signum: int, frame: FrameType | None) -> None:
+            if self.draining:
+                forward(signum, frame)
+                return
+            self.draining = True
+
+            def start() -> None:
+                self._drain_task = loop.create_task(self.drain(checkpoint))
+                self._drain_task.add_done_callback(lambda _: forward(signum, frame))
+
+            loop.call_soon_threadsafe(start)
+
+        signal.signal(signal.SIGTERM, handle)
@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Embedding backends.
+
+``HashingEmbeddings`` and ``LocalEmbeddings`` need no network access or model
+download. ``get_embedding`` picks the backend configured with the
+``EMBEDDING_BACKEND`` environment variable:
+    vertexai (default): Vertex AI ``text-embedding-004``.
+    local: ``LocalEmbeddings``, hashed TF-IDF with optional SVD.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "vertexai")
+EMBEDDING_MODEL = "text-embedding-004"
+HASHING_FEATURES = 512
+LOCAL_EMBEDDING_FEATURES = int(os.getenv("LOCAL_EMBEDDING_FEATURES", "4096"))
+# Dimension after SVD; 0 keeps the hashed TF-IDF vectors
+LOCAL_EMBEDDING_SVD_DIM = int(os.getenv("LOCAL_EMBEDDING_SVD_DIM", "0"))
+
+
+class HashingEmbeddings(Embeddings):
+    """Embeddings from hashed word unigrams and bigrams.
+
+    Much weaker than a neural embedding model, but deterministic, fast and
+    fully local. Vectors are L2-normalized.
+    """
+
+    def __init__(self, n_features: int = HASHING_FEATURES) -> None:
+        """Initialize the embeddings.
+
+        Args:
+            n_features: Dimension of the vectors.
+        """
+        self.n_features = n_features
+        self._vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            strip_accents="unicode",
+            alternate_sign=False,
+            norm="l2",
+        )
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into a float32 matrix with one row per text."""
+        return self._vectorizer.transform(texts).toarray().astype(np.float32)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_array([text])[0].tolist()
+
+
+class LocalEmbeddings(HashingEmbeddings):
+    """Hashed TF-IDF embeddings, optionally reduced with truncated SVD.
+
+    ``fit`` learns the IDF weights, and the SVD projection if enabled, from
+    the corpus; the fitted parameters are saved next to the vector store so
+    queries are embedded like the documents. Before fitting, the vectors are
+    plain hashed term frequencies. Texts are encoded as one sparse batch.
+    """
+
+    def __init__(
+        self,
+        n_features: int = LOCAL_EMBEDDING_FEATURES,
+        n_components: int = LOCAL_EMBEDDING_SVD_DIM,
+    ) -> None:
+        """Initialize the embeddings.
+
+        Args:
+            n_features: Number of hashed features.
+            n_components: Dimension after SVD, or 0 to skip the SVD. Capped
+                by the size of the corpus passed to ``fit``.
+        """
+        super().__init__(n_features)
+        self._vectorizer.set_params(norm=None, dtype=np.float32)
+        self.n_components = n_components
+        self.idf: np.ndarray | None = None
+        self.components: np.ndarray | None = None
+        # components.T, contiguous for the sparse product
+        self._projection: np.ndarray | None = None
+
+    def _set_params(
+        self, idf: np.ndarray | None, components: np.ndarray | None
+    ) -> None:
+        self.idf = idf
+        self.components = components
+        self._projection = (
+            None if components is None else np.ascontiguousarray(components.T)
+        )
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the vectors produced."""
+        if self.components is not None:
+            return len(self.components)
+        return self.n_features
+
+    def fit(self, texts: list[str]) -> "LocalEmbeddings":
+        """Learn the IDF weights and the SVD projection from a corpus."""
+        counts = self._vectorizer.transform(texts)
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        # Smoothed IDF, as in sklearn's TfidfTransformer
+        idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(
+            np.float32
+        )
+        components = None
+        n_components = min(self.n_components, len(texts) - 1)
+        if n_components > 0:
+            weighted = normalize(counts.multiply(idf).tocsr())
+            svd = TruncatedSVD(n_components=n_components, random_state=0)
+            svd.fit(weighted)
+            components = svd.components_.astype(np.float32)
+        self._set_params(idf, components)
+        return self
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into a float32 matrix with one row per text."""
+        vectors = self._vectorizer.transform(texts)
+        if self.idf is not None:
+            # Weight in place; rows are only normalized at the end, as the
+            # projection is linear
+            vectors.data *= self.idf[vectors.indices]
+        if self._projection is not None:
+            dense = vectors @ self._projection
+        else:
+            dense = vectors.toarray()
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        return dense / np.maximum(norms, 1e-12)
+
+    def save(self, path: str | Path) -> None:
+        """Save the fitted parameters to a ``.npz`` file."""
+        arrays = {"n_features": np.array(self.n_features)}
+        if self.idf is not None:
+            arrays["idf"] = self.idf
+        if self.components is not None:
+            arrays["components"] = self.components
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    def load(self, path: str | Path) -> "LocalEmbeddings":
+        """Load parameters saved with ``save``.
+
+        Raises:
+            ValueError: If they were fitted with another number of features.
+        """
+        with np.load(path) as data:
+            if int(data["n_features"]) != self.n_features:
+                raise ValueError(
+                    f"{path} was fitted with {int(data['n_features'])} features, "
+                    f"not {self.n_features}"
+                )
+            self._set_params(
+                data["idf"] if "idf" in data else None,
+                data["components"] if "components" in data else None,
+            )
+        return self
+
+
+def get_embedding(backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """Create the embedding model of the configured backend."""
+    if backend == "local":
+        return LocalEmbeddings()
+    if backend == "vertexai":
+        from langchain_google_vertexai import VertexAIEmbeddings
+
+        return VertexAIEmbeddings(model_name=EMBEDDING_MODEL)
+    raise ValueError(f"Unsupported embedding backend: {backend}")
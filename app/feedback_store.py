@@ -0,0 +1,254 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local store of user feedback with precomputed aggregates.
+
+Feedback used to be written only to Cloud Logging, one blocking call per
+request, and could not be queried without a log sink. It is now queued by
+the request handlers and written behind, in batches, to:
+
+- a SQLite database holding the raw feedback and running aggregates (count,
+  sum, minimum and maximum score) per ``run_id``, per ``user_id``, per UTC
+  day and overall, updated in the same transaction as the inserts, so
+  statistics are a primary key lookup;
+- Cloud Logging, one batched API call per flush.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+FEEDBACK_DB_PATH = os.getenv("FEEDBACK_DB_PATH", ".feedback.db")
+FEEDBACK_QUEUE_SIZE = int(os.getenv("FEEDBACK_QUEUE_SIZE", "10000"))
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "500"))
+# Aggregated dimensions; "all" has a single, empty key
+DIMENSIONS = ("run_id", "user_id", "day", "all")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    user_id TEXT,
+    day TEXT NOT NULL,
+    score REAL NOT NULL,
+    text TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedback_stats (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_min REAL NOT NULL,
+    score_max REAL NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+"""
+_UPSERT_STATS = """
+INSERT INTO feedback_stats VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (dimension, key) DO UPDATE SET
+    count = count + excluded.count,
+    score_sum = score_sum + excluded.score_sum,
+    score_min = min(score_min, excluded.score_min),
+    score_max = max(score_max, excluded.score_max)
+"""
+
+
+class FeedbackQueueFull(Exception):
+    """Raised when feedback arrives faster than it can be written."""
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class FeedbackStore:
+    """SQLite table of feedback and its running aggregates."""
+
+    def __init__(self, path: str | Path = FEEDBACK_DB_PATH) -> None:
+        """Open or create the database.
+
+        Args:
+            path: Database file, or ``":memory:"``.
+        """
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def add_many(self, records: Iterable[dict[str, Any]]) -> int:
+        """Insert feedback records and update the aggregates atomically.
+
+        Records have the fields of the ``/feedback`` payload, and optionally
+        a ``created_at`` timestamp.
+
+        Returns:
+            Number of records inserted.
+        """
+        rows = []
+        # dimension, key -> [count, sum, min, max], so each aggregate row is
+        # written once per batch
+        stats: dict[tuple[str, str], list[float]] = {}
+        for record in records:
+            created_at = record.get("created_at") or time.time()
+            day = _day(created_at)
+            score = float(record["score"])
+            user_id = record.get("user_id")
+            rows.append(
+                (record["run_id"], user_id, day, score, record.get("text"), created_at)
+            )
+            keys = [("run_id", record["run_id"]), ("day", day), ("all", "")]
+            if user_id is not None:
+                keys.append(("user_id", user_id))
+            for key in keys:
+                stat = stats.get(key)
+                if stat is None:
+                    stats[key] = [1, score, score, score]
+                else:
+                    stat[0] += 1
+                    stat[1] += score
+                    stat[2] = min(stat[2], score)
+                    stat[3] = max(stat[3], score)
+        if not rows:
+            return 0
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO feedback (run_id, user_id, day, score, text, "
+                    "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._connection.executemany(
+                    _UPSERT_STATS,
+                    [(*key, *stat) for key, stat in stats.items()],
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def stats(self, dimension: str = "all", key: str = "") -> dict[str, Any]:
+        """Aggregated scores of a run, user, day (``YYYY-MM-DD``) or overall.
+
+        Raises:
+            ValueError: If the dimension is not aggregated.
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown feedback dimension: {dimension}")
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT count, score_sum, score_min, score_max FROM feedback_stats "
+                "WHERE dimension = ? AND key = ?",
+                (dimension, key),
+            ).fetchone()
+        count, score_sum, score_min, score_max = row or (0, 0.0, None, None)
+        return {
+            "dimension": dimension,
+            "key": key,
+            "count": count,
+            "mean_score": score_sum / count if count else None,
+            "min_score": score_min,
+            "max_score": score_max,
+        }
+
+
+class FeedbackWriter:
+    """Write-behind queue of feedback, flushed in batches by a background task."""
+
+    def __init__(
+        self,
+        store: FeedbackStore,
+        struct_logger: Any | None = None,
+        max_queued: int = FEEDBACK_QUEUE_SIZE,
+        batch_size: int = FEEDBACK_BATCH_SIZE,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            store: Store the feedback is written to.
+            struct_logger: Cloud Logging logger the feedback is also sent to.
+            max_queued: Records queued before ``submit`` refuses more.
+            batch_size: Maximum records written per flush.
+        """
+        self.store = store
+        self.struct_logger = struct_logger
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(max_queued)
+        self.written = 0
+
+    def submit(self, records: list[dict[str, Any]]) -> None:
+        """Queue records, all or none.
+
+        Raises:
+            FeedbackQueueFull: If the queue has no room for the records.
+        """
+        if len(records) > self._queue.maxsize - self._queue.qsize():
+            raise FeedbackQueueFull("Too much feedback pending, please retry.")
+        created_at = time.time()
+        for record in records:
+            self._queue.put_nowait({**record, "created_at": created_at})
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        self.written += self.store.add_many(batch)
+        if self.struct_logger is not None:
+            with self.struct_logger.batch() as log_batch:
+                for record in batch:
+                    log_batch.log_struct(record, severity="INFO")
+
+    async def flush(self) -> int:
+        """Write the queued records.
+
+        Returns:
+            Number of records written.
+        """
+        written = 0
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await asyncio.to_thread(self._write, batch)
+            written += len(batch)
+        return written
+
+    async def run(self) -> None:
+        """Write records as they are queued until cancelled.
+
+        Records still queued on cancellation are left for ``flush``.
+        """
+        while True:
+            record = await self._queue.get()
+            batch = [record]
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logging.error(f"Could not write {len(batch)} feedback records: {e!s}")
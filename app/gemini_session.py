@@ -0,0 +1,363 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import WebSocket
+from google.genai import types
+from google.genai.types import LiveServerToolCall
+from websockets.exceptions import ConnectionClosedError
+
+from app.audio_cache import DEFAULT_VOICE, AudioCache, CannedAudio, PromptSynthesizer
+from app.recording import CLIENT_FRAME, GEMINI_FRAME, SessionRecorder, redact
+from app.relay_protocol import (
+    BINARY_FRAMING,
+    audio_message,
+    encode_audio_frame,
+    split_audio,
+)
+from app.state_store import current_run_id
+from app.templates import CANNED_AUDIO_NOTE, DEFAULT_LANGUAGE
+from app.vad import VAD_ENABLED, SilenceFilter
+from app.vector_store import DEFAULT_CORPUS, current_corpus_id
+from app.video_filter import VIDEO_FILTER_ENABLED, FrameFilter
+
+
+class GeminiSession:
+    """Manages bidirectional communication between a client and the Gemini model."""
+
+    def __init__(
+        self,
+        session: Any,
+        websocket: WebSocket,
+        tool_functions: dict[str, Callable],
+        struct_logger: Any | None = None,
+        recorder: SessionRecorder | None = None,
+        audio_cache: AudioCache | None = None,
+        canned_prompts: frozenset[str] = frozenset(),
+        prompt_synthesizer: PromptSynthesizer | None = None,
+    ) -> None:
+        """Initialize the Gemini session.
+
+        Args:
+            session: The Gemini session
+            websocket: The client websocket connection
+            tool_functions: Dictionary of available tool functions
+            struct_logger: Cloud Logging logger for structured session events
+            recorder: Optional recorder of the frames relayed in both directions
+            audio_cache: Optional cache of the model's audio for fixed prompts
+            canned_prompts: Tool-returned texts whose audio is cached
+            prompt_synthesizer: Generates the audio of prompts missing from
+                the cache, in sessions of its own
+        """
+        self.session = session
+        self.websocket = websocket
+        self.run_id = "n/a"
+        self.user_id = "n/a"
+        self.tool_functions = tool_functions
+        self.struct_logger = struct_logger
+        self.recorder = recorder
+        # Fallback state key for clients that never send a setup message
+        self.session_id = str(uuid.uuid4())
+        # Retrieval corpus of the session, e.g. the company's documentation
+        self.corpus_id = DEFAULT_CORPUS
+        # Send model audio as raw binary frames instead of base64 JSON
+        self.binary_audio = False
+        # Drops silent microphone audio before it reaches Gemini
+        self.audio_filter = SilenceFilter() if VAD_ENABLED else None
+        # Drops near-duplicate webcam frames and enforces a frame budget
+        self.video_filter = FrameFilter() if VIDEO_FILTER_ENABLED else None
+        # Tool calls being handled, awaited by a graceful drain
+        self.pending_tool_calls = 0
+        # Last message from the client, heartbeats included
+        self.last_client_activity = time.monotonic()
+        # Set by the idle reaper before it cancels the session
+        self.reaped = False
+        self.audio_cache = audio_cache
+        self.canned_prompts = canned_prompts
+        self.prompt_synthesizer = prompt_synthesizer
+        # Voice and language the prompts are spoken in, part of the cache key
+        self.voice = DEFAULT_VOICE
+        self.language = DEFAULT_LANGUAGE
+        # Drops the model audio of a turn whose prompt was played from cache,
+        # should the model speak despite the tool response's note
+        self._mute_model_audio = False
+        self.canned_audio_played = 0
+
+    @property
+    def idle_seconds(self) -> float:
+        """Seconds since the client last sent anything."""
+        return time.monotonic() - self.last_client_activity
+
+    @property
+    def state_key(self) -> str:
+        """Key of this session's interview state in the shared state store."""
+        return self.session_id if self.run_id == "n/a" else self.run_id
+
+    async def receive_from_client(self, first_message: Any | None = None) -> None:
+        """Listen for and process messages from the client.
+
+        Continuously receives messages and forwards audio data to Gemini.
+        Handles connection errors gracefully.
+
+        Args:
+            first_message: Message already received from the client before the
+                Gemini session was opened, processed before any other.
+        """
+        if first_message is not None:
+            await self._handle_client_message(first_message)
+        while True:
+            try:
+                data = await self.websocket.receive_json()
+                await self._handle_client_message(data)
+            except ConnectionClosedError as e:
+                logging.warning(f"Client {self.user_id} closed connection: {e}")
+                break
+            except Exception as e:
+                logging.error(f"Error receiving from client {self.user_id}: {e!s}")
+                break
+
+    async def _handle_client_message(self, data: Any) -> None:
+        """Forward a client message to Gemini or apply its setup."""
+        self.last_client_activity = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.record(CLIENT_FRAME, json.dumps(redact(data)).encode())
+        if isinstance(data, dict) and (
+            "realtimeInput" in data or "clientContent" in data
+        ):
+            data = self._filter_realtime_input(data)
+            if data is not None:
+                await self.session._ws.send(json.dumps(data))
+        elif "setup" in data:
+            self.run_id = data["setup"]["run_id"]
+            self.user_id = data["setup"]["user_id"]
+            self.binary_audio = data["setup"].get("audio_framing") == BINARY_FRAMING
+            self.corpus_id = data["setup"].get("corpus") or DEFAULT_CORPUS
+            self.voice = data["setup"].get("voice") or DEFAULT_VOICE
+            self.language = data["setup"].get("language") or DEFAULT_LANGUAGE
+            # CVs and offers can be long, keep them out of the logs
+            self._log_struct(
+                {
+                    **{
+                        key: value
+                        for key, value in data["setup"].items()
+                        if key not in ("cv", "job_offer")
+                    },
+                    "type": "setup",
+                }
+            )
+        elif "heartbeat" in data:
+            # Reply to send_heartbeats, only refreshes the client activity
+            pass
+        else:
+            logging.warning(f"Received unexpected input from client: {data}")
+
+    async def send_heartbeats(self, interval: float) -> None:
+        """Send heartbeats the client answers, until sending fails.
+
+        Keeps ``idle_seconds`` low for clients that are connected but quiet,
+        so only dead connections look idle to the reaper.
+
+        Args:
+            interval: Seconds between heartbeats.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.websocket.send_json({"heartbeat": time.time()})
+            except Exception as e:
+                logging.warning(f"Heartbeat to client {self.user_id} failed: {e!s}")
+                return
+
+    def _log_struct(self, payload: dict[str, Any]) -> None:
+        """Log a structured event to Cloud Logging, or locally without a logger."""
+        if self.struct_logger is not None:
+            self.struct_logger.log_struct(payload, severity="INFO")
+        else:
+            logging.info(json.dumps(payload))
+
+    def _filter_realtime_input(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Remove media chunks that do not need to reach Gemini.
+
+        Args:
+            data: Message received from the client
+
+        Returns:
+            The message to forward, or None if nothing is left to send.
+        """
+        if "realtimeInput" not in data:
+            return data
+        chunks = data["realtimeInput"].get("mediaChunks", [])
+        kept = [chunk for chunk in chunks if self._should_forward_chunk(chunk)]
+        if len(kept) == len(chunks):
+            return data
+        if not kept:
+            return None
+        return {**data, "realtimeInput": {**data["realtimeInput"], "mediaChunks": kept}}
+
+    def _should_forward_chunk(self, chunk: dict[str, Any]) -> bool:
+        """Run a media chunk through the audio or video filter."""
+        mime_type = chunk.get("mimeType", "")
+        if self.audio_filter is not None and mime_type.startswith("audio/pcm"):
+            return self.audio_filter.should_forward(chunk["data"], mime_type)
+        if self.video_filter is not None and mime_type.startswith("image/"):
+            return self.video_filter.should_forward(chunk["data"])
+        return True
+
+    def media_stats(self) -> dict[str, Any]:
+        """Upstream media traffic received and saved during the session."""
+        stats: dict[str, Any] = {"run_id": self.run_id, "user_id": self.user_id}
+        if self.audio_filter is not None:
+            stats.update(self.audio_filter.stats())
+        if self.video_filter is not None:
+            stats.update(self.video_filter.stats())
+        if self.audio_cache is not None:
+            stats["canned_audio_played"] = self.canned_audio_played
+        return stats
+
+    def _get_func(self, action_label: str) -> Callable | None:
+        """Get the tool function for a given action label."""
+        # print("ACTION LABEL")
+        # print(action_label)
+        # print(self.tool_functions)
+        # print(self.tool_functions.get(action_label))
+        return None if action_label == "" else self.tool_functions.get(action_label)
+
+    async def _handle_tool_call(
+        self, session: Any, tool_call: LiveServerToolCall
+    ) -> None:
+        """Process tool calls from Gemini and send back responses.
+
+        Args:
+            session: The Gemini session
+            tool_call: Tool call request from Gemini
+        """
+        current_run_id.set(self.state_key)
+        current_corpus_id.set(self.corpus_id)
+        self.pending_tool_calls += 1
+        try:
+            for fc in tool_call.function_calls:
+                print(f"Calling tool function: {fc.name} with args: {fc.args}")
+                response = self._get_func(fc.name)(**fc.args)
+                if inspect.isawaitable(response):
+                    # Async tools run on the event loop and are cancelled with the
+                    # session when the client goes away
+                    response = await response
+                response = await self._play_canned_audio(response)
+
+                tool_response = types.LiveClientToolResponse(
+                    function_responses=[
+                        types.FunctionResponse(
+                            name=fc.name, id=fc.id, response=response
+                        )
+                    ]
+                )
+
+                print(f"Tool response: {tool_response}")
+                await session.send(input=tool_response)
+        finally:
+            self.pending_tool_calls -= 1
+
+    async def _play_canned_audio(self, response: Any) -> Any:
+        """Play a fixed prompt from the audio cache, or request its audio.
+
+        Args:
+            response: Response of a tool call
+
+        Returns:
+            The response to send to Gemini. For a prompt already played, it
+            asks the model not to speak it again.
+        """
+        if self.audio_cache is None or not isinstance(response, dict):
+            return response
+        text = response.get("question")
+        if text not in self.canned_prompts:
+            return response
+        key = self.audio_cache.key(text, self.voice, self.language)
+        audio = await asyncio.to_thread(self.audio_cache.get, key)
+        if audio is None:
+            # The model speaks the prompt this time. Its turn may add remarks
+            # about the candidate, so the cache is fed from a prompt-only
+            # session instead
+            if self.prompt_synthesizer is not None:
+                self.prompt_synthesizer.request(text, self.voice, self.language)
+            return response
+        await self._send_canned_audio(audio)
+        self._mute_model_audio = True
+        self.canned_audio_played += 1
+        return {**response, "nota": CANNED_AUDIO_NOTE}
+
+    async def _send_canned_audio(self, audio: CannedAudio) -> None:
+        """Stream cached audio to the client in its audio framing."""
+        for chunk in audio.chunks():
+            if self.binary_audio:
+                frame = encode_audio_frame(chunk, audio.sample_rate)
+            else:
+                frame = audio_message(chunk, audio.sample_rate)
+            await self.websocket.send_bytes(frame)
+
+    def _end_model_turn(self, server_content: dict[str, Any]) -> None:
+        """Stop muting the model once the turn of a replayed prompt is over."""
+        if server_content.get("interrupted") or server_content.get("turnComplete"):
+            self._mute_model_audio = False
+
+    async def _send_binary_audio(self, payload: dict[str, Any]) -> None:
+        """Send model audio as binary frames and the rest of the message as JSON.
+
+        Args:
+            payload: Parsed message received from Gemini
+        """
+        frames, remainder = split_audio(payload)
+        for frame in frames:
+            await self.websocket.send_bytes(frame)
+        if remainder is not None:
+            await self.websocket.send_bytes(json.dumps(remainder).encode())
+
+    async def receive_from_gemini(self) -> None:
+        """Listen for and process messages from Gemini.
+
+        Continuously receives messages from Gemini, forwards them to the client,
+        and handles any tool calls. Handles connection errors gracefully.
+        """
+        while result := await self.session._ws.recv(decode=False):
+            # print("result: {}".format(result))
+            if self.recorder is not None:
+                self.recorder.record(GEMINI_FRAME, result)
+            payload = json.loads(result)
+            if self._mute_model_audio:
+                # The client already heard this turn's prompt from the cache
+                _, remainder = split_audio(payload)
+                if remainder is not None:
+                    await self.websocket.send_bytes(json.dumps(remainder).encode())
+            elif self.binary_audio:
+                await self._send_binary_audio(payload)
+            else:
+                await self.websocket.send_bytes(result)
+            if "serverContent" in payload:
+                self._end_model_turn(payload["serverContent"])
+            message = types.LiveServerMessage.model_validate(payload)
+
+            if message.tool_call:
+                print(f"message.tool_call: {message.tool_call}")
+
+                tool_call = LiveServerToolCall.model_validate(message.tool_call)
+                print(f"tool_call: {tool_call}")
+                await self._handle_tool_call(self.session, tool_call)
@@ -1,47 +1,108 @@
 # Importaciones necesarias
+import asyncio
 import logging
-from typing import Annotated, TypedDict
-from langchain_core.messages import HumanMessage, SystemMessage
+import time
+from contextlib import aclosing
+from functools import lru_cache
+from typing import TypedDict
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_google_vertexai import ChatVertexAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import add_messages
+
+from app.answer_evaluator import BatchEvaluator
+from app.observations import ObservationBuffer
+from app.report_cache import ReportCache, get_report_cache
+from app.retry import gemini_retry
+from app.transcript_store import TranscriptStore
+from app.turn_log import INTRO_PHASE, Turn, TurnLog
+
+MODEL_ID = "gemini-2.0-flash-001"
+# Estados de la entrevista en los que se hacen preguntas, en orden
+PREGUNTAS = ("presentacion", "experiencia", "tecnico")
+# Cambiar al modificar prompt_informe, para no reutilizar informes antiguos
+PROMPT_INFORME_VERSION = 2
+# Pregunta inicial, anterior a las de cada estado
+INTRO = "¿Podrías hacer una breve presentación sobre ti?"
+# Preguntas de cada estado, en orden
+PREGUNTAS_ESTADO = {
+    "presentacion": (
+        "¿Qué te motiva a trabajar en este sector?",
+        "¿Qué te motiva a trabajar en este sector?",
+        "¿Cuál ha sido tu mayor logro profesional?",
+    ),
+    "experiencia": (
+        "¿Cuál es tu experiencia laboral más relevante?",
+        "¿Cuántos años de experiencia tienes en el sector?",
+        "¿Cuál ha sido tu mayor logro profesional?",
+    ),
+    "tecnico": (
+        "¿Qué lenguajes de programación dominas?",
+        "¿Qué frameworks has utilizado?",
+        "¿Cuál es tu experiencia con metodologías ágiles?",
+    ),
+}
+# Mensajes de estado que devuelve la herramienta en lugar de una pregunta
+MAS_DETALLES = "Por favor, proporciona más detalles en tu respuesta."
+ERROR_ENTREVISTA = "Lo siento, ha ocurrido un error en la entrevista."
+# Textos que no cambian entre entrevistas (todos salvo el informe), cuyo
+# audio se puede reutilizar entre sesiones
+TEXTOS_FIJOS = frozenset(
+    [INTRO, MAS_DETALLES, ERROR_ENTREVISTA]
+    + [pregunta for preguntas in PREGUNTAS_ESTADO.values() for pregunta in preguntas]
+)
+
+
+def nombre_fase(fase: int) -> str:
+    """Nombre del estado en la posición ``fase``, o ``intro`` para la pregunta inicial"""
+    return "intro" if fase == INTRO_PHASE else PREGUNTAS[fase]
+
+
+@lru_cache(maxsize=1)
+def get_default_model():
+    """Modelo de chat compartido por todas las entrevistas del proceso"""
+    # Los reintentos los coordina gemini_retry para todo el proceso
+    return ChatVertexAI(model=MODEL_ID, temperature=0, max_retries=0)
+
 
 # Definir el estado del agente
 class EstadoEntrevista(TypedDict):
     estado_actual: str
     informacion_recopilada: dict
-    messages: Annotated[list, add_messages]
+    # Registro compacto de preguntas y respuestas; los mensajes de LangChain
+    # se construyen solo cuando se piden con ``messages()``
+    turnos: TurnLog
+    informe_final: str
 
 class InterviewAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        model=None,
+        report_cache: ReportCache | None = None,
+        evaluador: BatchEvaluator | None = None,
+    ):
         print("\n[INIT] Inicializando InterviewAgent")
-        self.memory = MemorySaver()
-        self.model = ChatVertexAI(model="gemini-2.0-flash-001", temperature=0)
+        # Permite inyectar otro modelo de chat (p. ej. uno falso en benchmarks)
+        self.model = model or get_default_model()
+        # Informes ya generados, compartidos por las entrevistas del proceso
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+        # Puntúa las respuestas en lotes con las de otras sesiones; sin él
+        # (o con la API síncrona) las respuestas no se puntúan
+        self.evaluador = evaluador
+        # Puntuaciones en curso y el turno que puntúan
+        self._evaluaciones: dict[asyncio.Task, Turn] = {}
         self.estados = {
             "presentacion": {
                 "completado": False,
-                "preguntas": [
-                    "¿Qué te motiva a trabajar en este sector?",
-                    "¿Qué te motiva a trabajar en este sector?",
-                    "¿Cuál ha sido tu mayor logro profesional?"
-                ]
+                "preguntas": list(PREGUNTAS_ESTADO["presentacion"])
             },
             "experiencia": {
                 "completado": False,
-                "preguntas": [
-                    "¿Cuál es tu experiencia laboral más relevante?",
-                    "¿Cuántos años de experiencia tienes en el sector?",
-                    "¿Cuál ha sido tu mayor logro profesional?"
-                ]
+                "preguntas": list(PREGUNTAS_ESTADO["experiencia"])
             },
             "tecnico": {
                 "completado": False,
-                "preguntas": [
-                    "¿Qué lenguajes de programación dominas?",
-                    "¿Qué frameworks has utilizado?",
-                    "¿Cuál es tu experiencia con metodologías ágiles?"
-                ]
+                "preguntas": list(PREGUNTAS_ESTADO["tecnico"])
             },
             "informe": {
                 "completado": False,
@@ -58,6 +119,8 @@ class InterviewAgent:
         self.final_report = None
         self.current_question_index = 0
         self.thread_id = "interview_thread_1"  # Añadimos un thread_id fijo
+        # Observaciones del comportamiento del candidato (developer_interview_nervous)
+        self.observaciones = ObservationBuffer()
         print("[INIT] InterviewAgent inicializado correctamente")
 
     def entrevistador_node(self, state: EstadoEntrevista):
@@ -67,7 +130,7 @@ class InterviewAgent:
         print(f"3. [ENTREVISTADOR] Información recopilada: {state['informacion_recopilada'].keys()}")
         
         estado_actual = state["estado_actual"]
-        messages = state["messages"]
+        turnos = state["turnos"]
         
         # Si el estado actual es "siguiente", necesitamos determinar el próximo estado
         if estado_actual == "siguiente":
@@ -86,14 +149,23 @@ class InterviewAgent:
             
             print(f"3. [ENTREVISTADOR] Cambiando de 'siguiente' a estado: {siguiente}")
             estado_actual = siguiente
+
+        # Sin más preguntas, el evaluador deja pasar el estado hacia el informe
+        if estado_actual == "informe":
+            return {
+                "turnos": turnos,
+                "estado_actual": "informe",
+                "informacion_recopilada": state["informacion_recopilada"]
+            }
         
         if not self.estados[estado_actual]["completado"]:
             preguntas = self.estados[estado_actual]["preguntas"]
             if self.current_question_index < len(preguntas):
                 pregunta = preguntas[self.current_question_index]
                 print(f"3. [ENTREVISTADOR] Haciendo pregunta: {pregunta}")
+                turnos.ask(PREGUNTAS.index(estado_actual), self.current_question_index)
                 return {
-                    "messages": messages + [HumanMessage(content=pregunta)],
+                    "turnos": turnos,
                     "estado_actual": estado_actual,
                     "informacion_recopilada": state["informacion_recopilada"]
                 }
@@ -102,7 +174,7 @@ class InterviewAgent:
         
         print("3. [ENTREVISTADOR] Estado completado, pasando al siguiente")
         return {
-            "messages": messages,
+            "turnos": turnos,
             "estado_actual": "siguiente",
             "informacion_recopilada": state["informacion_recopilada"]
         }
@@ -110,15 +182,15 @@ class InterviewAgent:
     def evaluador_node(self, state: EstadoEntrevista):
         """Nodo que evalúa las respuestas y determina si se puede avanzar"""
         print(f"\n2. [EVALUADOR] Evaluando respuesta para estado: {state['estado_actual']}")
-        messages = state["messages"]
+        turnos = state["turnos"]
         estado_actual = state["estado_actual"]
+
+        if estado_actual == "informe":
+            print("2. [EVALUADOR] Entrevista terminada, pasando al informe")
+            return state
         
         # Buscamos la última respuesta del usuario
-        ultima_respuesta = None
-        for msg in reversed(messages):
-            if isinstance(msg, HumanMessage):
-                ultima_respuesta = msg.content
-                break
+        ultima_respuesta = turnos.last_answer()
         
         if not ultima_respuesta:
             print("2. [EVALUADOR] No se encontró respuesta válida")
@@ -128,7 +200,7 @@ class InterviewAgent:
         
         # Creamos un nuevo estado para devolver
         nuevo_estado = {
-            "messages": messages,
+            "turnos": turnos,
             "estado_actual": estado_actual,
             "informacion_recopilada": state["informacion_recopilada"]
         }
@@ -144,11 +216,11 @@ class InterviewAgent:
             self.estados[estado_actual]["completado"] = True
             self.current_question_index = 0
             
-            # Guardamos todas las respuestas del estado actual
-            respuestas_estado = []
-            for msg in messages:
-                if isinstance(msg, HumanMessage):
-                    respuestas_estado.append(msg.content)
+            # Guardamos las respuestas del estado actual; la de la pregunta
+            # inicial cuenta como parte de la presentación
+            fase = PREGUNTAS.index(estado_actual)
+            fases = (INTRO_PHASE, fase) if fase == 0 else (fase,)
+            respuestas_estado = turnos.answers(*fases)
             
             nuevo_estado["informacion_recopilada"] = {
                 **state["informacion_recopilada"],
@@ -161,6 +233,71 @@ class InterviewAgent:
         print(f"[EVALUADOR] Devolviendo estado: {nuevo_estado['estado_actual']}")
         return nuevo_estado
 
+    async def aevaluador_node(self, state: EstadoEntrevista):
+        """Versión asíncrona de ``evaluador_node``, usada por ``astream``.
+
+        Además manda la última respuesta al evaluador por lotes sin esperar
+        la puntuación, así el turno no espera al modelo. La puntuación se
+        guarda en el turno al llegar, y el informe la espera.
+        """
+        if self.evaluador is not None and state["estado_actual"] in PREGUNTAS:
+            self._lanzar_evaluacion(state["turnos"].last_answered())
+        return self.evaluador_node(state)
+
+    def _lanzar_evaluacion(self, turno: Turn | None) -> None:
+        """Puntúa un turno en segundo plano, si no está puntuado ya"""
+        if turno is None or turno.score is not None:
+            return
+        if any(evaluado is turno for evaluado in self._evaluaciones.values()):
+            return
+        pregunta = self._texto_pregunta(turno.phase, turno.question)
+
+        async def evaluar():
+            turno.score = await self.evaluador.evaluate(pregunta, turno.answer)
+
+        tarea = asyncio.get_running_loop().create_task(evaluar())
+        self._evaluaciones[tarea] = turno
+        tarea.add_done_callback(lambda t: self._evaluaciones.pop(t, None))
+
+    def cancelar_evaluaciones(self) -> None:
+        """Cancela las puntuaciones en curso, p. ej. al liberar la sesión.
+
+        Así no escriben en un estado que ya no se va a guardar; las respuestas
+        sin puntuar se puntúan al generar el informe.
+        """
+        for tarea in list(self._evaluaciones):
+            tarea.cancel()
+        self._evaluaciones = {}
+
+    async def _puntuar_pendientes(self, turnos: TurnLog) -> None:
+        """Puntúa las respuestas del registro que siguen sin puntuación.
+
+        Son la de la pregunta inicial, que no pasa por el evaluador, y las
+        puntuadas en otro worker o antes de recargar el estado del almacén,
+        cuya puntuación llegó a una copia anterior del registro.
+        """
+        if self.evaluador is None:
+            return
+        pendientes = [t for t in turnos if t.answer is not None and t.score is None]
+        puntuaciones = await asyncio.gather(
+            *(
+                self.evaluador.evaluate(self._texto_pregunta(t.phase, t.question), t.answer)
+                for t in pendientes
+            )
+        )
+        for turno, puntuacion in zip(pendientes, puntuaciones, strict=True):
+            turno.score = puntuacion
+
+    def _resumen_puntuaciones(self, turnos: TurnLog | None) -> str:
+        """Puntuación media de las respuestas evaluadas en cada estado"""
+        partes = []
+        for fase, nombre in enumerate(PREGUNTAS):
+            fases = (INTRO_PHASE, fase) if fase == 0 else (fase,)
+            puntuaciones = turnos.scores(*fases) if turnos is not None else []
+            if puntuaciones:
+                partes.append(f"{nombre} {sum(puntuaciones) / len(puntuaciones):.1f}")
+        return ", ".join(partes) or "No disponible"
+
     def _get_siguiente_estado(self, estado_actual: str) -> str:
         """Determina el siguiente estado de la entrevista"""
         estados_orden = {
@@ -170,29 +307,72 @@ class InterviewAgent:
         }
         return estados_orden.get(estado_actual, "informe")
 
-    def informe_node(self, state: EstadoEntrevista):
-        """Nodo que genera el informe final de la entrevista"""
-        print("\n[INFORME] Generando informe final")
-        info = state["informacion_recopilada"]
-        print("[INFORME] Información recopilada:", info.keys())
-        
-        prompt = f"""
+    def prompt_informe(self, info: dict, turnos: TurnLog | None = None) -> str:
+        """Construye el prompt del informe final a partir de la información recopilada"""
+        return f"""
         Genera un informe detallado de la entrevista con la siguiente información:
         
         Presentación: {info.get('presentacion', 'No proporcionada')}
         Experiencia: {info.get('experiencia', 'No proporcionada')}
         Conocimientos Técnicos: {info.get('tecnico', 'No proporcionados')}
         
+        Puntuación media de las respuestas (0-10): {self._resumen_puntuaciones(turnos)}
+        
+        Comportamiento observado durante la entrevista:
+        {self.observaciones.summary()}
+        
         El informe debe incluir:
         1. Resumen del perfil
         2. Puntos fuertes
         3. Áreas de mejora
         4. Recomendación final
         """
+
+    def _clave_informe(self, prompt: str) -> str:
+        """Clave del informe en la caché.
+
+        El prompt ya incluye la información recopilada y las observaciones;
+        se añaden su versión y el modelo que genera el informe.
+        """
+        modelo = getattr(self.model, "model_name", None) or type(self.model).__name__
+        return ReportCache.key(PROMPT_INFORME_VERSION, modelo, prompt)
+
+    def informe_node(self, state: EstadoEntrevista):
+        """Nodo que genera el informe final de la entrevista"""
+        print("\n[INFORME] Generando informe final")
+        info = state["informacion_recopilada"]
+        print("[INFORME] Información recopilada:", info.keys())
+        prompt = self.prompt_informe(info, state["turnos"])
         
-        informe = self.model.invoke([HumanMessage(content=prompt)])
+        informe = self.report_cache.get_or_create(
+            self._clave_informe(prompt),
+            lambda: gemini_retry.run_sync(
+                lambda: self.model.invoke([HumanMessage(content=prompt)])
+            ).content,
+        )
         print("[INFORME] Informe generado correctamente")
-        return {"messages": [informe]}
+        return {"informe_final": informe}
+
+    async def ainforme_node(self, state: EstadoEntrevista):
+        """Versión asíncrona de ``informe_node``, usada por ``astream``"""
+        print("\n[INFORME] Generando informe final")
+        info = state["informacion_recopilada"]
+        print("[INFORME] Información recopilada:", info.keys())
+        if self._evaluaciones:
+            # Cada puntuación tiene su propio límite de tiempo en el evaluador
+            await asyncio.wait(list(self._evaluaciones))
+        await self._puntuar_pendientes(state["turnos"])
+        prompt = self.prompt_informe(info, state["turnos"])
+
+        async def generar():
+            informe = await gemini_retry.run(
+                lambda: self.model.ainvoke([HumanMessage(content=prompt)])
+            )
+            return informe.content
+
+        informe = await self.report_cache.aget_or_create(self._clave_informe(prompt), generar)
+        print("[INFORME] Informe generado correctamente")
+        return {"informe_final": informe}
 
     def _setup_graph(self):
         """Configura el grafo de la entrevista"""
@@ -200,8 +380,10 @@ class InterviewAgent:
         
         # Añadimos los nodos
         workflow.add_node("entrevistador", self.entrevistador_node)
-        workflow.add_node("evaluador", self.evaluador_node)
-        workflow.add_node("informe", self.informe_node)
+        # El evaluador y el informe tienen versión asíncrona: stream usa la
+        # síncrona y astream la asíncrona, sin pasar por hilos
+        workflow.add_node("evaluador", RunnableLambda(self.evaluador_node, afunc=self.aevaluador_node))
+        workflow.add_node("informe", RunnableLambda(self.informe_node, afunc=self.ainforme_node))
         
         # Configuramos el flujo
         workflow.add_edge(START, "entrevistador")
@@ -219,22 +401,39 @@ class InterviewAgent:
         workflow.add_edge("informe", END)
         
         print("[SETUP] Grafo configurado con flujo: START -> entrevistador -> evaluador -> (informe|entrevistador)")
-        return workflow.compile(checkpointer=self.memory)
+        # Sin checkpointer: cada turno recibe el estado completo como entrada
+        return workflow.compile()
 
     def _initialize_state(self):
         """Inicializa el estado de la entrevista"""
+        turnos = TurnLog()
+        turnos.ask(INTRO_PHASE, 0)
         return {
             "estado_actual": "presentacion",
             "informacion_recopilada": {},
-            "messages": [
-                SystemMessage(content="¿Podrías hacer una breve presentación sobre ti?")
-            ]
+            "turnos": turnos,
         }
 
-    def process_response(self, user_response: str) -> dict:
-        """Procesa la respuesta del usuario y devuelve la siguiente acción"""
+    def _texto_pregunta(self, fase: int, pregunta: int) -> str:
+        """Texto de la pregunta ``pregunta`` del estado en la posición ``fase``"""
+        if fase == INTRO_PHASE:
+            return INTRO
+        return self.estados[PREGUNTAS[fase]]["preguntas"][pregunta]
+
+    def guardar_transcripcion(self, store: TranscriptStore, run_id: str) -> None:
+        """Guarda en ``store`` los turnos nuevos o respondidos, y el informe al terminar"""
+        store.record_turns(run_id, self.current_state["turnos"], self._texto_pregunta, nombre_fase)
+        if self.interview_completed:
+            store.complete(run_id, self.final_report, time.time())
+
+    def messages(self):
+        """Conversación como mensajes de LangChain, construidos al pedirlos"""
+        return self.current_state["turnos"].to_messages(self._texto_pregunta)
+
+    def _preparar_turno(self, user_response: str) -> dict | None:
+        """Añade la respuesta al estado, o devuelve el informe si ya se terminó"""
         print(f"\n1. [PROCESS] Procesando respuesta: {user_response[:50]}...")
-        print(f"1. [PROCESS] Estado actual: {self.current_state}")
+        print(f"1. [PROCESS] Turnos registrados: {len(self.current_state['turnos'])}")
         print(f"1. [PROCESS] Estado actual antes de procesar: {self.current_state['estado_actual']}")
         
         if self.interview_completed:
@@ -242,39 +441,97 @@ class InterviewAgent:
             return {"anwser": self.final_report}
 
         # Añadimos la respuesta del usuario al estado actual
-        self.current_state["messages"].append(HumanMessage(content=user_response))
-        
+        self.current_state["turnos"].answer(user_response)
+        return None
+
+    def _procesar_actualizacion(self, next_state: dict) -> dict | None:
+        """Procesa una actualización del grafo.
+
+        El grafo encadena entrevistador -> evaluador -> entrevistador sin
+        esperar al candidato. El entrevistador empieza volviendo a hacer la
+        pregunta ya respondida, que el registro de turnos no repite, así que
+        el turno termina con la primera pregunta sin respuesta (o el informe).
+        Tras la pregunta inicial, esa es la primera del guion, sin pasar por
+        el evaluador.
+
+        Devuelve la respuesta del turno, o None si hay que seguir leyendo.
+        """
+        print(f"1. [PROCESS] Actualización recibida: {list(next_state)}")
+
+        # Si tenemos un informe, lo procesamos
+        if "informe" in next_state:
+            self.interview_completed = True
+            self.final_report = next_state["informe"]["informe_final"]
+            return {"question": self.final_report}
+
+        if "evaluador" in next_state:
+            self.current_state = next_state["evaluador"]
+            return None
+
+        # Si el entrevistador ha hecho una pregunta nueva, la devolvemos
+        nuevo_estado = next_state.get("entrevistador", {})
+        if nuevo_estado.get("estado_actual") in PREGUNTAS:
+            turno = nuevo_estado["turnos"].last
+            if turno.answer is None:
+                self.current_state = nuevo_estado
+                return {"question": self._texto_pregunta(turno.phase, turno.question)}
+        return None
+
+    def _error_turno(self, origen: str, error: Exception) -> dict:
+        """Respuesta del turno cuando falla el grafo"""
+        print(f"[ERROR] Error en {origen}: {error!s}")
+        logging.error(f"Error procesando la respuesta: {error!s}")
+        return {"question": ERROR_ENTREVISTA}
+
+    def _resultado_turno(self, respuesta: dict | None) -> dict:
+        """Respuesta del turno una vez leído el grafo"""
+        if respuesta is None:
+            # Si no hay nueva pregunta, mantenemos la última
+            return {"question": MAS_DETALLES}
+        return respuesta
+
+    def process_response(self, user_response: str) -> dict:
+        """Procesa la respuesta del usuario y devuelve la siguiente acción"""
+        respuesta = self._preparar_turno(user_response)
+        if respuesta is not None:
+            return respuesta
         try:
             thread_config = {"configurable": {"thread_id": self.thread_id}}
-            
-            # Mantenemos solo una llamada al stream
-            next_state = next(self.graph.stream(
-                self.current_state,
-                config=thread_config
-            ))
-            
-            print(f"1. [PROCESS] Estado recibido: {next_state}")
-            
-            # Si tenemos un informe, lo procesamos
-            if "informe" in next_state:
-                self.interview_completed = True
-                self.final_report = next_state["informe"]["messages"][-1].content
-                return {"question": self.final_report}
-            
-            # Si tenemos un nuevo estado del entrevistador, actualizamos y devolvemos la pregunta
-            if "entrevistador" in next_state:
-                nuevo_estado = next_state["entrevistador"]
-                if "messages" in nuevo_estado and nuevo_estado["messages"]:
-                    self.current_state = nuevo_estado
-                    return {"question": nuevo_estado["messages"][-1].content}
-            
-            # Si no hay nueva pregunta, mantenemos la última
-            return {"question": "Por favor, proporciona más detalles en tu respuesta."}
-            
+            for next_state in self.graph.stream(self.current_state, config=thread_config):
+                respuesta = self._procesar_actualizacion(next_state)
+                if respuesta is not None:
+                    break
+        except Exception as e:
+            return self._error_turno("process_response", e)
+        return self._resultado_turno(respuesta)
+
+    async def aprocess_response(self, user_response: str) -> dict:
+        """Versión asíncrona de ``process_response``.
+
+        Usa ``astream`` y ``ainvoke`` del modelo, así que no bloquea el bucle
+        de eventos del servidor. Si la tarea se cancela (p. ej. el cliente
+        cierra el websocket), la llamada al modelo en curso se cancela también.
+        """
+        respuesta = self._preparar_turno(user_response)
+        if respuesta is not None:
+            return respuesta
+        try:
+            thread_config = {"configurable": {"thread_id": self.thread_id}}
+            async with aclosing(self.graph.astream(self.current_state, config=thread_config)) as stream:
+                async for next_state in stream:
+                    respuesta = self._procesar_actualizacion(next_state)
+                    if respuesta is not None:
+                        break
         except Exception as e:
-            print(f"[ERROR] Error en process_response: {str(e)}")
-            logging.error(f"Error procesando la respuesta: {str(e)}")
-            return {"question": "Lo siento, ha ocurrido un error en la entrevista."}
+            return self._error_turno("aprocess_response", e)
+        return self._resultado_turno(respuesta)
+
+    def pregunta_actual(self) -> dict:
+        """Última pregunta hecha al candidato, o el informe si ya terminó"""
+        if self.interview_completed:
+            return {"question": self.final_report}
+        turno = self.current_state["turnos"].last
+        return {"question": self._texto_pregunta(turno.phase, turno.question)}
 
     def get_current_state(self):
         """Devuelve el estado actual de la entrevista"""
@@ -292,6 +549,42 @@ class InterviewAgent:
         self.final_report = None
         self.current_question_index = 0
         self.thread_id = f"interview_thread_{id(self)}"
+        self.observaciones = ObservationBuffer()
+        self.cancelar_evaluaciones()
         for estado in self.estados.values():
             estado["completado"] = False
-        print("[RESET] Entrevista reiniciada correctamente")
\ No newline at end of file
+        print("[RESET] Entrevista reiniciada correctamente")
+
+    def to_dict(self) -> dict:
+        """Serializa el estado de la entrevista para guardarlo en un almacén compartido"""
+        return {
+            "current_state": {
+                "estado_actual": self.current_state["estado_actual"],
+                "informacion_recopilada": self.current_state["informacion_recopilada"],
+                "turnos": self.current_state["turnos"].to_dict(),
+            },
+            "completados": [
+                nombre for nombre, estado in self.estados.items() if estado["completado"]
+            ],
+            "interview_completed": self.interview_completed,
+            "final_report": self.final_report,
+            "current_question_index": self.current_question_index,
+            "thread_id": self.thread_id,
+        }
+
+    def load_dict(self, data: dict) -> None:
+        """Restaura un estado generado por ``to_dict`` (p. ej. desde otro worker)"""
+        current_state = data["current_state"]
+        # Las puntuaciones en curso son de turnos del estado que se reemplaza
+        self.cancelar_evaluaciones()
+        self.current_state = {
+            "estado_actual": current_state["estado_actual"],
+            "informacion_recopilada": current_state["informacion_recopilada"],
+            "turnos": TurnLog.from_dict(current_state["turnos"]),
+        }
+        for nombre, estado in self.estados.items():
+            estado["completado"] = nombre in data["completados"]
+        self.interview_completed = data["interview_completed"]
+        self.final_report = data["final_report"]
+        self.current_question_index = data["current_question_index"]
+        self.thread_id = data["thread_id"]
\ No newline at end of file
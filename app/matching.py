@@ -0,0 +1,292 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Matching of candidate CVs against job offers.
+
+CVs and offers are split into sections (paragraphs), each section is
+embedded, and a profile is represented by the normalized mean of its
+section vectors. Candidates and offers are kept in two float32 matrices, so
+ranking one side against the other is a single matrix product followed by a
+partial sort.
+
+The index is incremental and lives on disk under ``MATCHING_INDEX_PATH``:
+
+    meta.json           embedding dimension
+    <side>.vectors      raw float32 rows, appended
+    <side>.ids          one id per line, appended
+
+Adding a profile with an existing id appends a new row that supersedes the
+old one; ``compact`` rewrites the files without superseded rows.
+"""
+
+import json
+import logging
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL, HashingEmbeddings
+
+MATCHING_INDEX_PATH = os.getenv("MATCHING_INDEX_PATH", ".persist_matching_index")
+CANDIDATES = "candidates"
+OFFERS = "offers"
+
+_SECTION_SPLIT = re.compile(r"\n\s*\n")
+
+
+def split_sections(text: str) -> list[str]:
+    """Split a CV or offer into its non-empty paragraphs."""
+    sections = [s.strip() for s in _SECTION_SPLIT.split(text)]
+    return [s for s in sections if s] or [text.strip()]
+
+
+def get_matching_embedding() -> Embeddings:
+    """Vertex AI embeddings when credentials are available, else local ones.
+
+    Matching is incremental, so the local backend uses hashing embeddings,
+    which need no fitting on a corpus.
+    """
+    if EMBEDDING_BACKEND == "local":
+        return HashingEmbeddings()
+    try:
+        import google.auth
+        from langchain_google_vertexai import VertexAIEmbeddings
+
+        google.auth.default()
+        return VertexAIEmbeddings(model_name=EMBEDDING_MODEL)
+    except Exception as e:
+        logging.warning(f"Using local hashing embeddings for matching: {e}")
+        return HashingEmbeddings()
+
+
+class _Side:
+    """Append-only matrix of profile vectors for one side of the index."""
+
+    def __init__(self, directory: Path, name: str, dim: int) -> None:
+        self.vectors_path = directory / f"{name}.vectors"
+        self.ids_path = directory / f"{name}.ids"
+        self.dim = dim
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.live = np.zeros(0, dtype=bool)
+        self.size = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.vectors_path.exists() or not self.ids_path.exists():
+            return
+        ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+        vectors = np.fromfile(self.vectors_path, dtype=np.float32)
+        vectors = vectors[: len(vectors) - len(vectors) % self.dim]
+        vectors = vectors.reshape(-1, self.dim)
+        # A write interrupted between both files leaves them uneven
+        count = min(len(ids), len(vectors))
+        self._append(ids[:count], vectors[:count])
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.matrix):
+            return
+        # Grow geometrically so appends stay amortized O(1)
+        capacity = max(needed, 2 * len(self.matrix), 1024)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[: self.size] = self.matrix[: self.size]
+        live = np.zeros(capacity, dtype=bool)
+        live[: self.size] = self.live[: self.size]
+        self.matrix, self.live = matrix, live
+
+    def _append(self, ids: list[str], vectors: np.ndarray) -> None:
+        self._reserve(len(ids))
+        start = self.size
+        self.matrix[start : start + len(ids)] = vectors
+        self.live[start : start + len(ids)] = True
+        for offset, profile_id in enumerate(ids):
+            previous = self.rows.get(profile_id)
+            if previous is not None:
+                self.live[previous] = False
+            self.rows[profile_id] = start + offset
+        self.ids.extend(ids)
+        self.size += len(ids)
+
+    def add(self, ids: list[str], vectors: np.ndarray) -> None:
+        """Append profiles to the matrix and to the files on disk."""
+        for profile_id in ids:
+            if not profile_id or "\n" in profile_id:
+                raise ValueError(f"Invalid profile id: {profile_id!r}")
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.ids_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{profile_id}\n" for profile_id in ids)
+        self._append(ids, vectors)
+
+    def vector(self, profile_id: str) -> np.ndarray:
+        return self.matrix[self.rows[profile_id]]
+
+    def top_k(self, queries: np.ndarray, k: int) -> list[list[tuple[str, float]]]:
+        """Rank the live rows against each query vector."""
+        if self.size == 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.matrix[: self.size].T
+        scores[:, ~self.live[: self.size]] = -np.inf
+        k = min(k, len(self.rows))
+        if k < self.size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self.size), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)[:, :k]
+        top = np.take_along_axis(top, order, axis=1)
+        return [
+            [(self.ids[row], float(scores[i, row])) for row in query_top]
+            for i, query_top in enumerate(top)
+        ]
+
+    def compact(self) -> None:
+        """Rewrite the files without superseded rows."""
+        keep = np.flatnonzero(self.live[: self.size])
+        ids = [self.ids[row] for row in keep]
+        vectors = self.matrix[keep]
+        self.vectors_path.unlink(missing_ok=True)
+        self.ids_path.unlink(missing_ok=True)
+        self.ids, self.rows, self.size = [], {}, 0
+        self.add(ids, vectors)
+
+
+class MatchingIndex:
+    """Incremental on-disk index of candidate and offer embeddings."""
+
+    def __init__(
+        self,
+        path: str | Path = MATCHING_INDEX_PATH,
+        embedding: Embeddings | None = None,
+    ) -> None:
+        """Open or create an index.
+
+        Args:
+            path: Directory holding the index files.
+            embedding: Embedding model. Defaults to ``get_matching_embedding``.
+                It must produce vectors of the dimension the index was built
+                with, or adding profiles raises ValueError.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.embedding = embedding or get_matching_embedding()
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            dim = json.loads(meta_path.read_text())["dim"]
+        else:
+            dim = len(self.embedding.embed_query("dimension"))
+            meta_path.write_text(json.dumps({"dim": dim}))
+        self.dim = dim
+        self._sides = {
+            CANDIDATES: _Side(self.path, CANDIDATES, dim),
+            OFFERS: _Side(self.path, OFFERS, dim),
+        }
+
+    def __len__(self) -> int:
+        return sum(len(side.rows) for side in self._sides.values())
+
+    def embed_profiles(self, texts: list[str]) -> np.ndarray:
+        """Embed each text as the normalized mean of its section vectors."""
+        sections = [split_sections(text) for text in texts]
+        flat = [section for profile in sections for section in profile]
+        section_vectors = np.asarray(
+            self.embedding.embed_documents(flat), dtype=np.float32
+        )
+        if section_vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Index at {self.path} has dimension {self.dim}, "
+                f"the embedding model produces {section_vectors.shape[1]}"
+            )
+        # Sum the sections of each profile with a single reduceat
+        starts = np.cumsum([0] + [len(profile) for profile in sections[:-1]])
+        vectors = np.add.reduceat(section_vectors, starts, axis=0)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _add(
+        self, side: str, profiles: dict[str, str] | Iterable[tuple[str, str]]
+    ) -> None:
+        items = list(profiles.items() if isinstance(profiles, dict) else profiles)
+        if items:
+            ids, texts = zip(*items, strict=True)
+            self._sides[side].add(list(ids), self.embed_profiles(list(texts)))
+
+    def add_candidates(self, cvs: dict[str, str] | Iterable[tuple[str, str]]) -> None:
+        """Add or update candidates from ``{candidate_id: cv_text}``."""
+        self._add(CANDIDATES, cvs)
+
+    def add_offers(self, offers: dict[str, str] | Iterable[tuple[str, str]]) -> None:
+        """Add or update job offers from ``{offer_id: offer_text}``."""
+        self._add(OFFERS, offers)
+
+    def _queries(
+        self, side: str, ids: list[str] | None, texts: list[str] | None
+    ) -> np.ndarray:
+        if texts is not None:
+            return self.embed_profiles(texts)
+        if ids is None:
+            raise ValueError("Either ids or texts must be given")
+        return np.stack([self._sides[side].vector(i) for i in ids])
+
+    def top_candidates(
+        self,
+        offer_ids: list[str] | None = None,
+        texts: list[str] | None = None,
+        k: int = 10,
+    ) -> list[list[tuple[str, float]]]:
+        """Rank candidates for several offers in one pass.
+
+        Args:
+            offer_ids: Offers already in the index.
+            texts: Offer texts to rank against, instead of ``offer_ids``.
+            k: Number of candidates returned per offer.
+
+        Returns:
+            For each offer, ``(candidate_id, cosine similarity)`` pairs, best
+            first.
+        """
+        queries = self._queries(OFFERS, offer_ids, texts)
+        return self._sides[CANDIDATES].top_k(queries, k)
+
+    def top_offers(
+        self,
+        candidate_ids: list[str] | None = None,
+        texts: list[str] | None = None,
+        k: int = 10,
+    ) -> list[list[tuple[str, float]]]:
+        """Rank offers for several candidates in one pass.
+
+        Args:
+            candidate_ids: Candidates already in the index.
+            texts: CV texts to rank against, instead of ``candidate_ids``.
+            k: Number of offers returned per candidate.
+
+        Returns:
+            For each candidate, ``(offer_id, cosine similarity)`` pairs, best
+            first.
+        """
+        queries = self._queries(CANDIDATES, candidate_ids, texts)
+        return self._sides[OFFERS].top_k(queries, k)
+
+    def compact(self) -> None:
+        """Drop superseded rows from the files on disk."""
+        for side in self._sides.values():
+            side.compact()
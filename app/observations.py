@@ -0,0 +1,198 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded storage for the behaviour observations made during an interview.
+
+The live model reports what it sees on camera (nervousness, hesitation,
+possible inconsistencies) through ``developer_interview_nervous``. Each
+session keeps only the most recent observations in a fixed-capacity ring
+buffer, while counts and a rolling nervousness score are updated
+incrementally, so recording stays O(1) however long the interview runs.
+"""
+
+import re
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_CAPACITY = 32
+# Weight of the newest observation in the rolling score
+ROLLING_ALPHA = 0.3
+NEUTRAL_SCORE = 0.5
+
+# Accent-free word prefixes that hint at nervousness or at composure
+NERVOUS_MARKERS = (
+    "nervios",
+    "ansie",
+    "ansio",
+    "dud",
+    "titube",
+    "tembl",
+    "sudor",
+    "sudand",
+    "tenso",
+    "tensa",
+    "tension",
+    "inquiet",
+    "insegur",
+    "evit",
+    # Forms of "mentir", not the "mient" prefix, which matches "mientras"
+    "miento",
+    "miente",
+    "mienta",
+    "mentir",
+    "inconsisten",
+    "contradic",
+)
+CALM_MARKERS = (
+    "tranquil",
+    "segur",
+    "confiad",
+    "confianza",
+    "relajad",
+    "seren",
+    "calm",
+    "natural",
+)
+# A marker after one of these words is negated ("no estoy seguro") and ignored
+NEGATIONS = frozenset(("no", "ni", "nunca", "sin"))
+# Words before a marker in which a negation applies to it
+NEGATION_WINDOW = 2
+
+
+def _words(text: str) -> list[str]:
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.findall(r"\w+", stripped)
+
+
+def score_observation(text: str) -> float:
+    """Estimate how nervous an observation describes the candidate, in [0, 1].
+
+    Args:
+        text: Free-text observation reported by the model.
+
+    Returns:
+        1.0 for purely nervous markers, 0.0 for purely calm ones and 0.5 when
+        the text has no markers or both kinds equally. Markers right after a
+        negation are ignored.
+    """
+    words = _words(text)
+    nervous = calm = 0
+    for i, word in enumerate(words):
+        if NEGATIONS.intersection(words[max(i - NEGATION_WINDOW, 0) : i]):
+            continue
+        if word.startswith(NERVOUS_MARKERS):
+            nervous += 1
+        elif word.startswith(CALM_MARKERS):
+            calm += 1
+    if nervous + calm == 0:
+        return NEUTRAL_SCORE
+    return nervous / (nervous + calm)
+
+
+@dataclass(slots=True)
+class Observation:
+    """A single timestamped observation."""
+
+    timestamp: float
+    text: str
+    score: float
+
+
+class ObservationBuffer:
+    """Fixed-capacity ring buffer of observations with incremental aggregates."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize an empty buffer.
+
+        Args:
+            capacity: Number of most recent observations kept verbatim.
+        """
+        self.observations: deque[Observation] = deque(maxlen=capacity)
+        self.total = 0
+        self.nervous_count = 0
+        self.calm_count = 0
+        self.rolling_score = NEUTRAL_SCORE
+        self.max_score = 0.0
+
+    def record(self, text: str, timestamp: float | None = None) -> Observation:
+        """Add an observation, evicting the oldest one when full.
+
+        Args:
+            text: Observation reported by the model.
+            timestamp: Unix time of the observation, defaults to now.
+
+        Returns:
+            The stored observation.
+        """
+        score = score_observation(text)
+        observation = Observation(
+            timestamp=time.time() if timestamp is None else timestamp,
+            text=text,
+            score=score,
+        )
+        self.observations.append(observation)
+        if self.total == 0:
+            self.rolling_score = score
+        else:
+            self.rolling_score += ROLLING_ALPHA * (score - self.rolling_score)
+        self.total += 1
+        self.nervous_count += score > NEUTRAL_SCORE
+        self.calm_count += score < NEUTRAL_SCORE
+        self.max_score = max(self.max_score, score)
+        return observation
+
+    def summary(self, recent: int = 5) -> str:
+        """Describe the aggregates and latest observations for the final report."""
+        if self.total == 0:
+            return "Sin observaciones sobre el comportamiento del candidato."
+        latest = list(self.observations)[-recent:]
+        lines = [
+            f"Observaciones registradas: {self.total} "
+            f"(nerviosismo: {self.nervous_count}, tranquilidad: {self.calm_count})",
+            f"Índice de nerviosismo reciente (0-1): {self.rolling_score:.2f}",
+            "Últimas observaciones:",
+            *(f"- {o.text}" for o in latest),
+        ]
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the buffer for the shared state store."""
+        return {
+            "capacity": self.observations.maxlen,
+            "observations": [[o.timestamp, o.text, o.score] for o in self.observations],
+            "total": self.total,
+            "nervous_count": self.nervous_count,
+            "calm_count": self.calm_count,
+            "rolling_score": self.rolling_score,
+            "max_score": self.max_score,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ObservationBuffer":
+        """Rebuild a buffer serialized with ``to_dict``."""
+        buffer = cls(capacity=data["capacity"])
+        buffer.observations.extend(
+            Observation(timestamp=t, text=text, score=score)
+            for t, text, score in data["observations"]
+        )
+        buffer.total = data["total"]
+        buffer.nervous_count = data["nervous_count"]
+        buffer.calm_count = data["calm_count"]
+        buffer.rolling_score = data["rolling_score"]
+        buffer.max_score = data["max_score"]
+        return buffer
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reaping of idle live sessions.
+
+A backgrounded tab or a half-closed network leaves the client websocket
+open with nothing on the other end, and the session would hold its Gemini
+live connection and interview agent forever. Sessions send heartbeats the
+client answers (see ``GeminiSession.send_heartbeats``), so a session that
+has not heard from its client for ``SESSION_IDLE_SECONDS`` is dead: the
+reaper closes it and cancels its task, which closes the live connection and
+releases the worker-local agent. Interview state in the shared store is kept,
+so the candidate can still resume.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from app.drain import SessionRegistry
+
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_INTERVAL_SECONDS", "20"))
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "120"))
+# WebSocket close code 1001: going away
+GOING_AWAY = 1001
+# Longest wait for a close frame to reach a client that may be gone
+CLOSE_TIMEOUT_SECONDS = 1.0
+
+
+class IdleReaper:
+    """Periodically closes the sessions of a registry that went idle."""
+
+    def __init__(
+        self,
+        registry: SessionRegistry,
+        max_idle: float = SESSION_IDLE_SECONDS,
+        struct_logger: Any | None = None,
+    ) -> None:
+        """Initialize the reaper.
+
+        Args:
+            registry: Sessions to watch.
+            max_idle: Seconds without client messages before a session is
+                reaped.
+            struct_logger: Cloud Logging logger for the reaping metrics.
+        """
+        self.registry = registry
+        self.max_idle = max_idle
+        self.struct_logger = struct_logger
+        self.reaped = 0
+
+    async def reap(self, session: Any) -> None:
+        """Close a session and cancel the task running it."""
+        idle = session.idle_seconds
+        # Tells the session its cancellation is a normal end
+        session.reaped = True
+        try:
+            await asyncio.wait_for(
+                session.websocket.close(code=GOING_AWAY, reason="Session idle"),
+                timeout=CLOSE_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            logging.debug(f"Could not close idle session {session.state_key}: {e}")
+        task = self.registry.task(session)
+        if task is not None:
+            task.cancel()
+        self.reaped += 1
+        payload = {
+            **session.media_stats(),
+            "type": "session_reaped",
+            "idle_seconds": round(idle),
+            "pending_tool_calls": session.pending_tool_calls,
+            "reaped_total": self.reaped,
+        }
+        if self.struct_logger is not None:
+            self.struct_logger.log_struct(payload, severity="WARNING")
+        else:
+            logging.warning(json.dumps(payload))
+
+    async def reap_idle(self) -> int:
+        """Reap the sessions idle past the threshold.
+
+        Returns:
+            Number of sessions reaped.
+        """
+        idle = [
+            session
+            for session in self.registry.sessions()
+            if session.idle_seconds > self.max_idle
+        ]
+        for session in idle:
+            await self.reap(session)
+        return len(idle)
+
+    async def run(self, interval: float | None = None) -> None:
+        """Reap idle sessions until cancelled.
+
+        Args:
+            interval: Seconds between checks. Defaults to a quarter of the
+                idle threshold.
+        """
+        interval = interval or self.max_idle / 4
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logging.error(f"Error reaping idle sessions: {e!s}")
@@ -0,0 +1,210 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Recording of the frames relayed by a live session.
+
+Recording is opt-in: when ``RECORDING_DIR`` is set, every session appends the
+client messages and raw Gemini frames it relays to ``<session id>.rec`` in
+that directory. Recordings can be replayed offline with ``app.replay``.
+
+Frames are written by a background thread, so the relay never waits on the
+disk; if the writer falls behind by ``RECORDING_QUEUE_FRAMES`` frames, new
+frames are dropped from the recording. The candidate's CV and the job offer
+are removed from the setup message before it is recorded.
+
+Recordings still hold the candidate's raw microphone audio and webcam video,
+which is personal data. Only enable recording to debug or benchmark, keep
+``RECORDING_DIR`` readable by operators only, and delete recordings as soon
+as they are no longer needed; nothing here expires them.
+
+The file format is append-only so a crashed session still leaves a readable
+prefix:
+
+    header     ``MAGIC``
+    record     ``<dBI`` seconds since start, direction, payload length,
+               followed by the payload bytes
+
+Readers memory-map the file and return payloads as zero-copy memoryviews.
+"""
+
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+RECORDING_DIR = os.getenv("RECORDING_DIR", "")
+# Frames waiting to be written before new ones are dropped
+RECORDING_QUEUE_FRAMES = int(os.getenv("RECORDING_QUEUE_FRAMES", "10000"))
+# Setup fields kept out of recordings
+REDACTED_SETUP_KEYS = frozenset(("cv", "job_offer"))
+MAGIC = b"IVREC\x01"
+CLIENT_FRAME = 0
+GEMINI_FRAME = 1
+
+_RECORD = struct.Struct("<dBI")
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """A recorded frame."""
+
+    timestamp: float
+    direction: int
+    payload: memoryview
+
+
+def redact(message: Any) -> Any:
+    """Return a client message without the candidate's CV and the job offer."""
+    if not isinstance(message, dict) or not isinstance(message.get("setup"), dict):
+        return message
+    setup = {
+        key: value
+        for key, value in message["setup"].items()
+        if key not in REDACTED_SETUP_KEYS
+    }
+    return {**message, "setup": setup}
+
+
+class SessionRecorder:
+    """Appends the frames of one session to a recording file."""
+
+    def __init__(
+        self, path: str | Path, max_pending: int = RECORDING_QUEUE_FRAMES
+    ) -> None:
+        """Open a new recording.
+
+        Args:
+            path: File to create. Parent directories are created if needed.
+            max_pending: Frames queued for the writer before new ones are
+                dropped.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._started = time.monotonic()
+        self._queue: queue.Queue[bytes | None] = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self.frames = 0
+        self.dropped = 0
+        self._writer = threading.Thread(
+            target=self._write_frames, name=f"recorder-{self.path.stem}", daemon=True
+        )
+        self._writer.start()
+
+    @classmethod
+    def from_env(cls) -> "SessionRecorder | None":
+        """Create a recorder in ``RECORDING_DIR``, or None if recording is off."""
+        if not RECORDING_DIR:
+            return None
+        try:
+            return cls(Path(RECORDING_DIR) / f"{uuid.uuid4()}.rec")
+        except OSError as e:
+            logging.warning(f"Session recording disabled: {e}")
+            return None
+
+    def record(self, direction: int, payload: bytes) -> None:
+        """Queue a frame received at the current time for the writer.
+
+        Never blocks: the frame is dropped if the writer is too far behind.
+
+        Args:
+            direction: ``CLIENT_FRAME`` or ``GEMINI_FRAME``.
+            payload: Raw frame bytes.
+        """
+        if self._closed:
+            return
+        timestamp = time.monotonic() - self._started
+        record = _RECORD.pack(timestamp, direction, len(payload)) + payload
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.frames += 1
+
+    def _write_frames(self) -> None:
+        try:
+            while (record := self._queue.get()) is not None:
+                self._file.write(record)
+        except OSError as e:
+            logging.warning(f"Stopped recording to {self.path}: {e}")
+        finally:
+            self._file.close()
+
+    def close(self) -> None:
+        """Write the queued frames and close the recording.
+
+        Waits for the writer, so call it off the event loop.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        logging.info(
+            f"Recorded {self.frames} frames to {self.path}"
+            + (f", dropped {self.dropped}" if self.dropped else "")
+        )
+
+
+class RecordingReader:
+    """Memory-mapped reader of a recording file."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open a recording.
+
+        Args:
+            path: Recording file written by ``SessionRecorder``.
+
+        Raises:
+            ValueError: If the file is not a recording.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a session recording")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def __iter__(self) -> Iterator[Frame]:
+        offset = len(MAGIC)
+        size = len(self._view)
+        while offset + _RECORD.size <= size:
+            timestamp, direction, length = _RECORD.unpack_from(self._view, offset)
+            offset += _RECORD.size
+            if offset + length > size:
+                # Truncated last record of a session that did not close cleanly
+                break
+            yield Frame(timestamp, direction, self._view[offset : offset + length])
+            offset += length
+
+    def close(self) -> None:
+        """Release the memory map. Frames read earlier become invalid."""
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "RecordingReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,138 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Binary audio framing between the backend and the browser.
+
+By default Gemini messages are relayed verbatim, so audio reaches the browser
+as base64 text inside JSON. Clients that send ``"audio_framing": "binary"``
+in their ``setup`` message instead receive model audio as raw PCM in binary
+websocket frames, prefixed with a 6-byte header:
+
+    byte 0     frame type (``AUDIO_FRAME_TYPE``)
+    byte 1     protocol version
+    bytes 2-5  sample rate in Hz, unsigned 32-bit little endian
+
+JSON frames always start with ``{``, so the first byte is enough to tell both
+kinds apart. Control, tool and text messages keep being sent as JSON.
+"""
+
+import base64
+import json
+import re
+import struct
+from typing import Any
+
+AUDIO_FRAME_TYPE = 0x01
+PROTOCOL_VERSION = 1
+BINARY_FRAMING = "binary"
+DEFAULT_SAMPLE_RATE = 24000
+
+_HEADER = struct.Struct("<BBI")
+_RATE_PATTERN = re.compile(r"rate=(\d+)")
+
+
+def encode_audio_frame(pcm: bytes, sample_rate: int) -> bytes:
+    """Prefix raw PCM audio with the binary frame header."""
+    return _HEADER.pack(AUDIO_FRAME_TYPE, PROTOCOL_VERSION, sample_rate) + pcm
+
+
+def decode_audio_frame(frame: bytes) -> tuple[int, bytes]:
+    """Split a binary audio frame into its sample rate and PCM payload.
+
+    Raises:
+        ValueError: If the frame is not an audio frame.
+    """
+    if len(frame) < _HEADER.size or frame[0] != AUDIO_FRAME_TYPE:
+        raise ValueError("Not a binary audio frame")
+    _, _, sample_rate = _HEADER.unpack_from(frame)
+    return sample_rate, frame[_HEADER.size :]
+
+
+def _sample_rate(mime_type: str) -> int:
+    match = _RATE_PATTERN.search(mime_type)
+    return int(match.group(1)) if match else DEFAULT_SAMPLE_RATE
+
+
+def split_audio(
+    message: dict[str, Any],
+) -> tuple[list[bytes], dict[str, Any] | None]:
+    """Extract model audio from a Gemini server message.
+
+    Args:
+        message: Parsed ``LiveServerMessage`` JSON.
+
+    Returns:
+        The encoded binary audio frames, and the message without its audio
+        parts, or None if nothing else is left to send.
+    """
+    model_turn = message.get("serverContent", {}).get("modelTurn")
+    if not model_turn:
+        return [], message
+
+    frames = []
+    other_parts = []
+    for part in model_turn.get("parts", []):
+        inline_data = part.get("inlineData")
+        if inline_data and inline_data.get("mimeType", "").startswith("audio/pcm"):
+            frames.append(
+                encode_audio_frame(
+                    base64.b64decode(inline_data["data"]),
+                    _sample_rate(inline_data["mimeType"]),
+                )
+            )
+        else:
+            other_parts.append(part)
+    if not frames:
+        return [], message
+
+    server_content = dict(message["serverContent"])
+    if other_parts:
+        server_content["modelTurn"] = {**model_turn, "parts": other_parts}
+    else:
+        del server_content["modelTurn"]
+    remainder = {**message, "serverContent": server_content}
+    if not server_content:
+        del remainder["serverContent"]
+    return frames, remainder or None
+
+
+def model_audio(message: dict[str, Any]) -> list[tuple[int, bytes]]:
+    """Decode the model audio of a Gemini server message.
+
+    Returns:
+        The sample rate and raw PCM of each audio part.
+    """
+    model_turn = message.get("serverContent", {}).get("modelTurn") or {}
+    audio = []
+    for part in model_turn.get("parts", []):
+        inline_data = part.get("inlineData")
+        if inline_data and inline_data.get("mimeType", "").startswith("audio/pcm"):
+            audio.append(
+                (
+                    _sample_rate(inline_data["mimeType"]),
+                    base64.b64decode(inline_data["data"]),
+                )
+            )
+    return audio
+
+
+def audio_message(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw PCM in a Gemini server message, for JSON-framed clients."""
+    part = {
+        "inlineData": {
+            "mimeType": f"audio/pcm;rate={sample_rate}",
+            "data": base64.b64encode(pcm).decode("ascii"),
+        }
+    }
+    return json.dumps({"serverContent": {"modelTurn": {"parts": [part]}}}).encode()
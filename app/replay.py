@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic replay of recorded sessions through ``GeminiSession``.
+
+A recording made with ``RECORDING_DIR`` is fed back through the real relay
+code against a stub Gemini live session and a stub client websocket, so
+latency and CPU regressions can be reproduced without network access:
+
+    python -m app.replay recordings/<session>.rec --speed 0
+
+``--speed 1`` replays at the recorded pace, higher values accelerate it and
+``0`` sends every frame as fast as possible. Tool calls are answered by stub
+tools unless real ones are passed to ``replay``.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.gemini_session import GeminiSession
+from app.recording import CLIENT_FRAME, GEMINI_FRAME, RecordingReader
+
+
+class _Clock:
+    """Schedules frames at their recorded time, scaled by the replay speed."""
+
+    def __init__(self, speed: float) -> None:
+        self.speed = speed
+        self.started = time.monotonic()
+        self.max_lag = 0.0
+
+    async def wait_until(self, timestamp: float) -> None:
+        if self.speed <= 0:
+            await asyncio.sleep(0)
+            return
+        due = self.started + timestamp / self.speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.max_lag = max(self.max_lag, time.monotonic() - due)
+
+
+class StubLiveWebSocket:
+    """Stands in for the Gemini websocket, replaying the recorded frames."""
+
+    def __init__(self, frames: list[tuple[float, bytes]], clock: _Clock) -> None:
+        self._frames = iter(frames)
+        self._clock = clock
+        self.sent_messages = 0
+        self.sent_bytes = 0
+
+    async def recv(self, decode: bool = True) -> bytes | str:
+        frame = next(self._frames, None)
+        if frame is None:
+            return b""
+        timestamp, payload = frame
+        await self._clock.wait_until(timestamp)
+        return payload if not decode else payload.decode()
+
+    async def send(self, message: str | bytes) -> None:
+        self.sent_messages += 1
+        self.sent_bytes += len(message)
+
+
+class StubLiveSession:
+    """Stands in for ``AsyncSession`` of the Gemini live API."""
+
+    def __init__(self, frames: list[tuple[float, bytes]], clock: _Clock) -> None:
+        self._ws = StubLiveWebSocket(frames, clock)
+        self.tool_responses: list[Any] = []
+
+    async def send(self, input: Any = None, end_of_turn: bool = False) -> None:
+        self.tool_responses.append(input)
+
+
+class StubClientWebSocket:
+    """Stands in for the browser websocket, replaying the recorded messages."""
+
+    def __init__(self, frames: list[tuple[float, bytes]], clock: _Clock) -> None:
+        self._frames = iter(frames)
+        self._clock = clock
+        self.sent_messages = 0
+        self.sent_bytes = 0
+
+    async def receive_json(self) -> Any:
+        frame = next(self._frames, None)
+        if frame is None:
+            raise EOFError("End of recording")
+        timestamp, payload = frame
+        await self._clock.wait_until(timestamp)
+        return json.loads(payload)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent_messages += 1
+        self.sent_bytes += len(data)
+
+    async def send_json(self, data: Any) -> None:
+        await self.send_bytes(json.dumps(data).encode())
+
+
+class _StubTools(dict):
+    """Tool mapping that answers any tool the recording calls."""
+
+    def get(self, name: str, default: Any = None) -> Callable:
+        if name in self:
+            return self[name]
+        return lambda **kwargs: {"result": f"replayed {name}"}
+
+
+def load_frames(
+    path: str | Path,
+) -> tuple[list[tuple[float, bytes]], list[tuple[float, bytes]]]:
+    """Read the client and Gemini frames of a recording into memory."""
+    client_frames = []
+    gemini_frames = []
+    with RecordingReader(path) as reader:
+        for frame in reader:
+            item = (frame.timestamp, bytes(frame.payload))
+            if frame.direction == CLIENT_FRAME:
+                client_frames.append(item)
+            elif frame.direction == GEMINI_FRAME:
+                gemini_frames.append(item)
+            del frame
+    return client_frames, gemini_frames
+
+
+async def replay(
+    path: str | Path,
+    speed: float = 1.0,
+    tool_functions: dict[str, Callable] | None = None,
+) -> dict[str, Any]:
+    """Replay a recording through ``GeminiSession``.
+
+    Args:
+        path: Recording file written by ``SessionRecorder``.
+        speed: Replay speed relative to the recording; 0 means unthrottled.
+        tool_functions: Tools used to answer tool calls. Stub tools are used
+            for any tool that is missing.
+
+    Returns:
+        Replay statistics: wall and CPU time, frame and byte counts, the
+        maximum scheduling lag and the session's media statistics.
+    """
+    client_frames, gemini_frames = load_frames(path)
+    clock = _Clock(speed)
+    session = StubLiveSession(gemini_frames, clock)
+    websocket = StubClientWebSocket(client_frames, clock)
+    gemini_session = GeminiSession(
+        session=session,
+        websocket=websocket,
+        tool_functions=_StubTools(tool_functions or {}),
+    )
+
+    cpu_started = time.process_time()
+    await asyncio.gather(
+        gemini_session.receive_from_client(), gemini_session.receive_from_gemini()
+    )
+    return {
+        "wall_seconds": round(time.monotonic() - clock.started, 4),
+        "cpu_seconds": round(time.process_time() - cpu_started, 4),
+        "client_frames": len(client_frames),
+        "gemini_frames": len(gemini_frames),
+        "messages_to_gemini": session._ws.sent_messages,
+        "bytes_to_gemini": session._ws.sent_bytes,
+        "messages_to_client": websocket.sent_messages,
+        "bytes_to_client": websocket.sent_bytes,
+        "tool_responses": len(session.tool_responses),
+        "max_lag_ms": round(clock.max_lag * 1000, 2),
+        **gemini_session.media_stats(),
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, help="Recording file to replay")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed, 1 for real time and 0 for as fast as possible",
+    )
+    args = parser.parse_args()
+    stats = asyncio.run(replay(args.recording, speed=args.speed))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
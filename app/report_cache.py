@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of generated interview reports.
+
+The final report takes a multi-second model call, and the same report can be
+requested more than once: the live model may call the tool again around the
+end of the interview, or a reconnect may replay the last turn. Reports are
+cached under a hash of everything that goes into the prompt, and concurrent
+requests for the same key share a single generation (single-flight), both
+from threads and from coroutines.
+
+The cache keeps the ``REPORT_CACHE_MAX_ENTRIES`` most recently used reports.
+When ``REPORT_CACHE_DIR`` is set, they are also stored there as one file per
+report, so they survive restarts and are shared by workers on the same disk.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "")
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "1000"))
+SUFFIX = ".report"
+
+
+class _Flight:
+    """A generation in progress in a thread, awaited by other threads."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.report: str | None = None
+        self.error: BaseException | None = None
+
+
+class _AsyncFlight:
+    """A generation in progress in a task, shared by the coroutines awaiting it."""
+
+    def __init__(self, task: asyncio.Task[str]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class ReportCache:
+    """Bounded LRU cache of reports with single-flight generation."""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Create a cache.
+
+        Args:
+            directory: Directory the reports are stored in. Without one, the
+                cache is kept in memory only.
+            max_entries: Maximum number of reports kept.
+        """
+        self.directory = Path(directory) if directory else None
+        self.max_entries = max_entries
+        # Reports read from disk are loaded on first use (None until then)
+        self._entries: OrderedDict[str, str | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._async_flights: dict[str, _AsyncFlight] = {}
+        self.hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            paths = sorted(
+                self.directory.glob(f"*{SUFFIX}"), key=lambda p: p.stat().st_mtime
+            )
+            for path in paths:
+                self._entries[path.stem] = None
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Hash JSON-serializable parts of a prompt into a cache key."""
+        data = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached report for ``key``, if any."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            report = self._entries[key]
+        if report is None:
+            try:
+                report = self._path(key).read_text(encoding="utf-8")
+            except OSError:
+                # Evicted by another worker sharing the directory
+                with self._lock:
+                    self._entries.pop(key, None)
+                return None
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key] = report
+        return report
+
+    def put(self, key: str, report: str) -> None:
+        """Store a report, evicting the least recently used ones if full."""
+        if self.directory is not None:
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp.write_text(report, encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError as e:
+                logging.warning(f"Could not store report {key}: {e!s}")
+        with self._lock:
+            self._entries[key] = report
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            if self.directory is not None:
+                self._path(key).unlink(missing_ok=True)
+
+    def _lookup(self, key: str) -> str | None:
+        report = self.get(key)
+        with self._lock:
+            if report is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return report
+
+    def get_or_create(self, key: str, generate: Callable[[], str]) -> str:
+        """Return the cached report, or generate it once for all callers.
+
+        Threads asking for a key that is being generated wait for that
+        generation instead of starting another one. Errors are not cached and
+        are raised in every waiting thread.
+        """
+        report = self._lookup(key)
+        if report is not None:
+            return report
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.report
+        try:
+            # Another leader may have finished since the lookup
+            flight.report = self.get(key)
+            if flight.report is None:
+                flight.report = generate()
+                self.put(key, flight.report)
+            return flight.report
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def aget_or_create(
+        self, key: str, generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Async variant of ``get_or_create``.
+
+        The generation runs in its own task. A cancelled caller stops waiting
+        for it, and the generation itself is cancelled once no caller is left.
+        """
+        report = self._lookup(key)
+        if report is not None:
+            return report
+        flight = self._async_flights.get(key)
+        if flight is None or flight.task.done():
+
+            async def run() -> str:
+                report = await generate()
+                self.put(key, report)
+                return report
+
+            flight = _AsyncFlight(asyncio.ensure_future(run()))
+            self._async_flights[key] = flight
+            flight.task.add_done_callback(
+                lambda _, flight=flight: self._forget(key, flight)
+            )
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _AsyncFlight) -> None:
+        if self._async_flights.get(key) is flight:
+            del self._async_flights[key]
+
+
+@lru_cache(maxsize=1)
+def get_report_cache() -> ReportCache:
+    """Report cache shared by every interview of the process."""
+    return ReportCache(REPORT_CACHE_DIR or None)
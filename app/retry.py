@@ -0,0 +1,222 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide, quota-aware retries for Gemini calls.
+
+When Gemini throttles, independent per-call retries from every session turn
+into a stampede that keeps the quota exhausted. All live connects and chat
+model calls go through one ``RetryCoordinator`` instead, which combines:
+
+- a token bucket that caps the rate of attempts across the process,
+- a circuit breaker that, after consecutive failures, stops all attempts
+  until a single probe succeeds,
+- exponential backoff with full jitter, so retries spread out in time.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from google.api_core import exceptions as google_exceptions
+from websockets.exceptions import ConnectionClosedError
+
+T = TypeVar("T")
+
+# Errors that indicate throttling or a transient outage of the model
+RETRYABLE_MODEL_ERRORS: tuple[type[BaseException], ...] = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+RETRYABLE_LIVE_ERRORS: tuple[type[BaseException], ...] = (ConnectionClosedError,)
+
+
+class RetryCoordinator:
+    """Shared token bucket, circuit breaker and jittered backoff."""
+
+    def __init__(
+        self,
+        rate: float = float(os.getenv("GEMINI_ATTEMPTS_PER_SECOND", "10")),
+        burst: float = float(os.getenv("GEMINI_ATTEMPTS_BURST", "20")),
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ) -> None:
+        """Initialize the coordinator.
+
+        Args:
+            rate: Attempts per second allowed across the process.
+            burst: Maximum number of attempts allowed at once.
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds the circuit stays open before a probe.
+            base_delay: Base of the exponential backoff, in seconds.
+            max_delay: Upper bound for a single backoff delay, in seconds.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the circuit currently blocks attempts."""
+        return time.monotonic() < self._open_until
+
+    def _reserve(self) -> float:
+        """Try to take an attempt slot.
+
+        Returns:
+            0 if the attempt may proceed, otherwise the seconds to wait first.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._open_until:
+                return self._open_until - now
+            if self._consecutive_failures >= self.failure_threshold:
+                # Half-open: a single probe decides whether to close the circuit
+                if self._probe_in_flight:
+                    return min(self.reset_timeout, 1.0)
+                self._probe_in_flight = True
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            if self._tokens < 1:
+                self._probe_in_flight = False
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            return 0.0
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful attempt."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a throttled or failed attempt, opening the circuit if needed."""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.reset_timeout
+                logging.warning(
+                    f"Gemini circuit open for {self.reset_timeout}s after "
+                    f"{self._consecutive_failures} consecutive failures"
+                )
+
+    def backoff_delay(self, tries: int) -> float:
+        """Full-jitter exponential delay before retry number ``tries``."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (tries - 1))
+        delay = random.uniform(0, ceiling)
+        with self._lock:
+            # Never retry before the circuit would let the attempt through
+            return max(delay, self._open_until - time.monotonic())
+
+    async def acquire(self) -> None:
+        """Wait until an attempt is allowed."""
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self) -> None:
+        """Blocking variant of ``acquire`` for synchronous callers."""
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+
+    async def run(
+        self,
+        func: Callable[[], Awaitable[T]],
+        retry_on: tuple[type[BaseException], ...] = RETRYABLE_MODEL_ERRORS,
+        max_tries: int = 5,
+        on_backoff: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> T:
+        """Run an async call with coordinated retries.
+
+        Args:
+            func: Coroutine function performing one attempt.
+            retry_on: Exception types that trigger a retry.
+            max_tries: Maximum number of attempts.
+            on_backoff: Optional coroutine called with ``{"tries", "wait"}``
+                before sleeping between attempts.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        tries = 0
+        while True:
+            await self.acquire()
+            tries += 1
+            try:
+                result = await func()
+            except retry_on:
+                self.record_failure()
+                if tries >= max_tries:
+                    raise
+                wait = self.backoff_delay(tries)
+                if on_backoff:
+                    await on_backoff({"tries": tries, "wait": round(wait, 1)})
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Not a throttling error, do not let it hold the probe slot
+                with self._lock:
+                    self._probe_in_flight = False
+                raise
+            else:
+                self.record_success()
+                return result
+
+    def run_sync(
+        self,
+        func: Callable[[], T],
+        retry_on: tuple[type[BaseException], ...] = RETRYABLE_MODEL_ERRORS,
+        max_tries: int = 5,
+    ) -> T:
+        """Blocking variant of ``run`` for synchronous callers."""
+        tries = 0
+        while True:
+            self.acquire_sync()
+            tries += 1
+            try:
+                result = func()
+            except retry_on:
+                self.record_failure()
+                if tries >= max_tries:
+                    raise
+                time.sleep(self.backoff_delay(tries))
+            except BaseException:
+                with self._lock:
+                    self._probe_in_flight = False
+                raise
+            else:
+                self.record_success()
+                return result
+
+
+# Shared by every live connection and chat model call in the process
+gemini_retry = RetryCoordinator()
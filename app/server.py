@@ -15,21 +15,67 @@
 import asyncio
 import json
 import logging
-from collections.abc import Callable
-from typing import Any, Literal
-
-import backoff
-from fastapi import FastAPI, WebSocket
+import os
+import secrets
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import lru_cache
+from typing import Annotated, Any, Literal
+
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from google.cloud import logging as google_cloud_logging
-from google.genai import types
-from google.genai.types import LiveServerToolCall
-from pydantic import BaseModel
-from websockets.exceptions import ConnectionClosedError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.admission import AdmissionController, AdmissionRejected
+from app.agent import (
+    MODEL_ID,
+    checkpoint_interview_agent,
+    genai_client,
+    get_live_connect_config,
+    get_tool_functions,
+    release_interview_agent,
+    transcript_store,
+)
+from app.audio_cache import PromptSynthesizer, get_audio_cache
+from app.drain import TRY_AGAIN_LATER, SessionRegistry
+from app.feedback_store import FeedbackQueueFull, FeedbackStore, FeedbackWriter
+from app.gemini_session import GeminiSession
+from app.interview_agent import TEXTOS_FIJOS
+from app.reaper import HEARTBEAT_INTERVAL_SECONDS, IdleReaper
+from app.recording import SessionRecorder
+from app.retry import RETRYABLE_LIVE_ERRORS, gemini_retry
+from app.transcript_store import SEARCH_LIMIT
+
+session_registry = SessionRegistry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Reap idle sessions, and drain them when the instance receives SIGTERM.
+
+    Also writes queued feedback in the background, and flushes it on shutdown.
+    """
+    session_registry.install_signal_handler(checkpoint_interview_agent)
+    reaper = asyncio.create_task(idle_reaper.run())
+    writer = asyncio.create_task(feedback_writer.run())
+    yield
+    reaper.cancel()
+    writer.cancel()
+    await asyncio.gather(writer, return_exceptions=True)
+    await feedback_writer.flush()
 
-from app.agent import MODEL_ID, genai_client, live_connect_config, tool_functions
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -39,109 +85,92 @@ app.add_middleware(
 logging_client = google_cloud_logging.Client()
 logger = logging_client.logger(__name__)
 logging.basicConfig(level=logging.INFO)
+admission_controller = AdmissionController()
+idle_reaper = IdleReaper(session_registry, struct_logger=logger)
+feedback_writer = FeedbackWriter(FeedbackStore(), struct_logger=logger)
+# Bearer token of the recruiter tools reading transcripts; unset disables them
+RECRUITER_API_TOKEN = os.getenv("RECRUITER_API_TOKEN", "")
+# Proxies in front of the app that append the client address to
+# X-Forwarded-For (1 on Cloud Run, 2 behind an external load balancer too)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+# How long to wait for the client's setup message before closing the session
+SETUP_TIMEOUT_SECONDS = float(os.getenv("SETUP_TIMEOUT_SECONDS", "5.0"))
+# WebSocket close code 1008: policy violation
+POLICY_VIOLATION = 1008
+
+
+async def receive_setup(websocket: WebSocket) -> Any | None:
+    """Wait for the client's setup message, which must be its first message.
 
+    Args:
+        websocket: The client websocket connection
 
-class GeminiSession:
-    """Manages bidirectional communication between a client and the Gemini model."""
-
-    def __init__(
-        self, session: Any, websocket: WebSocket, tool_functions: dict[str, Callable]
-    ) -> None:
-        """Initialize the Gemini session.
-
-        Args:
-            session: The Gemini session
-            websocket: The client websocket connection
-            user_id: Unique identifier for this client
-            tool_functions: Dictionary of available tool functions
-        """
-        self.session = session
-        self.websocket = websocket
-        self.run_id = "n/a"
-        self.user_id = "n/a"
-        self.tool_functions = tool_functions
-
-    async def receive_from_client(self) -> None:
-        """Listen for and process messages from the client.
-
-        Continuously receives messages and forwards audio data to Gemini.
-        Handles connection errors gracefully.
-        """
-        while True:
-            try:
-                data = await self.websocket.receive_json()
-                if isinstance(data, dict) and (
-                    "realtimeInput" in data or "clientContent" in data
-                ):
-                    await self.session._ws.send(json.dumps(data))
-                elif "setup" in data:
-                    self.run_id = data["setup"]["run_id"]
-                    self.user_id = data["setup"]["user_id"]
-                    logger.log_struct(
-                        {**data["setup"], "type": "setup"}, severity="INFO"
-                    )
-                else:
-                    logging.warning(f"Received unexpected input from client: {data}")
-            except ConnectionClosedError as e:
-                logging.warning(f"Client {self.user_id} closed connection: {e}")
-                break
-            except Exception as e:
-                logging.error(f"Error receiving from client {self.user_id}: {e!s}")
-                break
-
-    def _get_func(self, action_label: str) -> Callable | None:
-        """Get the tool function for a given action label."""
-        # print("ACTION LABEL")
-        # print(action_label)
-        # print(self.tool_functions)
-        # print(self.tool_functions.get(action_label))
-        return None if action_label == "" else self.tool_functions.get(action_label)
-
-    async def _handle_tool_call(
-        self, session: Any, tool_call: LiveServerToolCall
-    ) -> None:
-        """Process tool calls from Gemini and send back responses.
-
-        Args:
-            session: The Gemini session
-            tool_call: Tool call request from Gemini
-        """
-        for fc in tool_call.function_calls:
-            print(f"Calling tool function: {fc.name} with args: {fc.args}")
-            response = self._get_func(fc.name)(**fc.args)
-
-            tool_response = types.LiveClientToolResponse(
-                function_responses=[
-                    types.FunctionResponse(name=fc.name, id=fc.id, response=response)
-                ]
-            )
+    Returns:
+        The setup message, or None if it did not arrive in time or another
+        message came first.
+    """
+    try:
+        message = await asyncio.wait_for(
+            websocket.receive_json(), timeout=SETUP_TIMEOUT_SECONDS
+        )
+    except (asyncio.TimeoutError, WebSocketDisconnect, ValueError):
+        return None
+    if not isinstance(message, dict) or not isinstance(message.get("setup"), dict):
+        return None
+    return message
 
-            print(f"Tool response: {tool_response}")
-            await session.send(input=tool_response)
 
-    async def receive_from_gemini(self) -> None:
-        """Listen for and process messages from Gemini.
+async def refuse_without_setup(websocket: WebSocket) -> None:
+    """Close a session whose client did not send its setup message.
 
-        Continuously receives messages from Gemini, forwards them to the client,
-        and handles any tool calls. Handles connection errors gracefully.
-        """
-        while result := await self.session._ws.recv(decode=False):
-            # print("result: {}".format(result))
-            await self.websocket.send_bytes(result)
-            message = types.LiveServerMessage.model_validate(json.loads(result))
+    Without it the session would be interviewed on the default candidate's
+    CV and offer, so it is refused instead.
+    """
+    logging.warning("Closing session without a setup message")
+    try:
+        await websocket.send_json(
+            {
+                "status": "No setup message received. Reconnect and send the "
+                "setup with the candidate's CV and job offer first."
+            }
+        )
+        await websocket.close(code=POLICY_VIOLATION, reason="Setup message required")
+    except Exception as e:
+        logging.debug(f"Could not close session without setup: {e}")
+
+
+async def run_until_first_completed(*coros: Coroutine[Any, Any, None]) -> None:
+    """Run coroutines until one of them finishes, then cancel the others.
 
-            if message.tool_call:
-                print("message.tool_call: {}".format(message.tool_call))
+    When the client disconnects, this stops relaying from Gemini right away,
+    including any tool call and model request still in flight.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        task.result()
 
 
-                tool_call = LiveServerToolCall.model_validate(message.tool_call)
-                print("tool_call: {}".format(tool_call))
-                await self._handle_tool_call(self.session, tool_call)
+@lru_cache(maxsize=1)
+def get_prompt_synthesizer() -> PromptSynthesizer:
+    """Generator of the prompt audio cache shared by every session."""
+    return PromptSynthesizer(genai_client, MODEL_ID, get_audio_cache())
 
 
 def get_connect_and_run_callable(websocket: WebSocket) -> Callable:
     """Create a callable that handles Gemini connection with retry logic.
 
+    Connects go through the process-wide ``gemini_retry`` coordinator, so
+    sessions back off together when Gemini throttles. Only the connect and
+    its setup handshake are retried and counted by the circuit breaker: a
+    session Gemini drops later is not replayed, the client is asked to
+    reconnect and resumes from the shared interview state.
+
     Args:
         websocket: The client websocket connection
 
@@ -149,39 +178,128 @@ def get_connect_and_run_callable(websocket: WebSocket) -> Callable:
         Callable: An async function that establishes and manages the Gemini connection
     """
 
-    async def on_backoff(details: backoff._typing.Details) -> None:
+    async def on_backoff(details: dict[str, Any]) -> None:
         await websocket.send_json(
             {
                 "status": f"Model connection error, retrying in {details['wait']} seconds..."
             }
         )
 
-    @backoff.on_exception(
-        backoff.expo, ConnectionClosedError, max_tries=10, on_backoff=on_backoff
-    )
-    async def connect_and_run() -> None:
-        async with genai_client.aio.live.connect(
-            model=MODEL_ID, config=live_connect_config
-        ) as session:
-            await websocket.send_json({"status": "Backend is ready for conversation"})
-            gemini_session = GeminiSession(
-                session=session, websocket=websocket, tool_functions=tool_functions
+    first_message: Any | None = None
+
+    async def run_session(session: Any, setup: dict[str, Any]) -> None:
+        await websocket.send_json({"status": "Backend is ready for conversation"})
+        gemini_session = GeminiSession(
+            session=session,
+            websocket=websocket,
+            tool_functions=get_tool_functions(setup),
+            struct_logger=logger,
+            recorder=SessionRecorder.from_env(),
+            audio_cache=get_audio_cache(),
+            canned_prompts=TEXTOS_FIJOS,
+            prompt_synthesizer=get_prompt_synthesizer(),
+        )
+        logging.info("Starting bidirectional communication")
+        try:
+            with session_registry.register(gemini_session):
+                await run_until_first_completed(
+                    gemini_session.receive_from_client(first_message),
+                    gemini_session.receive_from_gemini(),
+                    gemini_session.send_heartbeats(HEARTBEAT_INTERVAL_SECONDS),
+                )
+        except asyncio.CancelledError:
+            if not gemini_session.reaped:
+                raise
+            logging.info(f"Reaped idle session {gemini_session.state_key}")
+        except RETRYABLE_LIVE_ERRORS as e:
+            # Dropped mid-interview: the client reconnects with the same run
+            # id and continues from the last saved turn
+            logging.warning(f"Gemini dropped session {gemini_session.state_key}: {e}")
+            await websocket.send_json({"status": "Model connection lost, resuming..."})
+            await websocket.close(code=TRY_AGAIN_LATER, reason="Model connection lost")
+        finally:
+            if gemini_session.recorder is not None:
+                await asyncio.to_thread(gemini_session.recorder.close)
+            release_interview_agent(gemini_session.state_key)
+            logger.log_struct(
+                {**gemini_session.media_stats(), "type": "media_stats"},
+                severity="INFO",
             )
-            logging.info("Starting bidirectional communication")
-            await asyncio.gather(
-                gemini_session.receive_from_client(),
-                gemini_session.receive_from_gemini(),
+
+    async def connect_and_run() -> None:
+        nonlocal first_message
+        # The setup message carries the candidate and offer the session's
+        # system instruction is built for
+        first_message = await receive_setup(websocket)
+        if first_message is None:
+            await refuse_without_setup(websocket)
+            return
+        setup = first_message["setup"]
+        config = get_live_connect_config(setup)
+        async with AsyncExitStack() as stack:
+            session = await gemini_retry.run(
+                lambda: stack.enter_async_context(
+                    genai_client.aio.live.connect(model=MODEL_ID, config=config)
+                ),
+                retry_on=RETRYABLE_LIVE_ERRORS,
+                max_tries=10,
+                on_backoff=on_backoff,
             )
+            await run_session(session, setup)
 
     return connect_and_run
 
 
+async def refuse_while_draining(websocket: WebSocket) -> bool:
+    """Close the connection if this instance is shutting down.
+
+    The client retries and lands on another instance.
+
+    Returns:
+        Whether the connection was refused.
+    """
+    if not session_registry.draining:
+        return False
+    await websocket.send_json({"status": "Server is restarting, please retry."})
+    await websocket.close(code=TRY_AGAIN_LATER, reason="Server restarting")
+    return True
+
+
+def client_key(websocket: WebSocket) -> str:
+    """Address of the client, the key of its per-user rate limit.
+
+    Behind a proxy the socket peer is the proxy itself, so the address is
+    taken from ``X-Forwarded-For``. Entries left of the ones appended by
+    the trusted proxies can be set by the client, and are ignored.
+    """
+    forwarded = [
+        hop.strip()
+        for hop in websocket.headers.get("x-forwarded-for", "").split(",")
+        if hop.strip()
+    ]
+    if forwarded and TRUSTED_PROXY_HOPS > 0:
+        return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return websocket.client.host if websocket.client else "anonymous"
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """Handle new websocket connections."""
     await websocket.accept()
-    connect_and_run = get_connect_and_run_callable(websocket)
-    await connect_and_run()
+    if await refuse_while_draining(websocket):
+        return
+    user_key = client_key(websocket)
+    try:
+        async with admission_controller.admit(user_key, websocket.send_json):
+            # The drain may have started while the session was queued
+            if await refuse_while_draining(websocket):
+                return
+            connect_and_run = get_connect_and_run_callable(websocket)
+            await connect_and_run()
+    except AdmissionRejected as e:
+        logging.warning(f"Refused session for {user_key}: {e}")
+        await websocket.send_json({"status": str(e)})
+        await websocket.close(code=TRY_AGAIN_LATER, reason="Server overloaded")
 
 
 class Feedback(BaseModel):
@@ -194,14 +312,117 @@ class Feedback(BaseModel):
     log_type: Literal["feedback"] = "feedback"
 
 
+feedback_list = TypeAdapter(list[Feedback])
+
+
+def submit_feedback(feedback: list[Feedback]) -> None:
+    """Queue feedback to be stored and logged in the background."""
+    try:
+        feedback_writer.submit([item.model_dump() for item in feedback])
+    except FeedbackQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+
 @app.post("/feedback")
 async def collect_feedback(feedback_dict: Feedback) -> None:
     """Collect and log feedback."""
-    feedback_data = feedback_dict.model_dump()
-    logger.log_struct(feedback_data, severity="INFO")
+    submit_feedback([feedback_dict])
+
+
+@app.post("/feedback/bulk")
+async def collect_feedback_bulk(request: Request) -> dict[str, int]:
+    """Collect a JSON array of feedback, or one per line with NDJSON."""
+    body = await request.body()
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            feedback = [
+                Feedback.model_validate_json(line)
+                for line in body.splitlines()
+                if line.strip()
+            ]
+        else:
+            feedback = feedback_list.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=json.loads(e.json(include_url=False))
+        ) from e
+    submit_feedback(feedback)
+    return {"accepted": len(feedback)}
+
+
+@app.get("/feedback/stats")
+async def feedback_stats(
+    run_id: str | None = None, user_id: str | None = None, day: str | None = None
+) -> dict[str, Any]:
+    """Aggregated feedback scores of a run, a user, a UTC day or overall.
+
+    Read from precomputed aggregates. Feedback is written in the background,
+    so the latest submissions may take a moment to show up.
+    """
+    filters = {
+        dimension: key
+        for dimension, key in (("run_id", run_id), ("user_id", user_id), ("day", day))
+        if key is not None
+    }
+    if len(filters) > 1:
+        raise HTTPException(
+            status_code=400, detail="Filter by one of run_id, user_id and day"
+        )
+    dimension, key = next(iter(filters.items()), ("all", ""))
+    return await asyncio.to_thread(feedback_writer.store.stats, dimension, key)
+
+
+recruiter_bearer = HTTPBearer(auto_error=False)
+
+
+def require_recruiter(
+    credentials: Annotated[
+        HTTPAuthorizationCredentials | None, Depends(recruiter_bearer)
+    ],
+) -> None:
+    """Allow only recruiter tools holding ``RECRUITER_API_TOKEN``.
+
+    Transcripts hold every candidate's answers and report, so without a
+    configured token the endpoints are not served at all.
+    """
+    if not RECRUITER_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), RECRUITER_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid recruiter token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/transcripts/search", dependencies=[Depends(require_recruiter)])
+async def search_transcripts(
+    q: str, limit: Annotated[int, Query(ge=1, le=100)] = SEARCH_LIMIT
+) -> list[dict[str, Any]]:
+    """Interviews whose questions or answers mention all the words of ``q``."""
+    return await asyncio.to_thread(transcript_store.search, q, limit)
+
+
+@app.get("/transcripts/{run_id}", dependencies=[Depends(require_recruiter)])
+async def get_transcript(run_id: str) -> dict[str, Any]:
+    """Turns and final report of an interview."""
+    transcript = await asyncio.to_thread(transcript_store.transcript, run_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcript
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="debug")
+    # Several workers need a shared STATE_STORE_URL (e.g. redis://) so every
+    # worker sees the same interview state
+    uvicorn.run(
+        "app.server:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level="debug",
+        workers=int(os.getenv("WORKERS", "1")),
+    )
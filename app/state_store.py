@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared storage for interview and session state.
+
+Interview state must survive being served by different uvicorn workers or
+Cloud Run instances, so it is kept in a pluggable key-value store instead of
+module globals. Values are JSON-serializable dictionaries.
+
+The backend is selected with the ``STATE_STORE_URL`` environment variable:
+    memory:// (default): process-local store, for a single worker.
+    redis://host:port/db: any Redis-compatible server (Redis, Valkey,
+        Memorystore), shared by every worker and instance.
+"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+STATE_STORE_URL = os.getenv("STATE_STORE_URL", "memory://")
+# Idle interviews are dropped from the store after this many seconds
+STATE_TTL_SECONDS = int(os.getenv("STATE_TTL_SECONDS", str(6 * 60 * 60)))
+LOCK_TIMEOUT_SECONDS = 30
+
+# State key (run id) of the session whose tool call is being handled
+current_run_id: ContextVar[str] = ContextVar("current_run_id", default="n/a")
+
+
+class StateStore(ABC):
+    """Key-value store for JSON-serializable session state."""
+
+    @abstractmethod
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the value stored at ``key``, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: dict[str, Any], ttl: int | None = None) -> None:
+        """Store ``value`` at ``key``, expiring after ``ttl`` seconds if given."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from the store."""
+
+    @abstractmethod
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold an exclusive lock on ``key`` for a read-modify-write cycle."""
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local store. Only consistent when running a single worker."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[dict[str, Any], float | None]] = {}
+        self._guard = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._guard:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: dict[str, Any], ttl: int | None = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._guard:
+            self._data[key] = (value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._guard:
+            self._data.pop(key, None)
+            self._locks.pop(key, None)
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        with self._guard:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            yield
+
+
+class RedisStateStore(StateStore):
+    """Store backed by a Redis-compatible server, shared across workers."""
+
+    def __init__(self, url: str, prefix: str = "interview-agent:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RedisStateStore requires the 'redis' package. "
+                "Install it with `uv sync --extra redis`."
+            ) from e
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        raw = self._client.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: dict[str, Any], ttl: int | None = None) -> None:
+        self._client.set(self._prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        # Bounded wait, so a stuck holder fails the caller instead of hanging it
+        with self._client.lock(
+            f"{self._prefix}lock:{key}",
+            timeout=LOCK_TIMEOUT_SECONDS,
+            blocking_timeout=LOCK_TIMEOUT_SECONDS,
+        ):
+            yield
+
+
+def get_state_store(url: str = STATE_STORE_URL) -> StateStore:
+    """Create the state store configured by ``url``."""
+    if url.startswith("memory://"):
+        return InMemoryStateStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateStore(url)
+    raise ValueError(f"Unsupported state store URL: {url}")
@@ -45,16 +45,14 @@ FORMAT_DOCS = PromptTemplate.from_template(
 # **importante: el usuario va a compartir su imagen, tienes que detectar si el usuario está nervioso o si puede estar mintiendo sobre su experiencia utiliza la herramienta 'developer_interview_nervous' para ir almacenando los datos**.
 # """
 
-SYSTEM_INSTRUCTION = """
+# Static part of the live system instruction, identical for every session.
+# It goes first so the per-candidate part is a cheap splice at the end.
+SYSTEM_INSTRUCTION_PREFIX = """
 # ROLE
 Eres un entrevistador técnico especializado en la selección de desarrolladores de código para una empresa consultora.
 Tu objetivo es evaluar las habilidades técnicas del candidato en base a su CV y su adecuación al puesto. 
 Tu tienes que llevar el peso de la entrevista por lo que tienes que hacer las preguntas, el candidato solo tiene que responder.
 
-# INFORMACION DEL CANDIDATO
-CV del candidato: Sergio Mota. 2021-2022: Altostratus: desarrollador backend python. 2023: Google: desarrollador backend python.
-Puesto de trabajo: Desarrollador Backend Python con experiencia en FastAPI, SQLAlchemy, PostgreSQL, Docker, y Kubernetes.
-
 # INSTRUCCIONES
 Antes de responder utiliza tus herramientas para formular preguntas y contrastar la información del CV del candidato con las respuestas del usuario.
 
@@ -64,4 +62,46 @@ la secuencia de la entrevista es la siguiente:
 3. No preguntas sobre el CV del candidato, solo sobre la información que te ha proporcionado a traves de las herramientas.
 
 **importante: no hagas más de una pregunta en cada turno de la entrevista**.
+**importante: si el candidato parece nervioso o puede estar mintiendo sobre su experiencia, utiliza la herramienta 'developer_interview_nervous' para anotarlo. No le comentes al candidato estas observaciones**.
+"""
+
+CANDIDATE_INSTRUCTION = """
+# INFORMACION DEL CANDIDATO
+CV del candidato: {cv}
+Puesto de trabajo: {job_offer}
+
+# IDIOMA
+Realiza toda la entrevista en {language}.
+"""
+
+DEFAULT_CV = "Sergio Mota. 2021-2022: Altostratus: desarrollador backend python. 2023: Google: desarrollador backend python."
+DEFAULT_JOB_OFFER = "Desarrollador Backend Python con experiencia en FastAPI, SQLAlchemy, PostgreSQL, Docker, y Kubernetes."
+DEFAULT_LANGUAGE = "español"
+
+
+def system_instruction(
+    cv: str = DEFAULT_CV,
+    job_offer: str = DEFAULT_JOB_OFFER,
+    language: str = DEFAULT_LANGUAGE,
+) -> str:
+    """Assemble the live system instruction for one candidate and offer."""
+    return SYSTEM_INSTRUCTION_PREFIX + CANDIDATE_INSTRUCTION.format(
+        cv=cv, job_offer=job_offer, language=language
+    )
+
+
+SYSTEM_INSTRUCTION = system_instruction()
+
+# Added to a tool response whose question the client already heard from the
+# audio cache. It is what keeps the live model from generating the question's
+# audio again; the session only drops whatever it still says
+CANNED_AUDIO_NOTE = (
+    "La pregunta ya se ha reproducido al candidato. No la repitas ni digas "
+    "nada más; espera su respuesta."
+)
+
+# Sole instruction of the live sessions that generate the prompt audio cache
+PROMPT_READER_INSTRUCTION = """
+Eres un locutor. Lee en voz alta, en {language}, exactamente el texto que
+recibas, una sola vez. No añadas saludos, comentarios ni ninguna otra palabra.
 """
@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of the tools the live model can call.
+
+Tools are registered with a decorator. Their function declaration is built
+once, from the signature and the Google-style docstring of the handler, so
+each parameter is described to the model. Sets of tools, e.g. the tools of
+an interview role, are assembled once and cached, so picking a session's
+tools is a dictionary lookup.
+
+Handlers carry execution hints: blocking handlers run in a thread instead of
+on the event loop, and a timeout bounds how long the model waits for a tool.
+"""
+
+import asyncio
+import inspect
+import logging
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from google.genai.types import FunctionDeclaration, Tool
+
+_ARG = re.compile(r"^\s+(\w+)(?:\s*\([^)]*\))?:\s*(.+)$")
+
+
+def build_declaration(handler: Callable, vertexai: bool) -> FunctionDeclaration:
+    """Build the function declaration of a handler.
+
+    The description is the docstring without its sections, and parameters
+    are described with the docstring's ``Args`` section.
+    """
+    declaration = FunctionDeclaration.from_callable_with_api_option(
+        callable=handler, api_option="VERTEX_AI" if vertexai else "GEMINI_API"
+    )
+    doc = inspect.getdoc(handler) or ""
+    summary, _, sections = doc.partition("\nArgs:")
+    declaration.description = summary.strip() or None
+    arguments = {}
+    for line in sections.splitlines():
+        if line and not line[0].isspace():
+            # End of the Args section
+            break
+        match = _ARG.match(line)
+        if match:
+            arguments[match.group(1)] = match.group(2).strip()
+    if declaration.parameters is not None and declaration.parameters.properties:
+        for name, schema in declaration.parameters.properties.items():
+            schema.description = arguments.get(name, schema.description)
+    return declaration
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """A registered tool: handler, declaration and execution hints."""
+
+    name: str
+    handler: Callable
+    declaration: FunctionDeclaration
+    # Seconds the model waits for the tool; None waits until it returns
+    timeout: float | None = None
+    # Run a synchronous handler in a thread, off the event loop
+    blocking: bool = False
+
+    async def __call__(self, **kwargs: Any) -> Any:
+        """Run the handler with its hints.
+
+        A tool that times out answers the model with an error instead of
+        failing the session.
+        """
+        if self.blocking:
+            call = asyncio.to_thread(self.handler, **kwargs)
+        else:
+            call = self.handler(**kwargs)
+            if not inspect.isawaitable(call):
+                return call
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Tool {self.name} timed out after {self.timeout}s")
+            return {"error": f"{self.name} timed out"}
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSet:
+    """Tools of a session, as declared to the model and as called by it."""
+
+    tools: list[Tool]
+    functions: dict[str, Callable]
+
+
+class ToolRegistry:
+    """Tools available to live sessions, and the cached sets built from them."""
+
+    def __init__(self, vertexai: bool = True) -> None:
+        """Initialize the registry.
+
+        Args:
+            vertexai: Build declarations for Vertex AI rather than the Gemini
+                API, which supports fewer schema fields.
+        """
+        self.vertexai = vertexai
+        self._tools: dict[str, ToolSpec] = {}
+        self.tool_set = lru_cache(maxsize=None)(self._tool_set)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __getitem__(self, name: str) -> ToolSpec:
+        return self._tools[name]
+
+    def register(
+        self,
+        handler: Callable | None = None,
+        *,
+        timeout: float | None = None,
+        blocking: bool = False,
+    ) -> Callable:
+        """Register a handler, used as ``@registry.register`` or with hints.
+
+        Args:
+            handler: The tool function. Its name is the tool name.
+            timeout: Seconds the model waits for the tool.
+            blocking: Run a synchronous handler in a thread.
+
+        Returns:
+            The handler, unchanged.
+
+        Raises:
+            ValueError: If a tool with the same name is already registered.
+        """
+
+        def decorator(handler: Callable) -> Callable:
+            name = handler.__name__
+            if name in self._tools:
+                raise ValueError(f"Tool {name} is already registered")
+            self._tools[name] = ToolSpec(
+                name=name,
+                handler=handler,
+                declaration=build_declaration(handler, self.vertexai),
+                timeout=timeout,
+                blocking=blocking,
+            )
+            # Sets built before this tool existed cannot include it
+            self.tool_set.cache_clear()
+            return handler
+
+        return decorator if handler is None else decorator(handler)
+
+    def _tool_set(self, names: tuple[str, ...]) -> ToolSet:
+        """Declarations and callables of the named tools, built once per set.
+
+        Raises:
+            KeyError: If a tool is not registered.
+        """
+        specs = [self._tools[name] for name in names]
+        return ToolSet(
+            tools=[Tool(function_declarations=[spec.declaration for spec in specs])],
+            functions={spec.name: spec for spec in specs},
+        )
+
+    def tool_sets(self, roles: dict[str, Iterable[str]]) -> dict[str, ToolSet]:
+        """Build the tool set of each role upfront, e.g. at import time."""
+        return {role: self.tool_set(tuple(names)) for role, names in roles.items()}
@@ -0,0 +1,312 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent transcripts of interviews with a full-text index.
+
+Every turn (phase, question, answer and timestamps) is written as the
+interview goes, and the final report when it completes. Questions and
+answers are indexed with SQLite FTS5, kept in sync by triggers, so the index
+grows with each turn instead of being rebuilt. Recruiters can then find the
+interviews that mention a skill or keyword across thousands of transcripts
+with a single indexed query:
+
+    store.search("kubernetes terraform")
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.turn_log import QuestionText, TurnLog
+
+TRANSCRIPT_DB_PATH = os.getenv("TRANSCRIPT_DB_PATH", ".transcripts.db")
+SEARCH_LIMIT = 20
+# Words of the excerpts returned with search results
+SNIPPET_WORDS = 16
+
+PhaseName = Callable[[int], str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    completed_at REAL,
+    report TEXT
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT,
+    asked_at REAL NOT NULL,
+    answered_at REAL,
+    UNIQUE (run_id, seq)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    question, answer, content='turns', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, question, answer)
+    VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_au AFTER UPDATE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+    INSERT INTO turns_fts (rowid, question, answer)
+    VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+END;
+"""
+# Only answers that changed touch the index
+_UPSERT_TURN = """
+INSERT INTO turns (run_id, seq, phase, question, answer, asked_at, answered_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_id, seq) DO UPDATE SET
+    answer = excluded.answer, answered_at = excluded.answered_at
+WHERE answer IS NOT excluded.answer
+"""
+# One row per interview, ranked by the sum of its turns' BM25 scores (lower
+# is better), with its best matching turn
+_SEARCH = """
+WITH hits AS MATERIALIZED (
+    SELECT rowid AS id, bm25(turns_fts) AS rank
+    FROM turns_fts WHERE turns_fts MATCH ?
+)
+SELECT turns.run_id, count(*), sum(hits.rank) AS score, min(hits.rank), hits.id
+FROM hits JOIN turns ON turns.id = hits.id
+GROUP BY turns.run_id ORDER BY score LIMIT ?
+"""
+_WORD = re.compile(r"\w+")
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Words are quoted, so punctuation such as ``C++`` or ``node.js`` is not
+    parsed as query syntax. A trailing ``*`` keeps a prefix search.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+
+def _normalize(text: str) -> str:
+    """Lowercase text without accents, as indexed by the tokenizer."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def snippet(text: str, query: str, words: int = SNIPPET_WORDS) -> str | None:
+    """Excerpt of ``text`` around its first word matching ``query``.
+
+    Built in Python for the few results returned, as FTS5's ``snippet()``
+    costs more than the search itself.
+
+    Returns:
+        The excerpt with matching words in brackets, or None if no word
+        matches.
+    """
+    exact: set[str] = set()
+    prefixes: list[str] = []
+    for word in query.split():
+        tokens = _WORD.findall(_normalize(word.rstrip("*")))
+        if tokens and word.endswith("*"):
+            prefixes.append(tokens.pop())
+        exact.update(tokens)
+    text_words = text.split()
+    hits = {
+        i
+        for i, word in enumerate(text_words)
+        if any(
+            token in exact or token.startswith(tuple(prefixes))
+            for token in _WORD.findall(_normalize(word))
+        )
+    }
+    if not hits:
+        return None
+    start = max(0, min(min(hits) - words // 4, len(text_words) - words))
+    excerpt = " ".join(
+        f"[{word}]" if i in hits else word
+        for i, word in enumerate(text_words[start : start + words], start)
+    )
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if start + words < len(text_words) else ""
+    return f"{prefix}{excerpt}{suffix}"
+
+
+class TranscriptStore:
+    """SQLite store of interview turns and reports, indexed for search."""
+
+    def __init__(self, path: str | Path = TRANSCRIPT_DB_PATH) -> None:
+        """Open or create the database.
+
+        Args:
+            path: Database file, or ``":memory:"``.
+        """
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def record_turns(
+        self,
+        run_id: str,
+        turns: TurnLog,
+        question_text: QuestionText,
+        phase_name: PhaseName,
+    ) -> int:
+        """Write the turns of an interview that are new or got answered.
+
+        Turns are append-only and only the latest one can still get its
+        answer, so writing resumes from the last turn already stored.
+
+        Args:
+            run_id: Identifier of the interview.
+            turns: The interview's turn log.
+            question_text: Returns the text of a question from its phase and
+                question indexes.
+            phase_name: Returns the name of a phase from its index.
+
+        Returns:
+            Number of turns written.
+        """
+        if not turns:
+            return 0
+        with self._lock:
+            (last,) = self._connection.execute(
+                "SELECT max(seq) FROM turns WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            start = 0 if last is None else last
+            rows = [
+                (
+                    run_id,
+                    seq,
+                    phase_name(turn.phase),
+                    question_text(turn.phase, turn.question),
+                    turn.answer,
+                    turn.asked_at,
+                    turn.answered_at,
+                )
+                for seq, turn in enumerate(turns.turns[start:], start=start)
+            ]
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO interviews (run_id, started_at) "
+                    "VALUES (?, ?)",
+                    (run_id, turns.turns[0].asked_at),
+                )
+                self._connection.executemany(_UPSERT_TURN, rows)
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def complete(self, run_id: str, report: str, completed_at: float) -> None:
+        """Store the final report of an interview, once."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE interviews SET report = ?, completed_at = ? "
+                "WHERE run_id = ? AND completed_at IS NULL",
+                (report, completed_at, run_id),
+            )
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[dict[str, Any]]:
+        """Find the interviews whose questions or answers match all words.
+
+        Returns:
+            The best matching interviews first, with the number of matching
+            turns, their score and a snippet of the best one, matches in
+            brackets.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._connection.execute(_SEARCH, (expression, limit)).fetchall()
+            ids = [row[-1] for row in rows]
+            texts = {
+                id_: (question, answer)
+                for id_, question, answer in self._connection.execute(
+                    "SELECT id, question, answer FROM turns "
+                    f"WHERE id IN ({', '.join('?' * len(ids))})",
+                    ids,
+                )
+            }
+        results = []
+        for run_id, hits, score, _, id_ in rows:
+            question, answer = texts[id_]
+            excerpt = snippet(answer or "", query) or snippet(question, query)
+            results.append(
+                {"run_id": run_id, "hits": hits, "score": score, "snippet": excerpt}
+            )
+        return results
+
+    def transcript(self, run_id: str) -> dict[str, Any] | None:
+        """Return an interview with its turns in order, if stored."""
+        with self._lock:
+            interview = self._connection.execute(
+                "SELECT started_at, completed_at, report FROM interviews "
+                "WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+            if interview is None:
+                return None
+            turns = self._connection.execute(
+                "SELECT phase, question, answer, asked_at, answered_at FROM turns "
+                "WHERE run_id = ? ORDER BY seq",
+                (run_id,),
+            ).fetchall()
+        started_at, completed_at, report = interview
+        return {
+            "run_id": run_id,
+            "started_at": started_at,
+            "completed_at": completed_at,
+            "report": report,
+            "turns": [
+                dict(
+                    zip(
+                        ("phase", "question", "answer", "asked_at", "answered_at"),
+                        turn,
+                        strict=True,
+                    )
+                )
+                for turn in turns
+            ],
+        }
@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact, append-only log of the turns of an interview.
+
+Questions come from a fixed script, so a turn only stores the phase and
+question indexes, the candidate's answer, two timestamps and the answer's
+score, if evaluated. LangChain messages are built on demand with
+``to_messages``, instead of on every turn.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+# Phase of the opening question, asked before the scripted phases
+INTRO_PHASE = -1
+
+QuestionText = Callable[[int, int], str]
+
+
+@dataclass(slots=True)
+class Turn:
+    """A question asked to the candidate and its answer."""
+
+    phase: int
+    question: int
+    asked_at: float
+    answer: str | None = None
+    answered_at: float | None = None
+    # Quality of the answer from 0 to 10, set by the answer evaluator
+    score: float | None = None
+
+
+class TurnLog:
+    """Append-only sequence of turns."""
+
+    __slots__ = ("turns",)
+
+    def __init__(self, turns: list[Turn] | None = None) -> None:
+        self.turns: list[Turn] = turns if turns is not None else []
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self.turns)
+
+    @property
+    def last(self) -> Turn | None:
+        """The most recent turn, if any."""
+        return self.turns[-1] if self.turns else None
+
+    def ask(self, phase: int, question: int, now: float | None = None) -> Turn:
+        """Record that a question was asked.
+
+        Asking the question of the latest turn again does not add a turn.
+        """
+        last = self.last
+        if last is not None and (last.phase, last.question) == (phase, question):
+            return last
+        turn = Turn(phase, question, time.time() if now is None else now)
+        self.turns.append(turn)
+        return turn
+
+    def answer(self, text: str, now: float | None = None) -> Turn:
+        """Record the candidate's answer to the latest question.
+
+        A second answer to an already answered question becomes a follow-up
+        turn on the same question.
+        """
+        now = time.time() if now is None else now
+        last = self.last
+        if last is None:
+            last = self.ask(INTRO_PHASE, 0, now)
+        elif last.answer is not None:
+            last = Turn(last.phase, last.question, now)
+            self.turns.append(last)
+        last.answer = text
+        last.answered_at = now
+        return last
+
+    def answers(self, *phases: int) -> list[str]:
+        """Answers given so far, optionally only those of the given phases."""
+        return [
+            turn.answer
+            for turn in self.turns
+            if turn.answer is not None and (not phases or turn.phase in phases)
+        ]
+
+    def scores(self, *phases: int) -> list[float]:
+        """Scores of the evaluated answers, optionally of the given phases."""
+        return [
+            turn.score
+            for turn in self.turns
+            if turn.score is not None and (not phases or turn.phase in phases)
+        ]
+
+    def last_answered(self) -> Turn | None:
+        """The most recent turn with an answer, if any."""
+        for turn in reversed(self.turns):
+            if turn.answer is not None:
+                return turn
+        return None
+
+    def last_answer(self) -> str | None:
+        """The most recent answer, if any."""
+        turn = self.last_answered()
+        return None if turn is None else turn.answer
+
+    def to_messages(self, question_text: QuestionText) -> list[BaseMessage]:
+        """Build the LangChain messages of the conversation.
+
+        Args:
+            question_text: Returns the text of a question from its phase and
+                question indexes.
+        """
+        messages: list[BaseMessage] = []
+        for turn in self.turns:
+            text = question_text(turn.phase, turn.question)
+            if turn.phase == INTRO_PHASE:
+                messages.append(SystemMessage(content=text))
+            else:
+                messages.append(HumanMessage(content=text))
+            if turn.answer is not None:
+                messages.append(HumanMessage(content=turn.answer))
+        return messages
+
+    def to_dict(self) -> list[list]:
+        """Serialize the log as compact rows for the shared state store."""
+        return [
+            [t.phase, t.question, t.asked_at, t.answer, t.answered_at, t.score]
+            for t in self.turns
+        ]
+
+    @classmethod
+    def from_dict(cls, rows: list[list]) -> "TurnLog":
+        """Rebuild a log serialized with ``to_dict``.
+
+        Rows stored before scores were added have no score.
+        """
+        return cls([Turn(*row) for row in rows])
@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Server-side voice activity detection for microphone audio.
+
+The browser streams microphone audio continuously, including the long
+silences while the candidate thinks. ``SilenceFilter`` drops those chunks
+before they reach Gemini. After speech it keeps forwarding silence for a
+hangover period, so Gemini's own turn detection still sees the end of the
+utterance; only the silence beyond that is dropped.
+
+Frames are classified with vectorized NumPy features: short-term energy and
+zero-crossing rate, which also keeps quiet fricatives ("s", "f") as speech.
+"""
+
+import base64
+import binascii
+import os
+import re
+
+import numpy as np
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "1500"))
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+FRAME_MS = 20
+DEFAULT_SAMPLE_RATE = 16000
+# Quieter frames still count as speech when their zero-crossing rate is in
+# the range of unvoiced consonants
+FRICATIVE_MARGIN_DB = 10.0
+FRICATIVE_MIN_ZCR = 0.3
+
+_RATE_PATTERN = re.compile(r"rate=(\d+)")
+
+
+def sample_rate_from_mime(mime_type: str) -> int:
+    """Read the sample rate from a ``audio/pcm;rate=...`` mime type."""
+    match = _RATE_PATTERN.search(mime_type)
+    return int(match.group(1)) if match else DEFAULT_SAMPLE_RATE
+
+
+def frame_features(
+    pcm: bytes, sample_rate: int, frame_ms: int = FRAME_MS
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute per-frame energy and zero-crossing rate of 16-bit PCM audio.
+
+    Args:
+        pcm: Little-endian signed 16-bit mono samples.
+        sample_rate: Sample rate of the audio in Hz.
+        frame_ms: Frame length in milliseconds.
+
+    Returns:
+        Energy in dBFS and zero-crossing rate (crossings per sample) per frame.
+    """
+    samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2")
+    frame_len = max(sample_rate * frame_ms // 1000, 1)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        # Shorter than a frame: treat the whole chunk as one frame
+        frames = samples.reshape(1, -1) if len(samples) else np.zeros((1, 1))
+    else:
+        frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    frames = frames.astype(np.float32) / 32768.0
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(
+        frames.shape[1] - 1, 1
+    )
+    return energy_db, zcr
+
+
+def contains_speech(
+    pcm: bytes, sample_rate: int, threshold_db: float = VAD_THRESHOLD_DB
+) -> bool:
+    """Whether any frame of the chunk looks like speech."""
+    energy_db, zcr = frame_features(pcm, sample_rate)
+    speech = (energy_db > threshold_db) | (
+        (energy_db > threshold_db - FRICATIVE_MARGIN_DB) & (zcr > FRICATIVE_MIN_ZCR)
+    )
+    return bool(speech.any())
+
+
+class SilenceFilter:
+    """Per-session filter that drops silent audio beyond a hangover period."""
+
+    def __init__(
+        self,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        threshold_db: float = VAD_THRESHOLD_DB,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            hangover_ms: Silence forwarded after speech before dropping starts.
+            threshold_db: Frame energy above which audio counts as speech.
+        """
+        self.hangover = hangover_ms / 1000
+        self.threshold_db = threshold_db
+        # Start as if the hangover had expired, so leading silence is dropped
+        self._silence_seconds = self.hangover
+        self.bytes_received = 0
+        self.bytes_dropped = 0
+        self.chunks_dropped = 0
+
+    def should_forward(self, data: str, mime_type: str) -> bool:
+        """Decide whether a base64 audio chunk must be sent to Gemini.
+
+        Args:
+            data: Base64-encoded 16-bit PCM chunk, as sent by the client.
+            mime_type: Mime type of the chunk, e.g. ``audio/pcm;rate=16000``.
+
+        Returns:
+            False if the chunk is silence past the hangover period.
+        """
+        try:
+            pcm = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return True
+        self.bytes_received += len(data)
+        sample_rate = sample_rate_from_mime(mime_type)
+        if contains_speech(pcm, sample_rate, self.threshold_db):
+            self._silence_seconds = 0.0
+            return True
+
+        within_hangover = self._silence_seconds < self.hangover
+        self._silence_seconds += len(pcm) / 2 / sample_rate
+        if within_hangover:
+            return True
+        self.bytes_dropped += len(data)
+        self.chunks_dropped += 1
+        return False
+
+    def stats(self) -> dict[str, int]:
+        """Bytes received and saved for this session."""
+        return {
+            "audio_bytes_received": self.bytes_received,
+            "audio_bytes_saved": self.bytes_dropped,
+            "audio_chunks_dropped": self.chunks_dropped,
+        }
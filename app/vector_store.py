@@ -12,44 +12,249 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
 import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from contextvars import ContextVar
+from pathlib import Path
 
 from langchain.schema import Document
-from langchain.text_splitter import CharacterTextSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import SKLearnVectorStore
 from langchain_core.embeddings import Embeddings
 
+from app.chunking import SemanticChunker
+from app.embeddings import LocalEmbeddings
+
 PERSIST_PATH = ".persist_vector_store"
+DEFAULT_CORPUS = "default"
+# JSON file mapping corpus ids to the URLs of their documents
+VECTOR_STORE_CORPORA = os.getenv("VECTOR_STORE_CORPORA", "")
+# Memory budget of the vector stores kept loaded at the same time
+VECTOR_STORE_MAX_MB = float(os.getenv("VECTOR_STORE_MAX_MB", "512"))
+# A loaded store holds each embedding value both as a Python float in a list
+# (~32 bytes) and in a float64 matrix
+BYTES_PER_VALUE = 32 + 8
+
+# Corpus searched by the tool calls of the current session
+current_corpus_id: ContextVar[str] = ContextVar(
+    "current_corpus_id", default=DEFAULT_CORPUS
+)
 
 
 def load_and_split_documents(urls: list[str]) -> list[Document]:
     """Load and split documents from a list of URLs."""
-    docs = [WebBaseLoader(url).load() for url in urls]
-    docs_list = [item for sublist in docs for item in sublist]
-    logging.info(f"# of documents loaded (pre-chunking) = {len(docs_list)}")
-
-    text_splitter = CharacterTextSplitter(chunk_size=2000, chunk_overlap=50)
-    doc_splits = text_splitter.split_documents(docs_list)
+    docs = (doc for url in urls for doc in WebBaseLoader(url).lazy_load())
+    doc_splits = list(SemanticChunker().split_documents(docs))
     logging.info(f"# of documents after split = {len(doc_splits)}")
 
     return doc_splits
 
 
+def default_persist_path(backend: str) -> str:
+    """Vector store path for an embedding backend.
+
+    Stored vectors only match the backend that produced them.
+    """
+    return PERSIST_PATH if backend == "vertexai" else f"{PERSIST_PATH}_{backend}"
+
+
+def _load_fitted(embedding: Embeddings, fitted_path: str) -> bool:
+    """Load the fitted parameters of local embeddings for a persisted store.
+
+    Returns:
+        Whether the persisted store can be opened with the embedding. It
+        cannot if the parameters are missing, e.g. for a store persisted
+        before local embeddings were fitted, or unusable.
+    """
+    if not isinstance(embedding, LocalEmbeddings):
+        return True
+    if not os.path.exists(fitted_path):
+        logging.warning(f"{fitted_path} not found, rebuilding the vector store")
+        return False
+    try:
+        embedding.load(fitted_path)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not load {fitted_path}, rebuilding the store: {e!s}")
+        return False
+    return True
+
+
 def get_vector_store(
     embedding: Embeddings, urls: list[str], persist_path: str = PERSIST_PATH
 ) -> SKLearnVectorStore:
-    """Get or create a vector store."""
+    """Get or create a vector store.
 
-    if os.path.exists(persist_path):
+    ``LocalEmbeddings`` are fitted on the documents when the store is
+    created, and their parameters are saved to ``<persist_path>.npz``. A
+    persisted store whose parameters are missing is rebuilt.
+    """
+    fitted_path = f"{persist_path}.npz"
+    if os.path.exists(persist_path) and _load_fitted(embedding, fitted_path):
         vector_store = SKLearnVectorStore(
             embedding=embedding, persist_path=persist_path
         )
     else:
         doc_splits = load_and_split_documents(urls=urls)
+        if isinstance(embedding, LocalEmbeddings):
+            embedding.fit([doc.page_content for doc in doc_splits])
+            embedding.save(fitted_path)
         vector_store = SKLearnVectorStore.from_documents(
             documents=doc_splits, embedding=embedding, persist_path=persist_path
         )
         vector_store.persist()
+        _save_size(persist_path, embedding, doc_splits)
     return vector_store
+
+
+def _size_path(persist_path: str) -> str:
+    return f"{persist_path}.size.json"
+
+
+def _save_size(
+    persist_path: str, embedding: Embeddings, doc_splits: list[Document]
+) -> None:
+    """Record what a store holds, to size it once loaded."""
+    dimension = (
+        len(embedding.embed_query(doc_splits[0].page_content)) if doc_splits else 0
+    )
+    size = {
+        "values": len(doc_splits) * dimension,
+        "text_bytes": sum(len(doc.page_content) for doc in doc_splits),
+    }
+    with open(_size_path(persist_path), "w", encoding="utf-8") as f:
+        json.dump(size, f)
+
+
+def resident_bytes(persist_path: str) -> int:
+    """Approximate memory a persisted store takes once loaded.
+
+    Computed from the chunks and embedding dimension recorded when the store
+    was built. Stores persisted before that are sized by their file, and 0 is
+    returned when nothing was persisted.
+    """
+    try:
+        with open(_size_path(persist_path), encoding="utf-8") as f:
+            size = json.load(f)
+        return size["values"] * BYTES_PER_VALUE + size["text_bytes"]
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        return os.path.getsize(persist_path)
+    except OSError:
+        return 0
+
+
+def load_corpora(
+    default_urls: list[str], path: str = VECTOR_STORE_CORPORA
+) -> dict[str, list[str]]:
+    """Read the corpus ids and their URLs, e.g. one corpus per company or role.
+
+    Args:
+        default_urls: URLs of the ``DEFAULT_CORPUS``.
+        path: JSON file with ``{corpus_id: [url, ...]}``. Optional.
+    """
+    corpora = {DEFAULT_CORPUS: default_urls}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            corpora.update(json.load(f))
+    return corpora
+
+
+class VectorStoreManager:
+    """Persisted vector stores of several corpora, loaded on first use.
+
+    Loaded stores are read-only and shared by every session. The least
+    recently used ones are unloaded when the loaded stores exceed the memory
+    budget; they stay on disk and are reloaded on the next query.
+    """
+
+    def __init__(
+        self,
+        corpora: dict[str, list[str]],
+        embedding_factory: Callable[[], Embeddings],
+        persist_root: str | Path = PERSIST_PATH,
+        max_bytes: int = int(VECTOR_STORE_MAX_MB * 2**20),
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            corpora: URLs of the documents of each corpus, by corpus id.
+            embedding_factory: Creates the embedding model of a corpus. Each
+                store gets its own, as local embeddings are fitted per corpus.
+            persist_root: Path of the default corpus store; other corpora are
+                stored next to it as ``<persist_root>_<corpus_id>``.
+            max_bytes: Memory budget of the loaded stores. The most recently
+                used store is always kept, even above the budget.
+        """
+        self.corpora = corpora
+        self.embedding_factory = embedding_factory
+        self.persist_root = str(persist_root)
+        self.max_bytes = max_bytes
+        self._resident: OrderedDict[str, tuple[SKLearnVectorStore, int]] = OrderedDict()
+        self._guard = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self.loads = 0
+
+    def __contains__(self, corpus_id: str) -> bool:
+        return corpus_id in self.corpora
+
+    @property
+    def resident_bytes(self) -> int:
+        """Approximate memory held by the loaded stores."""
+        with self._guard:
+            return sum(size for _, size in self._resident.values())
+
+    def resident(self) -> list[str]:
+        """Ids of the loaded corpora, least recently used first."""
+        with self._guard:
+            return list(self._resident)
+
+    def persist_path(self, corpus_id: str) -> str:
+        """Path of a corpus store on disk."""
+        if corpus_id == DEFAULT_CORPUS:
+            return self.persist_root
+        return f"{self.persist_root}_{corpus_id}"
+
+    def get(self, corpus_id: str) -> SKLearnVectorStore:
+        """Return the store of a corpus, loading or building it if needed.
+
+        Concurrent first queries of the same corpus share a single load.
+
+        Raises:
+            KeyError: If the corpus is unknown.
+        """
+        urls = self.corpora[corpus_id]
+        with self._guard:
+            if corpus_id in self._resident:
+                self._resident.move_to_end(corpus_id)
+                return self._resident[corpus_id][0]
+            load_lock = self._load_locks.setdefault(corpus_id, threading.Lock())
+        with load_lock:
+            with self._guard:
+                if corpus_id in self._resident:
+                    self._resident.move_to_end(corpus_id)
+                    return self._resident[corpus_id][0]
+            persist_path = self.persist_path(corpus_id)
+            vector_store = get_vector_store(
+                embedding=self.embedding_factory(),
+                urls=urls,
+                persist_path=persist_path,
+            )
+            size = resident_bytes(persist_path)
+            logging.info(f"Loaded corpus {corpus_id} ({size / 2**20:.1f} MB)")
+            with self._guard:
+                self.loads += 1
+                self._resident[corpus_id] = (vector_store, size)
+                self._evict()
+        return vector_store
+
+    def _evict(self) -> None:
+        total = sum(size for _, size in self._resident.values())
+        while total > self.max_bytes and len(self._resident) > 1:
+            corpus_id, (_, size) = self._resident.popitem(last=False)
+            total -= size
+            logging.info(f"Unloaded corpus {corpus_id} ({size / 2**20:.1f} MB)")
@@ -0,0 +1,166 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deduplication and rate limiting of webcam frames sent to Gemini.
+
+The browser sends webcam snapshots at a fixed rate, and during an interview
+most of them are nearly identical. ``FrameFilter`` decodes each JPEG at a
+tiny size, compares it with the last forwarded frame using a difference hash
+and the mean absolute difference of a downsampled grayscale image, and drops
+near-duplicates. Frames that do change are forwarded within a per-session
+budget; a refresh frame is still sent periodically so the model keeps an
+up-to-date view of the candidate.
+
+Decoding uses Pillow when it is installed. Without it, frames are only rate
+limited.
+"""
+
+import base64
+import binascii
+import io
+import logging
+import os
+import time
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+VIDEO_FILTER_ENABLED = os.getenv("VIDEO_FILTER_ENABLED", "true").lower() == "true"
+VIDEO_FRAMES_PER_MINUTE = float(os.getenv("VIDEO_FRAMES_PER_MINUTE", "20"))
+# Forward a frame at least this often, even if nothing changed
+VIDEO_REFRESH_SECONDS = float(os.getenv("VIDEO_REFRESH_SECONDS", "15"))
+HASH_SIZE = 8
+THUMBNAIL_SIZE = 16
+# Frames within both thresholds of the last forwarded one are duplicates
+MAX_DUPLICATE_HAMMING = 6
+MAX_DUPLICATE_MEAN_DIFF = 6.0
+
+
+def frame_signature(jpeg: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the difference hash and grayscale thumbnail of a JPEG frame.
+
+    Args:
+        jpeg: Encoded image bytes.
+
+    Returns:
+        The boolean dHash bits and a float32 thumbnail.
+    """
+    with Image.open(io.BytesIO(jpeg)) as image:
+        # Let the JPEG decoder downscale while decoding, which is much cheaper
+        image.draft("L", (THUMBNAIL_SIZE * 2, THUMBNAIL_SIZE * 2))
+        gray = image.convert("L")
+        hash_pixels = np.asarray(
+            gray.resize((HASH_SIZE + 1, HASH_SIZE)), dtype=np.int16
+        )
+        thumbnail = np.asarray(
+            gray.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE)), dtype=np.float32
+        )
+    return hash_pixels[:, 1:] > hash_pixels[:, :-1], thumbnail
+
+
+class FrameFilter:
+    """Per-session filter for webcam frames."""
+
+    def __init__(
+        self,
+        frames_per_minute: float = VIDEO_FRAMES_PER_MINUTE,
+        refresh_seconds: float = VIDEO_REFRESH_SECONDS,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            frames_per_minute: Budget of frames forwarded to Gemini per minute.
+            refresh_seconds: Maximum time between forwarded frames.
+        """
+        self.rate = frames_per_minute / 60
+        self.burst = max(frames_per_minute / 12, 1.0)
+        self.refresh_seconds = refresh_seconds
+        self._tokens = self.burst
+        self._last_refill: float | None = None
+        self._last_forwarded_at: float | None = None
+        self._last_hash: np.ndarray | None = None
+        self._last_thumbnail: np.ndarray | None = None
+        self.bytes_received = 0
+        self.bytes_dropped = 0
+        self.frames_dropped = 0
+        if Image is None:
+            logging.warning("Pillow is not installed, video deduplication is off")
+
+    def _is_duplicate(
+        self, jpeg: bytes
+    ) -> tuple[bool, np.ndarray | None, np.ndarray | None]:
+        if Image is None:
+            return False, None, None
+        try:
+            frame_hash, thumbnail = frame_signature(jpeg)
+        except (OSError, ValueError):
+            return False, None, None
+        if self._last_hash is None or self._last_thumbnail is None:
+            return False, frame_hash, thumbnail
+        hamming = np.count_nonzero(frame_hash != self._last_hash)
+        mean_diff = float(np.mean(np.abs(thumbnail - self._last_thumbnail)))
+        duplicate = (
+            hamming <= MAX_DUPLICATE_HAMMING and mean_diff <= MAX_DUPLICATE_MEAN_DIFF
+        )
+        return duplicate, frame_hash, thumbnail
+
+    def should_forward(self, data: str, now: float | None = None) -> bool:
+        """Decide whether a base64 JPEG frame must be sent to Gemini.
+
+        Args:
+            data: Base64-encoded image, as sent by the client.
+            now: Current monotonic time, for testing.
+
+        Returns:
+            False if the frame is a near-duplicate or over the session budget.
+        """
+        now = time.monotonic() if now is None else now
+        try:
+            jpeg = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return True
+        self.bytes_received += len(data)
+
+        if self._last_refill is not None:
+            elapsed = now - self._last_refill
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+        due_refresh = (
+            self._last_forwarded_at is None
+            or now - self._last_forwarded_at >= self.refresh_seconds
+        )
+        duplicate, frame_hash, thumbnail = self._is_duplicate(jpeg)
+
+        if self._tokens < 1 or (duplicate and not due_refresh):
+            self.bytes_dropped += len(data)
+            self.frames_dropped += 1
+            return False
+
+        self._tokens -= 1
+        self._last_forwarded_at = now
+        if frame_hash is not None:
+            self._last_hash, self._last_thumbnail = frame_hash, thumbnail
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Bytes received and saved for this session."""
+        return {
+            "video_bytes_received": self.bytes_received,
+            "video_bytes_saved": self.bytes_dropped,
+            "video_frames_dropped": self.frames_dropped,
+        }
@@ -36,7 +36,27 @@ import {
   ToolResponseMessage,
   type LiveConfig,
 } from "../multimodal-live-types";
-import { blobToJSON, base64ToArrayBuffer } from "./utils";
+import { base64ToArrayBuffer } from "./utils";
+
+/**
+ * binary audio frames sent by the backend when `audio_framing` is "binary":
+ * [type: u8][version: u8][sample rate: u32 LE][raw pcm...]
+ * JSON frames always start with "{", so the first byte tells them apart.
+ */
+const AUDIO_FRAME_TYPE = 0x01;
+const AUDIO_FRAME_HEADER_SIZE = 6;
+
+/**
+ * close codes the client retries with the same run id, so the interview
+ * resumes: 1012 from a backend instance that is shutting down, and 1013 from
+ * one that is overloaded or draining. the delay doubles on each attempt and
+ * is jittered so rejected clients do not reconnect all at once.
+ */
+const SERVICE_RESTART = 1012;
+const TRY_AGAIN_LATER = 1013;
+const RESUME_DELAY_MS = 1000;
+const MAX_RESUME_DELAY_MS = 30000;
+const MAX_RESUME_ATTEMPTS = 6;
 
 /**
  * the events that this client will emit
@@ -59,6 +79,10 @@ export type MultimodalLiveAPIClientConnection = {
   url?: string;
   runId?: string;
   userId?: string;
+  // candidate and offer the backend builds the interviewer instruction for
+  cv?: string;
+  jobOffer?: string;
+  language?: string;
 };
 
 /**
@@ -71,13 +95,28 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
   protected config: LiveConfig | null = null;
   public url: string = "";
   private runId: string;
+  // reconnections since the last session that completed its setup
+  private resumeAttempts = 0;
+  private resumeTimer?: ReturnType<typeof setTimeout>;
   private userId?: string;
-  constructor({ url, userId, runId }: MultimodalLiveAPIClientConnection) {
+  private candidate: Pick<
+    MultimodalLiveAPIClientConnection,
+    "cv" | "jobOffer" | "language"
+  >;
+  constructor({
+    url,
+    userId,
+    runId,
+    cv,
+    jobOffer,
+    language,
+  }: MultimodalLiveAPIClientConnection) {
     super();
     url = url || `ws://localhost:8000/ws`;
     this.url = new URL("ws", url).href;
     this.userId = userId;
     this.runId = runId || crypto.randomUUID(); // Ensure runId is always a string by providing default
+    this.candidate = { cv, jobOffer, language };
     this.send = this.send.bind(this);
   }
 
@@ -104,6 +143,11 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
       } else if (typeof evt.data === "string") {
         try {
           const jsonData = JSON.parse(evt.data);
+          if (jsonData.heartbeat) {
+            // answer so the backend does not reap the session as idle
+            this._sendDirect({ heartbeat: jsonData.heartbeat });
+            return;
+          }
           if (jsonData.status) {
             this.log("server.status", jsonData.status);
             console.log("Status:", jsonData.status); // This will show in console
@@ -134,6 +178,11 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
           setup: {
             run_id: this.runId,
             user_id: this.userId,
+            // receive model audio as raw pcm frames instead of base64 json
+            audio_framing: "binary",
+            cv: this.candidate.cv,
+            job_offer: this.candidate.jobOffer,
+            language: this.candidate.language,
           },
         };
         this._sendDirect(setupMessage);
@@ -141,6 +190,29 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
         ws.addEventListener("close", (ev: CloseEvent) => {
           console.log(ev);
           this.disconnect(ws);
+          if (
+            (ev.code === SERVICE_RESTART || ev.code === TRY_AGAIN_LATER) &&
+            this.resumeAttempts < MAX_RESUME_ATTEMPTS
+          ) {
+            const delay =
+              Math.min(
+                MAX_RESUME_DELAY_MS,
+                RESUME_DELAY_MS * 2 ** this.resumeAttempts,
+              ) *
+              (1 + Math.random());
+            this.resumeAttempts += 1;
+            this.log(
+              "server.close",
+              ev.code === SERVICE_RESTART
+                ? "server restarting, resuming interview"
+                : `server busy, retrying in ${Math.round(delay / 1000)}s`,
+            );
+            this.resumeTimer = setTimeout(() => {
+              this.resumeTimer = undefined;
+              this.connect().catch(() => this.emit("close", ev));
+            }, delay);
+            return;
+          }
           let reason = ev.reason || "";
           if (reason.toLowerCase().includes("error")) {
             const prelude = "ERROR]";
@@ -164,6 +236,11 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
   }
 
   disconnect(ws?: WebSocket) {
+    if (!ws && this.resumeTimer !== undefined) {
+      // closed by the app: do not resume behind its back
+      clearTimeout(this.resumeTimer);
+      this.resumeTimer = undefined;
+    }
     // could be that this is an old websocket and there's already a new instance
     // only close it if its still the correct reference
     if ((!ws || this.ws === ws) && this.ws) {
@@ -175,7 +252,17 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
     return false;
   }
   protected async receive(blob: Blob) {
-    const response = (await blobToJSON(blob)) as LiveIncomingMessage;
+    const buffer = await blob.arrayBuffer();
+    const bytes = new Uint8Array(buffer);
+    if (bytes[0] === AUDIO_FRAME_TYPE) {
+      const data = buffer.slice(AUDIO_FRAME_HEADER_SIZE);
+      this.emit("audio", data);
+      this.log(`server.audio`, `buffer (${data.byteLength})`);
+      return;
+    }
+    const response = JSON.parse(
+      new TextDecoder().decode(bytes),
+    ) as LiveIncomingMessage;
     console.log("Parsed response:", response);
 
     if (isToolCallMessage(response)) {
@@ -191,6 +278,7 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
 
     if (isSetupCompleteMessage(response)) {
       this.log("server.send", "setupComplete");
+      this.resumeAttempts = 0;
       this.emit("setupcomplete");
       return;
     }
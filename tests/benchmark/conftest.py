@@ -0,0 +1,263 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixtures and harness for the microbenchmark suite.
+
+Every benchmark runs against deterministic fakes for ``ChatVertexAI`` and the
+Vertex AI embeddings, so results only depend on the code under test. Each
+benchmark is measured twice: once for CPU/wall time and once under
+``tracemalloc`` for peak and retained memory. Results are compared against
+``baselines.json`` and written to ``.results/results.json``.
+
+Environment variables:
+    BENCHMARK_UPDATE=1: overwrite ``baselines.json`` with the current results.
+    BENCHMARK_STRICT=1: also fail on timing regressions (memory is always checked).
+"""
+
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Generator, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.auth.credentials import Credentials
+from langchain_community.vectorstores import SKLearnVectorStore
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINES_PATH = BENCHMARK_DIR / "baselines.json"
+RESULTS_PATH = BENCHMARK_DIR / ".results" / "results.json"
+
+EMBEDDING_SIZE = 768
+FAKE_REPORT = "Informe: perfil sólido, buena comunicación. Recomendación: avanzar."
+
+# Allowed regression before a benchmark fails, relative to its baseline
+MEMORY_TOLERANCE = 0.25
+TIME_TOLERANCE = 1.0
+# Absolute slack so tiny baselines do not fail on allocator noise
+MEMORY_SLACK_KIB = 16.0
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for a single benchmark."""
+
+    name: str
+    rounds: int
+    cpu_ms_per_op: float
+    wall_ms_per_op: float
+    peak_kib: float
+    retained_kib_per_op: float
+
+
+_results: dict[str, BenchmarkResult] = {}
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[], Any],
+    rounds: int,
+    setup: Callable[[], Any] | None = None,
+) -> BenchmarkResult:
+    """Measure ``func`` over ``rounds`` calls.
+
+    Args:
+        name: Benchmark identifier used as key in the baselines file.
+        func: Callable executed once per round.
+        rounds: Number of calls per measurement pass.
+        setup: Optional callable run before each measurement pass to reset state.
+
+    Returns:
+        The collected measurements.
+    """
+    if setup:
+        setup()
+    func()  # Warm up caches and lazy imports outside of the measurement
+
+    # Timing pass, without tracemalloc overhead
+    if setup:
+        setup()
+    gc.collect()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(rounds):
+        func()
+    cpu_elapsed = time.process_time() - cpu_start
+    wall_elapsed = time.perf_counter() - wall_start
+
+    # Memory pass
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(rounds):
+            func()
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = BenchmarkResult(
+        name=name,
+        rounds=rounds,
+        cpu_ms_per_op=cpu_elapsed * 1000 / rounds,
+        wall_ms_per_op=wall_elapsed * 1000 / rounds,
+        peak_kib=(peak - before) / 1024,
+        retained_kib_per_op=max(after - before, 0) / 1024 / rounds,
+    )
+    _results[name] = result
+    logger.info(f"Benchmark result: {result}")
+    return result
+
+
+def _load_baselines() -> dict[str, dict[str, Any]]:
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def check_regression(result: BenchmarkResult) -> None:
+    """Fail the current test if ``result`` regressed against its baseline."""
+    if os.getenv("BENCHMARK_UPDATE") == "1":
+        return
+    baseline = _load_baselines().get(result.name)
+    if baseline is None:
+        logger.warning(f"No baseline for {result.name}, run with BENCHMARK_UPDATE=1")
+        return
+
+    failures = []
+    for metric in ("peak_kib", "retained_kib_per_op"):
+        limit = baseline[metric] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK_KIB
+        if getattr(result, metric) > limit:
+            failures.append(
+                f"{metric}: {getattr(result, metric):.1f} > {limit:.1f} "
+                f"(baseline {baseline[metric]:.1f})"
+            )
+    if os.getenv("BENCHMARK_STRICT") == "1":
+        limit = baseline["cpu_ms_per_op"] * (1 + TIME_TOLERANCE)
+        if result.cpu_ms_per_op > limit:
+            failures.append(
+                f"cpu_ms_per_op: {result.cpu_ms_per_op:.3f} > {limit:.3f} "
+                f"(baseline {baseline['cpu_ms_per_op']:.3f})"
+            )
+    if failures:
+        pytest.fail(f"Benchmark {result.name} regressed: " + "; ".join(failures))
+
+
+@pytest.fixture
+def benchmark() -> Callable[..., BenchmarkResult]:
+    """Run a benchmark and check it against the stored baseline."""
+
+    def _benchmark(
+        name: str,
+        func: Callable[[], Any],
+        rounds: int = 50,
+        setup: Callable[[], Any] | None = None,
+    ) -> BenchmarkResult:
+        result = run_benchmark(name, func, rounds=rounds, setup=setup)
+        check_regression(result)
+        return result
+
+    return _benchmark
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Persist the results, and the baselines when requested."""
+    if not _results:
+        return
+    payload = {name: asdict(r) for name, r in sorted(_results.items())}
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(payload, indent=2) + "\n")
+    if os.getenv("BENCHMARK_UPDATE") == "1":
+        baselines = _load_baselines()
+        baselines.update(payload)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2) + "\n")
+
+
+def make_fake_chat_model() -> FakeListChatModel:
+    """Create a chat model that always answers with the same report."""
+    return FakeListChatModel(responses=[FAKE_REPORT])
+
+
+@pytest.fixture
+def fake_chat_model() -> FakeListChatModel:
+    """Deterministic stand-in for ``ChatVertexAI``."""
+    return make_fake_chat_model()
+
+
+def make_fake_vector_store(embedding: Any, urls: list[str], **kwargs: Any) -> Any:
+    """Build an in-memory vector store over a synthetic MLOps corpus."""
+    topics = ["deployment", "monitoring", "evaluation", "CI/CD", "feature stores"]
+    docs = [
+        Document(
+            page_content=f"Document {i} about {topics[i % len(topics)]} "
+            "for generative AI applications in production. " * 20
+        )
+        for i in range(200)
+    ]
+    return SKLearnVectorStore.from_documents(documents=docs, embedding=embedding)
+
+
+@pytest.fixture(scope="session")
+def agent_module() -> Iterator[ModuleType]:
+    """Import ``app.agent`` with cloud clients replaced by deterministic fakes."""
+    if "app.agent" in sys.modules:
+        yield sys.modules["app.agent"]
+        return
+
+    import app.interview_agent
+
+    with (
+        patch(
+            "google.auth.default",
+            return_value=(MagicMock(spec=Credentials), "mock-project-id"),
+        ),
+        patch("google.cloud.logging.Client"),
+        patch(
+            "langchain_google_vertexai.VertexAIEmbeddings",
+            side_effect=lambda **_: DeterministicFakeEmbedding(size=EMBEDDING_SIZE),
+        ),
+        patch("app.vector_store.get_vector_store", make_fake_vector_store),
+        patch.object(
+            app.interview_agent,
+            "ChatVertexAI",
+            side_effect=lambda **_: make_fake_chat_model(),
+        ),
+    ):
+        import app.agent
+
+        yield app.agent
+
+
+@pytest.fixture(scope="session")
+def server_module(agent_module: ModuleType) -> Generator[ModuleType, None, None]:
+    """Import ``app.server`` on top of the faked ``app.agent``."""
+    with patch("google.cloud.logging.Client"):
+        import app.server
+
+        yield app.server
@@ -0,0 +1,48 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Callable
+
+import pytest
+
+from app.embeddings import LocalEmbeddings
+
+QUERY = "How should I monitor a generative AI application in production?"
+TOPICS = ["deployment", "monitoring", "evaluation", "CI/CD", "feature stores"]
+CORPUS = [
+    f"Document {i} about {TOPICS[i % len(TOPICS)]} "
+    "for generative AI applications in production. " * 20
+    for i in range(200)
+]
+
+
+@pytest.mark.parametrize("n_components", [0, 128])
+def test_local_embed_query(benchmark: Callable, n_components: int) -> None:
+    """Embedding a single query with the local backend."""
+    embedding = LocalEmbeddings(n_components=n_components).fit(CORPUS)
+    benchmark(
+        f"embeddings.local_query_svd{n_components}",
+        lambda: embedding.embed_query(QUERY),
+        rounds=500,
+    )
+
+
+def test_local_embed_documents(benchmark: Callable) -> None:
+    """Embedding the 200-document corpus in one batch."""
+    embedding = LocalEmbeddings(n_components=128).fit(CORPUS)
+    benchmark(
+        "embeddings.local_documents_200",
+        lambda: embedding.embed_documents(CORPUS),
+        rounds=10,
+    )
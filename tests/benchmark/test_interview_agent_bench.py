@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.interview_agent import InterviewAgent
+from app.turn_log import INTRO_PHASE, TurnLog
+
+ANSWER = (
+    "He trabajado cinco años como desarrollador backend en Python, "
+    "principalmente con FastAPI, SQLAlchemy y PostgreSQL desplegado en Kubernetes."
+)
+TURNS_PER_INTERVIEW = 12
+
+
+def _node_state() -> dict[str, Any]:
+    turnos = TurnLog()
+    turnos.ask(INTRO_PHASE, 0)
+    turnos.answer(ANSWER)
+    return {
+        "estado_actual": "experiencia",
+        "informacion_recopilada": {"presentacion": ANSWER},
+        "turnos": turnos,
+    }
+
+
+def test_process_response_per_turn(
+    benchmark: Callable, fake_chat_model: FakeListChatModel
+) -> None:
+    """Per-turn cost of ``InterviewAgent.process_response``."""
+    agent = InterviewAgent(model=fake_chat_model)
+
+    benchmark(
+        "interview_agent.process_response",
+        lambda: agent.process_response(ANSWER),
+        rounds=TURNS_PER_INTERVIEW,
+        setup=agent.reset_interview,
+    )
+
+
+def test_aprocess_response_per_turn(
+    benchmark: Callable, fake_chat_model: FakeListChatModel
+) -> None:
+    """Per-turn cost of ``InterviewAgent.aprocess_response``."""
+    agent = InterviewAgent(model=fake_chat_model)
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(
+            "interview_agent.aprocess_response",
+            lambda: loop.run_until_complete(agent.aprocess_response(ANSWER)),
+            rounds=TURNS_PER_INTERVIEW,
+            setup=agent.reset_interview,
+        )
+    finally:
+        loop.close()
+
+
+def test_entrevistador_node(
+    benchmark: Callable, fake_chat_model: FakeListChatModel
+) -> None:
+    """Cost of asking the next question in isolation."""
+    agent = InterviewAgent(model=fake_chat_model)
+    state = _node_state()
+
+    def run() -> None:
+        agent.current_question_index = 0
+        agent.entrevistador_node(state)
+
+    benchmark("interview_agent.entrevistador_node", run, rounds=500)
+
+
+def test_evaluador_node(
+    benchmark: Callable, fake_chat_model: FakeListChatModel
+) -> None:
+    """Cost of evaluating an answer in isolation."""
+    agent = InterviewAgent(model=fake_chat_model)
+    state = _node_state()
+
+    def run() -> None:
+        agent.current_question_index = 0
+        agent.estados["experiencia"]["completado"] = False
+        agent.evaluador_node(state)
+
+    benchmark("interview_agent.evaluador_node", run, rounds=500)
+
+
+def test_full_interview_memory_growth(
+    benchmark: Callable, fake_chat_model: FakeListChatModel
+) -> None:
+    """Memory retained by complete interviews, one fresh agent each."""
+    agents = []
+
+    def run() -> None:
+        agent = InterviewAgent(model=fake_chat_model)
+        for _ in range(TURNS_PER_INTERVIEW):
+            agent.process_response(ANSWER)
+        # Keep agents alive, like concurrent sessions on one instance
+        agents.append(agent)
+
+    benchmark("interview_agent.full_interview", run, rounds=5, setup=agents.clear)
@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from app.matching import MatchingIndex
+
+PROFILES = 100_000
+DIMENSION = 256
+
+
+class _RandomEmbeddings(Embeddings):
+    """Random unit vectors, so building a large index stays cheap."""
+
+    def __init__(self) -> None:
+        self._rng = np.random.default_rng(0)
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        vectors = self._rng.standard_normal((len(texts), DIMENSION), np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0].tolist()
+
+
+@pytest.fixture(scope="module")
+def matching_index(tmp_path_factory: pytest.TempPathFactory) -> MatchingIndex:
+    path: Path = tmp_path_factory.mktemp("matching")
+    index = MatchingIndex(path, embedding=_RandomEmbeddings())
+    index.add_candidates((f"candidate-{i}", "cv") for i in range(PROFILES))
+    index.add_offers((f"offer-{i}", "offer") for i in range(100))
+    return index
+
+
+def test_top_candidates_100k(
+    benchmark: Callable, matching_index: MatchingIndex
+) -> None:
+    """Top 10 of 100k candidates for one offer."""
+    benchmark(
+        "matching.top_candidates_100k",
+        lambda: matching_index.top_candidates(["offer-0"], k=10),
+        rounds=20,
+    )
+
+
+def test_top_candidates_100k_batch(
+    benchmark: Callable, matching_index: MatchingIndex
+) -> None:
+    """Top 10 of 100k candidates for 32 offers in a single pass."""
+    offer_ids = [f"offer-{i}" for i in range(32)]
+    benchmark(
+        "matching.top_candidates_100k_batch32",
+        lambda: matching_index.top_candidates(offer_ids, k=10),
+        rounds=5,
+    )
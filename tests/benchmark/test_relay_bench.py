@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import base64
+import json
+from collections.abc import Callable
+from types import ModuleType
+from unittest.mock import AsyncMock
+
+MESSAGES_PER_ROUND = 100
+# 100 ms of 24 kHz 16-bit mono PCM, the size of a typical Gemini audio chunk
+AUDIO_CHUNK = bytes(4800)
+
+
+def _audio_frame() -> bytes:
+    return json.dumps(
+        {
+            "serverContent": {
+                "modelTurn": {
+                    "parts": [
+                        {
+                            "inlineData": {
+                                "mimeType": "audio/pcm;rate=24000",
+                                "data": base64.b64encode(AUDIO_CHUNK).decode(),
+                            }
+                        }
+                    ]
+                }
+            }
+        }
+    ).encode()
+
+
+class _FakeLiveWebSocket:
+    """Replays the same frames on every round, then signals end of stream."""
+
+    def __init__(self, frames: list[bytes]) -> None:
+        self.frames = frames
+        self.iterator = iter(())
+
+    def rewind(self) -> None:
+        self.iterator = iter(self.frames)
+
+    async def recv(self, decode: bool = True) -> bytes | None:
+        return next(self.iterator, None)
+
+
+def test_receive_from_gemini_audio(
+    benchmark: Callable, server_module: ModuleType
+) -> None:
+    """Per-round cost of relaying and parsing Gemini audio messages."""
+    live_ws = _FakeLiveWebSocket([_audio_frame()] * MESSAGES_PER_ROUND)
+    live_session = AsyncMock()
+    live_session._ws = live_ws
+    websocket = AsyncMock()
+    gemini_session = server_module.GeminiSession(
+        session=live_session, websocket=websocket, tool_functions={}
+    )
+    loop = asyncio.new_event_loop()
+
+    def run() -> None:
+        live_ws.rewind()
+        loop.run_until_complete(gemini_session.receive_from_gemini())
+        websocket.reset_mock()
+
+    try:
+        benchmark("relay.receive_from_gemini", run, rounds=20)
+    finally:
+        loop.close()
+
+
+def test_retrieve_docs(benchmark: Callable, agent_module: ModuleType) -> None:
+    """Cost of retrieving and formatting documents over the fake corpus."""
+    benchmark(
+        "agent.retrieve_docs",
+        lambda: agent_module.retrieve_docs("How do I monitor a deployed model?"),
+        rounds=50,
+    )
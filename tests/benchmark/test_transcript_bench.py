@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Callable
+
+import pytest
+
+from app.transcript_store import TranscriptStore
+from app.turn_log import TurnLog
+
+INTERVIEWS = 2000
+TURNS = 9
+SKILLS = ["Python", "Kubernetes", "Terraform", "React", "SQL", "Go", "Rust", "Spark"]
+
+
+@pytest.fixture(scope="module")
+def store() -> TranscriptStore:
+    """2000 interviews of nine answered turns each."""
+    store = TranscriptStore(":memory:")
+    for i in range(INTERVIEWS):
+        turns = TurnLog()
+        for j in range(TURNS):
+            turns.ask(0, j, now=float(j))
+            skill = SKILLS[(i * 7 + j) % len(SKILLS)]
+            turns.answer(
+                f"En mi último proyecto usé {skill} para desplegar servicios "
+                f"y mejorar el rendimiento del equipo {i}.",
+                now=float(j),
+            )
+        store.record_turns(
+            f"run-{i}", turns, lambda p, q: f"Pregunta {q}", lambda p: "tecnico"
+        )
+    return store
+
+
+def test_transcript_search(benchmark: Callable, store: TranscriptStore) -> None:
+    """Searching 18k turns for a skill and a prefix, top 20 interviews."""
+    benchmark(
+        "transcripts.search_2000_interviews",
+        lambda: store.search("kubernetes despleg*"),
+        rounds=50,
+    )
+
+
+def test_transcript_record_turn(benchmark: Callable) -> None:
+    """Writing the latest turns of an interview after an answer."""
+    store = TranscriptStore(":memory:")
+    turns = TurnLog()
+
+    def record() -> None:
+        turns.answer("Uso Python y SQL a diario en producción.")
+        store.record_turns("run", turns, lambda p, q: "Pregunta", lambda p: "tecnico")
+
+    benchmark("transcripts.record_turn", record, rounds=200)
@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+from collections.abc import Iterator
+from types import ModuleType
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.auth.credentials import Credentials
+from langchain_community.vectorstores import SKLearnVectorStore
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.state_store import InMemoryStateStore
+
+
+@pytest.fixture
+def agent_module(monkeypatch: pytest.MonkeyPatch) -> Iterator[ModuleType]:
+    """``app.agent`` imported with cloud clients faked, on an empty store."""
+    import app.interview_agent
+
+    with (
+        patch(
+            "google.auth.default",
+            return_value=(MagicMock(spec=Credentials), "mock-project-id"),
+        ),
+        patch("google.cloud.logging.Client"),
+        patch(
+            "langchain_google_vertexai.VertexAIEmbeddings",
+            side_effect=lambda **_: DeterministicFakeEmbedding(size=16),
+        ),
+        patch(
+            "app.vector_store.get_vector_store",
+            lambda embedding, urls, **_: SKLearnVectorStore.from_documents(
+                [Document(page_content="MLOps")], embedding
+            ),
+        ),
+        patch.object(
+            app.interview_agent,
+            "ChatVertexAI",
+            side_effect=lambda **_: FakeListChatModel(responses=["informe"]),
+        ),
+    ):
+        import app.agent
+
+    module = sys.modules["app.agent"]
+    monkeypatch.setattr(module, "state_store", InMemoryStateStore())
+    yield module
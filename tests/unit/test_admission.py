@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_queued_session_gets_slot_in_order() -> None:
+    """A session waits in the queue with status updates until a slot frees up."""
+    controller = AdmissionController(max_concurrent=1, max_queued=2, max_wait=10)
+    statuses: list[dict[str, Any]] = []
+
+    async def on_status(message: dict[str, Any]) -> None:
+        statuses.append(message)
+
+    release_first = asyncio.Event()
+
+    async def first() -> None:
+        async with controller.admit("a", on_status):
+            await release_first.wait()
+
+    async def second() -> None:
+        async with controller.admit("b", on_status):
+            assert controller.active == 1
+
+    first_task = asyncio.create_task(first())
+    await asyncio.sleep(0)
+    second_task = asyncio.create_task(second())
+    await asyncio.sleep(0.01)
+
+    assert controller.queued == 1
+    assert statuses[0]["queue_position"] == 1
+
+    release_first.set()
+    await asyncio.gather(first_task, second_task)
+    assert controller.active == 0
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected() -> None:
+    """Connections beyond the queue capacity are refused immediately."""
+    controller = AdmissionController(max_concurrent=1, max_queued=0)
+
+    async def on_status(message: dict[str, Any]) -> None:
+        pass
+
+    async with controller.admit("a", on_status):
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit("b", on_status):
+                pass
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_user_rate_limit() -> None:
+    """A single user cannot open sessions faster than the configured rate."""
+    controller = AdmissionController(max_concurrent=10, user_sessions_per_minute=2)
+
+    async def on_status(message: dict[str, Any]) -> None:
+        pass
+
+    for _ in range(2):
+        async with controller.admit("user", on_status):
+            pass
+    with pytest.raises(AdmissionRejected):
+        async with controller.admit("user", on_status):
+            pass
+    async with controller.admit("other-user", on_status):
+        pass
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import base64
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.audio_cache import AudioCache, CannedAudio, PromptSynthesizer
+from app.gemini_session import GeminiSession
+from app.relay_protocol import decode_audio_frame
+
+QUESTION = "¿Qué frameworks has utilizado?"
+
+
+def _audio_message(pcm: bytes, **server_content: bool) -> bytes:
+    part = {
+        "inlineData": {
+            "mimeType": "audio/pcm;rate=24000",
+            "data": base64.b64encode(pcm).decode(),
+        }
+    }
+    content = {"modelTurn": {"parts": [part]}, **server_content}
+    return json.dumps({"serverContent": content}).encode()
+
+
+def _tool_call() -> bytes:
+    call = {"name": "developer_interview", "id": "1", "args": {"anwser": "hola"}}
+    return json.dumps({"toolCall": {"functionCalls": [call]}}).encode()
+
+
+def _synthesizer(cache: AudioCache, *messages: bytes) -> PromptSynthesizer:
+    """A synthesizer whose prompt-only session answers ``messages``."""
+    live = AsyncMock()
+    live._ws.recv.side_effect = [*messages, None]
+    client = MagicMock()
+    client.aio.live.connect.return_value.__aenter__.return_value = live
+    return PromptSynthesizer(client, "model", cache)
+
+
+def _session(
+    cache: AudioCache,
+    *messages: bytes,
+    synthesizer: PromptSynthesizer | None = None,
+) -> GeminiSession:
+    async def developer_interview(anwser: str) -> dict[str, str]:
+        return {"question": QUESTION}
+
+    live = AsyncMock()
+    live._ws.recv.side_effect = [*messages, None]
+    session = GeminiSession(
+        session=live,
+        websocket=AsyncMock(),
+        tool_functions={"developer_interview": developer_interview},
+        audio_cache=cache,
+        canned_prompts=frozenset([QUESTION]),
+        prompt_synthesizer=synthesizer,
+    )
+    session.binary_audio = True
+    return session
+
+
+def _sent_audio(session: GeminiSession) -> list[bytes]:
+    frames = [call.args[0] for call in session.websocket.send_bytes.await_args_list]
+    return [decode_audio_frame(f)[1] for f in frames if not f.startswith(b"{")]
+
+
+def _tool_response(session: GeminiSession) -> dict:
+    response = session.session.send.await_args.kwargs["input"]
+    return response.function_responses[0].response
+
+
+def test_audio_roundtrip_and_chunks() -> None:
+    """Audio survives serialization and is sent in whole-sample frames."""
+    audio = CannedAudio(24000, bytes(range(10)))
+    assert CannedAudio.from_bytes(audio.to_bytes()) == audio
+    assert list(audio.chunks(5)) == [
+        b"\x00\x01\x02\x03",
+        b"\x04\x05\x06\x07",
+        b"\x08\x09",
+    ]
+    with pytest.raises(ValueError):
+        CannedAudio.from_bytes(b"RIFF0000000")
+
+
+def test_cache_persists_and_is_shared(tmp_path: Path) -> None:
+    """Stored audio is found after a restart and by other workers."""
+    key = AudioCache.key(QUESTION, "Puck", "español")
+    assert key != AudioCache.key(QUESTION, "Kore", "español")
+    writer, reader = AudioCache(tmp_path), AudioCache(tmp_path)
+    writer.put(key, CannedAudio(24000, b"\x00\x01" * 100))
+
+    assert reader.get(key) == CannedAudio(24000, b"\x00\x01" * 100)
+    assert AudioCache(tmp_path).get(key) is not None
+    assert (reader.hits, reader.misses) == (1, 0)
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    """The stored audio stays under the size limit."""
+    cache = AudioCache(tmp_path, max_bytes=250)
+    for key in "abc":
+        cache.put(key, CannedAudio(24000, bytes(100)))
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.size_bytes <= 250
+    assert len(list(tmp_path.glob("*.pcm"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_prompt_audio_is_generated_apart_then_replayed(tmp_path: Path) -> None:
+    """A miss is read in a prompt-only session, and the next session replays it."""
+    cache = AudioCache(tmp_path)
+    synthesizer = _synthesizer(
+        cache,
+        _audio_message(b"\x05\x06"),
+        _audio_message(b"\x07\x08", turnComplete=True),
+    )
+    # The candidate's session speaks the question along with a remark
+    first = _session(
+        cache,
+        _tool_call(),
+        _audio_message(b"\x01\x02"),
+        _audio_message(b"\x03\x04", turnComplete=True),
+        synthesizer=synthesizer,
+    )
+    await first.receive_from_gemini()
+    assert _sent_audio(first) == [b"\x01\x02", b"\x03\x04"]
+    assert _tool_response(first) == {"question": QUESTION}
+    await asyncio.gather(*synthesizer._tasks)
+
+    # Only the prompt-only session's audio is stored
+    key = AudioCache.key(QUESTION, first.voice, first.language)
+    assert cache.get(key) == CannedAudio(24000, b"\x05\x06\x07\x08")
+    live = synthesizer.client.aio.live.connect.return_value.__aenter__.return_value
+    live.send.assert_awaited_once_with(input=QUESTION, end_of_turn=True)
+
+    second = _session(
+        cache, _tool_call(), _audio_message(b"\x09\x09", turnComplete=True)
+    )
+    await second.receive_from_gemini()
+
+    # Played from the cache; the model's own audio for the turn is dropped
+    assert _sent_audio(second) == [b"\x05\x06\x07\x08"]
+    assert "nota" in _tool_response(second)
+    assert second.canned_audio_played == 1
+    assert not second._mute_model_audio
+
+
+@pytest.mark.asyncio
+async def test_candidate_turns_are_never_stored(tmp_path: Path) -> None:
+    """Without a synthesizer, a miss leaves the cache untouched."""
+    cache = AudioCache(tmp_path)
+    session = _session(
+        cache,
+        _tool_call(),
+        _audio_message(b"\x01\x02"),
+        _audio_message(b"\x03\x04", turnComplete=True),
+    )
+    await session.receive_from_gemini()
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_synthesis_is_not_stored(tmp_path: Path) -> None:
+    """A prompt read only in part is generated again next time."""
+    cache = AudioCache(tmp_path)
+    synthesizer = _synthesizer(cache, _audio_message(b"\x01\x02", interrupted=True))
+    synthesizer.request(QUESTION)
+    synthesizer.request(QUESTION)
+    assert len(synthesizer._tasks) == 1
+    await asyncio.gather(*synthesizer._tasks)
+    assert len(cache) == 0
+    assert not synthesizer._pending
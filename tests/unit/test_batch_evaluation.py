@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.batch_evaluation import (
+    candidate_answers,
+    completed_ids,
+    evaluate_batch,
+    run_interview,
+)
+from app.example_interview import EXAMPLE_CV, EXAMPLE_JOB_OFFER, EXAMPLE_RESPONSE
+
+# The opening question and the nine scripted ones
+ANSWERS_PER_INTERVIEW = 10
+
+
+def _record(record_id: str, answers: int = ANSWERS_PER_INTERVIEW) -> dict:
+    return {
+        "id": record_id,
+        "cv": EXAMPLE_CV,
+        "job_offer": EXAMPLE_JOB_OFFER,
+        "transcript": [EXAMPLE_RESPONSE] * answers,
+    }
+
+
+def test_candidate_answers_from_turns() -> None:
+    """Only candidate turns are used as answers."""
+    record = {
+        "transcript": [
+            {"role": "interviewer", "content": "¿Qué frameworks has utilizado?"},
+            {"role": "candidate", "content": "React"},
+        ]
+    }
+    assert candidate_answers(record) == ["React"]
+
+
+def test_run_interview_completes_graph() -> None:
+    """A full transcript walks every stage and builds the report prompt."""
+    result = run_interview(_record("c-1"))
+
+    assert result["completed"]
+    assert set(result["informacion_recopilada"]) == {
+        "presentacion",
+        "experiencia",
+        "tecnico",
+    }
+    assert "Juan Pérez" in result["prompt"]
+
+
+@pytest.mark.asyncio
+async def test_evaluate_batch_resumes(tmp_path: Path) -> None:
+    """Records already in the output are skipped on the next run."""
+    source = tmp_path / "interviews.jsonl"
+    source.write_text(
+        "\n".join(json.dumps(_record(f"c-{i}", answers=3)) for i in range(3)),
+        encoding="utf-8",
+    )
+    output = tmp_path / "reports.jsonl"
+    model = FakeListChatModel(responses=["Informe"])
+
+    first = await evaluate_batch(source, output, workers=0, model=model)
+    second = await evaluate_batch(source, output, workers=0, model=model)
+
+    assert first == {"evaluated": 3, "skipped": 0, "failed": 0}
+    assert second == {"evaluated": 0, "skipped": 3, "failed": 0}
+    assert completed_ids(output) == {"c-0", "c-1", "c-2"}
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert all(line["report"] == "Informe" for line in lines)
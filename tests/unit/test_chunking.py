@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from langchain_core.documents import Document
+
+from app.chunking import SemanticChunker, split_blocks
+
+NAVIGATION = "Home\n\nProducts\n\nPricing\n\nDocs"
+
+
+def section(topic: str, paragraphs: int = 3) -> str:
+    body = "\n\n".join(
+        f"The {topic} of generative AI applications needs a plan. "
+        f"Teams automate {topic} with pipelines, step {i}."
+        for i in range(paragraphs)
+    )
+    return f"## {topic.title()}\n\n{body}"
+
+
+PAGE = "\n\n".join(
+    [NAVIGATION, section("deployment"), section("monitoring"), NAVIGATION]
+)
+
+
+def test_long_paragraphs_are_split_on_sentences() -> None:
+    """Blocks never exceed the maximum size, sentences are kept whole."""
+    paragraph = "A sentence about monitoring drift. " * 30
+    blocks = list(split_blocks(f"Title\n\n{paragraph}", max_chars=200))
+
+    assert blocks[0] == "Title"
+    assert all(len(block) <= 200 for block in blocks)
+    assert all(block.endswith("drift.") for block in blocks[1:])
+    assert list(split_blocks("x" * 450, max_chars=200)) == [
+        "x" * 200,
+        "x" * 200,
+        "x" * 50,
+    ]
+
+
+def test_chunks_follow_sections() -> None:
+    """Headings open chunks, and related paragraphs stay together."""
+    chunker = SemanticChunker(max_chars=400, min_chars=100)
+    chunks = chunker.split_text(PAGE)
+
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    monitoring = [chunk for chunk in chunks if "monitoring" in chunk]
+    assert monitoring[0].startswith("## Monitoring")
+    assert not any("deployment" in chunk for chunk in monitoring)
+    # Short navigation links are merged instead of becoming chunks of their own
+    assert chunks[0].startswith(NAVIGATION)
+
+
+def test_dissimilar_paragraphs_are_not_merged() -> None:
+    """Neighboring blocks below the similarity threshold are split."""
+    text = (
+        "Monitoring model drift in production with alerts.\n\n"
+        "Quarterly revenue grew in every region."
+    )
+    assert len(SemanticChunker(min_chars=0, threshold=0.2).split_text(text)) == 2
+    assert len(SemanticChunker(min_chars=0, threshold=0.0).split_text(text)) == 1
+
+
+def test_split_documents_skips_repeated_chunks() -> None:
+    """Boilerplate shared by pages is kept once, with its first page metadata."""
+    chunker = SemanticChunker(max_chars=400, min_chars=100)
+    documents = [
+        Document(page_content=PAGE, metadata={"source": "a"}),
+        Document(page_content=PAGE, metadata={"source": "b"}),
+    ]
+
+    chunks = list(chunker.split_documents(iter(documents)))
+
+    assert len(chunks) == len(chunker.split_text(PAGE))
+    assert {chunk.metadata["source"] for chunk in chunks} == {"a"}
+    assert chunker.split_text("") == []
@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.drain import SERVICE_RESTART, SessionRegistry
+
+
+def _session(state_key: str) -> MagicMock:
+    session = MagicMock()
+    session.state_key = state_key
+    session.websocket = AsyncMock()
+    session.pending_tool_calls = 0
+    return session
+
+
+@pytest.mark.asyncio
+async def test_drain_checkpoints_and_closes_sessions() -> None:
+    """Sessions are told to resume, checkpointed and closed with 1012."""
+    registry = SessionRegistry(grace_seconds=1)
+    sessions = [_session("run-1"), _session("run-2")]
+    checkpointed = []
+
+    with registry.register(sessions[0]), registry.register(sessions[1]):
+        drained = await registry.drain(checkpointed.append)
+
+    assert drained == 2
+    assert registry.draining
+    assert sorted(checkpointed) == ["run-1", "run-2"]
+    for session in sessions:
+        status = session.websocket.send_json.call_args.args[0]
+        assert status["resume_run_id"] == session.state_key
+        session.websocket.close.assert_awaited_once_with(
+            code=SERVICE_RESTART, reason="Server restarting"
+        )
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_tool_calls() -> None:
+    """A running tool call finishes before the session is checkpointed."""
+    registry = SessionRegistry(grace_seconds=5)
+    session = _session("run-1")
+    session.pending_tool_calls = 1
+    order = []
+
+    async def finish_tool_call() -> None:
+        await asyncio.sleep(0.2)
+        order.append("tool call")
+        session.pending_tool_calls = 0
+
+    with registry.register(session):
+        await asyncio.gather(
+            finish_tool_call(), registry.drain(lambda key: order.append(key))
+        )
+
+    assert order == ["tool call", "run-1"]
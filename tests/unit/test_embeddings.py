@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from app.embeddings import LocalEmbeddings, get_embedding
+from app.vector_store import get_vector_store
+
+CORPUS = [
+    "Continuous integration and delivery pipelines for machine learning models.",
+    "Monitoring model drift and prediction quality in production.",
+    "Evaluating generative AI applications with human and automatic metrics.",
+    "Feature stores share curated features between training and serving.",
+    "Deploying models to managed endpoints with autoscaling.",
+]
+
+
+def test_fitted_embeddings_rank_relevant_text_first() -> None:
+    """With and without SVD, the matching document is the closest."""
+    for n_components in (0, 3):
+        embedding = LocalEmbeddings(n_features=1024, n_components=n_components)
+        embedding.fit(CORPUS)
+        documents = np.array(embedding.embed_documents(CORPUS))
+        query = np.array(embedding.embed_query("how to monitor drift in production"))
+
+        assert documents.shape == (len(CORPUS), embedding.dimension)
+        assert embedding.dimension == (n_components or 1024)
+        assert int(np.argmax(documents @ query)) == 1
+        np.testing.assert_allclose(np.linalg.norm(documents, axis=1), 1, rtol=1e-5)
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Loaded parameters embed exactly like the fitted ones."""
+    fitted = LocalEmbeddings(n_features=1024, n_components=3).fit(CORPUS)
+    fitted.save(tmp_path / "params.npz")
+    loaded = LocalEmbeddings(n_features=1024).load(tmp_path / "params.npz")
+
+    assert loaded.embed_query(CORPUS[0]) == fitted.embed_query(CORPUS[0])
+    with pytest.raises(ValueError):
+        LocalEmbeddings(n_features=512).load(tmp_path / "params.npz")
+
+
+def test_vector_store_with_local_backend(tmp_path: Path) -> None:
+    """The store is built offline and reopened with the same parameters."""
+    persist_path = str(tmp_path / "store.json")
+    documents = [Document(page_content=text) for text in CORPUS]
+    with patch("app.vector_store.load_and_split_documents", return_value=documents):
+        store = get_vector_store(
+            get_embedding("local"), urls=[], persist_path=persist_path
+        )
+    reopened = get_vector_store(
+        get_embedding("local"), urls=[], persist_path=persist_path
+    )
+
+    query = "feature store for training and serving"
+    assert store.similarity_search(query, k=1)[0].page_content == CORPUS[3]
+    assert reopened.similarity_search(query, k=1)[0].page_content == CORPUS[3]
+
+
+def test_store_without_fitted_parameters_is_rebuilt(tmp_path: Path) -> None:
+    """A store persisted without its ``.npz`` is refitted instead of failing."""
+    persist_path = str(tmp_path / "store.json")
+    documents = [Document(page_content=text) for text in CORPUS]
+    with patch("app.vector_store.load_and_split_documents", return_value=documents):
+        get_vector_store(get_embedding("local"), urls=[], persist_path=persist_path)
+        Path(f"{persist_path}.npz").unlink()
+        rebuilt = get_vector_store(
+            get_embedding("local"), urls=[], persist_path=persist_path
+        )
+
+    assert Path(f"{persist_path}.npz").exists()
+    query = "feature store for training and serving"
+    assert rebuilt.similarity_search(query, k=1)[0].page_content == CORPUS[3]
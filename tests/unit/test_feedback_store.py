@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.feedback_store import FeedbackQueueFull, FeedbackStore, FeedbackWriter
+
+# 2025-01-01 and 2025-01-02, 12:00 UTC
+DAY_1 = 1735732800.0
+DAY_2 = DAY_1 + 86400
+
+
+def test_aggregates_per_run_user_and_day(tmp_path: Path) -> None:
+    """Aggregates are kept up to date across batches and reopenings."""
+    path = tmp_path / "feedback.db"
+    store = FeedbackStore(path)
+    store.add_many(
+        [
+            {"score": 8, "run_id": "r1", "user_id": "u1", "created_at": DAY_1},
+            {"score": 4, "run_id": "r1", "user_id": "u2", "created_at": DAY_1},
+        ]
+    )
+    store.close()
+    store = FeedbackStore(path)
+    store.add_many(
+        [{"score": 10, "run_id": "r2", "user_id": None, "created_at": DAY_2}]
+    )
+
+    assert store.stats("run_id", "r1") == {
+        "dimension": "run_id",
+        "key": "r1",
+        "count": 2,
+        "mean_score": 6.0,
+        "min_score": 4.0,
+        "max_score": 8.0,
+    }
+    assert store.stats("day", "2025-01-02")["count"] == 1
+    assert store.stats("user_id", "u1")["mean_score"] == 8.0
+    assert store.stats()["count"] == 3
+    assert store.stats("run_id", "missing")["mean_score"] is None
+    with pytest.raises(ValueError):
+        store.stats("text", "x")
+    assert store.add_many([]) == 0
+
+
+def test_failed_batch_is_rolled_back() -> None:
+    """A bad record leaves neither rows nor aggregates behind."""
+    store = FeedbackStore(":memory:")
+    with pytest.raises(KeyError):
+        store.add_many([{"score": 1, "run_id": "r1"}, {"score": 2}])
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add_many([{"score": 1, "run_id": "r1"}, {"score": 2, "run_id": None}])
+    assert store.stats()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_records() -> None:
+    """Queued records are written and logged in batches in the background."""
+    logger = MagicMock()
+    writer = FeedbackWriter(FeedbackStore(":memory:"), logger, batch_size=2)
+    writer.submit([{"score": i, "run_id": "r1"} for i in range(5)])
+
+    task = asyncio.create_task(writer.run())
+    while writer.written < 5:
+        await asyncio.sleep(0.01)
+    task.cancel()
+
+    assert writer.store.stats("run_id", "r1")["count"] == 5
+    assert logger.batch.call_count == 3
+    assert await writer.flush() == 0
+
+
+def test_full_queue_refuses_the_whole_submission() -> None:
+    """Submissions that do not fit are refused without queueing any record."""
+    writer = FeedbackWriter(FeedbackStore(":memory:"), max_queued=3)
+    writer.submit([{"score": 1, "run_id": "r1"}] * 2)
+    with pytest.raises(FeedbackQueueFull):
+        writer.submit([{"score": 1, "run_id": "r1"}] * 2)
+    assert asyncio.run(writer.flush()) == 2
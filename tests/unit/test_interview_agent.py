@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.interview_agent import InterviewAgent
+
+# The opening question and the nine scripted ones
+ANSWERS_PER_INTERVIEW = 10
+
+
+class _HangingChatModel(FakeListChatModel):
+    """Chat model whose async calls never return."""
+
+    async def ainvoke(self, *args: Any, **kwargs: Any) -> Any:
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_aprocess_response_matches_sync() -> None:
+    """The async API walks the interview exactly like the sync one."""
+    sync_agent = InterviewAgent(model=FakeListChatModel(responses=["Informe"]))
+    async_agent = InterviewAgent(model=FakeListChatModel(responses=["Informe"]))
+
+    for turn in range(ANSWERS_PER_INTERVIEW):
+        answer = f"Respuesta {turn}"
+        assert await async_agent.aprocess_response(
+            answer
+        ) == sync_agent.process_response(answer)
+
+    assert async_agent.is_completed()
+    assert async_agent.final_report == "Informe"
+
+
+@pytest.mark.asyncio
+async def test_aprocess_response_cancels_model_call() -> None:
+    """Cancelling the turn cancels the pending report generation."""
+    agent = InterviewAgent(model=_HangingChatModel(responses=[""]))
+    for turn in range(ANSWERS_PER_INTERVIEW - 1):
+        await agent.aprocess_response(f"Respuesta {turn}")
+
+    task = asyncio.create_task(agent.aprocess_response("Última respuesta"))
+    await asyncio.sleep(0.05)
+    assert not task.done()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert not agent.is_completed()
+
+
+def test_collected_information_holds_only_answers() -> None:
+    """Each phase collects its own answers, not the questions asked."""
+    agent = InterviewAgent(model=FakeListChatModel(responses=["Informe"]))
+    for turn in range(ANSWERS_PER_INTERVIEW):
+        agent.process_response(f"Respuesta {turn}")
+
+    info = agent.current_state["informacion_recopilada"]
+    assert info == {
+        "presentacion": "Respuesta 0 | Respuesta 1 | Respuesta 2 | Respuesta 3",
+        "experiencia": "Respuesta 4 | Respuesta 5 | Respuesta 6",
+        "tecnico": "Respuesta 7 | Respuesta 8 | Respuesta 9",
+    }
+    assert agent.messages()[-1].content == "Respuesta 9"
+
+
+def test_every_scripted_question_is_asked_once() -> None:
+    """Each answer gets the next question of the script, none is skipped."""
+    agent = InterviewAgent(model=FakeListChatModel(responses=["Informe"]))
+    for turn in range(ANSWERS_PER_INTERVIEW):
+        agent.process_response(f"Respuesta {turn}")
+
+    turnos = agent.current_state["turnos"]
+    assert [(turn.phase, turn.question) for turn in turnos] == [
+        (-1, 0),
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (1, 0),
+        (1, 1),
+        (1, 2),
+        (2, 0),
+        (2, 1),
+        (2, 2),
+    ]
+    assert all(turn.answer is not None for turn in turnos)
+    assert agent.is_completed()
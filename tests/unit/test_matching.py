@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+
+import pytest
+
+from app.embeddings import HashingEmbeddings
+from app.matching import MatchingIndex, split_sections
+
+CVS = {
+    "backend": "Desarrollador backend Python.\n\nFastAPI, PostgreSQL, Docker.",
+    "frontend": "Desarrolladora front-end.\n\nReact, TypeScript, CSS.",
+    "data": "Ingeniero de datos.\n\nSpark, Airflow, BigQuery.",
+}
+OFFER = "Buscamos desarrollador backend Python con FastAPI y PostgreSQL."
+
+
+def _index(path: Path) -> MatchingIndex:
+    return MatchingIndex(path, embedding=HashingEmbeddings())
+
+
+def test_split_sections() -> None:
+    """Paragraphs become sections and blank ones are dropped."""
+    assert split_sections("a\n\n  \n\nb\nc") == ["a", "b\nc"]
+
+
+def test_top_candidates_for_offer(tmp_path: Path) -> None:
+    """The closest CV ranks first."""
+    index = _index(tmp_path)
+    index.add_candidates(CVS)
+    index.add_offers({"offer-1": OFFER})
+
+    by_id = index.top_candidates(["offer-1"], k=2)[0]
+    by_text = index.top_candidates(texts=[OFFER], k=2)[0]
+
+    assert [candidate for candidate, _ in by_id] == [
+        candidate for candidate, _ in by_text
+    ]
+    assert by_id[0][0] == "backend"
+    assert len(by_id) == 2
+    assert index.top_offers(["backend"], k=5)[0][0][0] == "offer-1"
+
+
+def test_index_is_incremental_on_disk(tmp_path: Path) -> None:
+    """Updates supersede old rows, survive reopening and compaction."""
+    index = _index(tmp_path)
+    index.add_candidates(CVS)
+    index.add_candidates({"data": CVS["backend"]})
+    assert len(index) == 3
+
+    reopened = _index(tmp_path)
+    results = reopened.top_candidates(texts=[OFFER], k=3)[0]
+    assert len(results) == 3
+    assert {candidate for candidate, _ in results[:2]} == {"backend", "data"}
+
+    reopened.compact()
+    assert len(_index(tmp_path)) == 3
+
+
+def test_dimension_mismatch(tmp_path: Path) -> None:
+    """An index cannot be extended with another embedding dimension."""
+    _index(tmp_path).add_candidates(CVS)
+    index = MatchingIndex(tmp_path, embedding=HashingEmbeddings(n_features=64))
+    with pytest.raises(ValueError):
+        index.add_candidates(CVS)
@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import ModuleType
+
+from app.observations import ObservationBuffer, score_observation
+
+
+def test_score_observation_markers() -> None:
+    """Nervous and calm markers move the score away from neutral."""
+    assert score_observation("El candidato parece nervioso y titubea") == 1.0
+    assert score_observation("Se muestra tranquilo y seguro") == 0.0
+    assert score_observation("Parece inseguro al responder") == 1.0
+    assert score_observation("Describe su experiencia extensa") == 0.5
+
+
+def test_score_observation_ignores_lookalikes_and_negations() -> None:
+    """ "mientras" is not lying, and negated markers do not count."""
+    assert score_observation("Sonríe mientras habla de su proyecto") == 0.5
+    assert score_observation("Creo que miente sobre su experiencia") == 1.0
+    assert score_observation("Dice que no estoy seguro de la fecha") == 0.5
+    assert score_observation("No parece nervioso, está tranquilo") == 0.0
+
+
+def test_buffer_is_bounded_but_aggregates_everything() -> None:
+    """Old observations are evicted while the counters keep the full history."""
+    buffer = ObservationBuffer(capacity=3)
+    for i in range(10):
+        buffer.record(f"Está nervioso {i}", timestamp=float(i))
+    buffer.record("Ahora está tranquilo", timestamp=10.0)
+
+    assert len(buffer.observations) == 3
+    assert buffer.observations[0].timestamp == 8.0
+    assert buffer.total == 11
+    assert buffer.nervous_count == 10
+    assert buffer.calm_count == 1
+    assert 0.0 < buffer.rolling_score < 1.0
+    assert "Ahora está tranquilo" in buffer.summary()
+
+
+def test_buffer_roundtrip() -> None:
+    """A serialized buffer restores the same observations and aggregates."""
+    buffer = ObservationBuffer(capacity=2)
+    buffer.record("Evita la mirada", timestamp=1.0)
+    buffer.record("Responde con calma", timestamp=2.0)
+
+    restored = ObservationBuffer.from_dict(buffer.to_dict())
+    assert restored.to_dict() == buffer.to_dict()
+    assert restored.observations.maxlen == 2
+
+
+def test_every_role_can_record_observations(agent_module: ModuleType) -> None:
+    """The live model of any role is given the observation tool."""
+    for role in agent_module.ROLE_TOOLS:
+        functions = agent_module.get_tool_functions({"role": role})
+        assert "developer_interview_nervous" in functions
+
+    agent_module.current_run_id.set("observed")
+    agent_module.developer_interview_nervous("Parece nervioso")
+    interview_agent, _ = agent_module.load_interview_turn("observed")
+    assert "Parece nervioso" in interview_agent.observaciones.summary()
+    agent_module.release_interview_agent("observed")
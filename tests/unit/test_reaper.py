@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.drain import SessionRegistry
+from app.gemini_session import GeminiSession
+from app.reaper import GOING_AWAY, IdleReaper
+
+
+def _session() -> GeminiSession:
+    return GeminiSession(session=MagicMock(), websocket=AsyncMock(), tool_functions={})
+
+
+@pytest.mark.asyncio
+async def test_idle_session_is_reaped() -> None:
+    """Only the session past the threshold is closed and cancelled."""
+    registry = SessionRegistry()
+    reaper = IdleReaper(registry, max_idle=60)
+    idle, active = _session(), _session()
+    idle.last_client_activity = time.monotonic() - 61
+    registered = asyncio.Event()
+
+    async def run(session: GeminiSession) -> None:
+        with registry.register(session):
+            registered.set()
+            await asyncio.Event().wait()
+
+    tasks = [asyncio.create_task(run(idle)), asyncio.create_task(run(active))]
+    await registered.wait()
+    await asyncio.sleep(0)
+
+    assert await reaper.reap_idle() == 1
+    await asyncio.sleep(0)
+
+    assert tasks[0].cancelled() and idle.reaped
+    assert not tasks[1].done()
+    idle.websocket.close.assert_awaited_once_with(
+        code=GOING_AWAY, reason="Session idle"
+    )
+    assert reaper.reaped == 1
+    assert registry.sessions() == [active]
+    tasks[1].cancel()
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_keep_session_active() -> None:
+    """Heartbeat replies refresh the activity; a failed send stops heartbeats."""
+    session = _session()
+    session.last_client_activity = 0
+    await session._handle_client_message({"heartbeat": 1.0})
+    assert session.idle_seconds < 1
+
+    session.websocket.send_json.side_effect = [None, RuntimeError("closed")]
+    await asyncio.wait_for(session.send_heartbeats(interval=0.01), timeout=1)
+    assert session.websocket.send_json.await_count == 2
@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.recording import (
+    CLIENT_FRAME,
+    GEMINI_FRAME,
+    RecordingReader,
+    SessionRecorder,
+    redact,
+)
+from app.replay import replay
+
+
+def _write_recording(path: Path) -> None:
+    recorder = SessionRecorder(path)
+    recorder.record(
+        CLIENT_FRAME,
+        json.dumps({"setup": {"run_id": "run-1", "user_id": "user-1"}}).encode(),
+    )
+    recorder.record(
+        CLIENT_FRAME,
+        json.dumps({"clientContent": {"turnComplete": True}}).encode(),
+    )
+    recorder.record(
+        GEMINI_FRAME,
+        json.dumps(
+            {"serverContent": {"modelTurn": {"parts": [{"text": "Hola"}]}}}
+        ).encode(),
+    )
+    recorder.record(
+        GEMINI_FRAME,
+        json.dumps(
+            {
+                "toolCall": {
+                    "functionCalls": [
+                        {"id": "1", "name": "developer_interview", "args": {}}
+                    ]
+                }
+            }
+        ).encode(),
+    )
+    recorder.close()
+
+
+def test_recording_roundtrip(tmp_path: Path) -> None:
+    """Frames are read back in order with their direction and payload."""
+    path = tmp_path / "session.rec"
+    _write_recording(path)
+
+    with RecordingReader(path) as reader:
+        frames = [(f.direction, bytes(f.payload)) for f in reader]
+    assert [direction for direction, _ in frames] == [
+        CLIENT_FRAME,
+        CLIENT_FRAME,
+        GEMINI_FRAME,
+        GEMINI_FRAME,
+    ]
+    assert json.loads(frames[0][1])["setup"]["run_id"] == "run-1"
+
+
+def test_truncated_recording_is_readable(tmp_path: Path) -> None:
+    """A partially written last record is ignored."""
+    path = tmp_path / "session.rec"
+    _write_recording(path)
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with RecordingReader(path) as reader:
+        assert sum(1 for _ in reader) == 3
+
+
+def test_setup_is_recorded_without_the_candidate() -> None:
+    """The CV and the job offer never reach a recording."""
+    message = {"setup": {"run_id": "run-1", "cv": "CV", "job_offer": "Oferta"}}
+
+    assert redact(message) == {"setup": {"run_id": "run-1"}}
+    assert message["setup"]["cv"] == "CV"
+    assert redact({"clientContent": {}}) == {"clientContent": {}}
+
+
+def test_frames_are_dropped_when_the_writer_falls_behind(tmp_path: Path) -> None:
+    """A full queue drops frames instead of blocking the caller."""
+    path = tmp_path / "session.rec"
+    recorder = SessionRecorder(path, max_pending=1)
+    writing, resume = threading.Event(), threading.Event()
+    write = recorder._file.write
+
+    def slow_write(data: bytes) -> int:
+        writing.set()
+        resume.wait()
+        return write(data)
+
+    recorder._file.write = slow_write  # type: ignore[method-assign]
+    recorder.record(CLIENT_FRAME, b"1")
+    assert writing.wait(timeout=5)
+    recorder.record(CLIENT_FRAME, b"2")
+    recorder.record(CLIENT_FRAME, b"3")
+    resume.set()
+    recorder.close()
+
+    assert (recorder.frames, recorder.dropped) == (2, 1)
+    with RecordingReader(path) as reader:
+        assert [bytes(f.payload) for f in reader] == [b"1", b"2"]
+
+
+def test_reader_rejects_other_files(tmp_path: Path) -> None:
+    """Files without the recording header are refused."""
+    path = tmp_path / "other.rec"
+    path.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        RecordingReader(path)
+
+
+@pytest.mark.asyncio
+async def test_replay_relays_recorded_frames(tmp_path: Path) -> None:
+    """Replay drives GeminiSession with the recorded traffic."""
+    path = tmp_path / "session.rec"
+    _write_recording(path)
+
+    stats = await replay(path, speed=0)
+
+    assert stats["run_id"] == "run-1"
+    assert stats["messages_to_gemini"] == 1
+    assert stats["messages_to_client"] == 2
+    assert stats["tool_responses"] == 1
@@ -0,0 +1,69 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+
+import pytest
+
+from app.relay_protocol import decode_audio_frame, encode_audio_frame, split_audio
+
+
+def _audio_part(pcm: bytes, rate: int = 24000) -> dict:
+    return {
+        "inlineData": {
+            "mimeType": f"audio/pcm;rate={rate}",
+            "data": base64.b64encode(pcm).decode(),
+        }
+    }
+
+
+def test_audio_frame_roundtrip() -> None:
+    """Encoded frames carry the sample rate and raw PCM."""
+    frame = encode_audio_frame(b"\x01\x02\x03", 16000)
+    assert len(frame) == 9
+    assert decode_audio_frame(frame) == (16000, b"\x01\x02\x03")
+    with pytest.raises(ValueError):
+        decode_audio_frame(b'{"serverContent": {}}')
+
+
+def test_split_audio_only_message() -> None:
+    """Audio-only messages become binary frames with no JSON remainder."""
+    message = {"serverContent": {"modelTurn": {"parts": [_audio_part(b"pcm")]}}}
+    frames, remainder = split_audio(message)
+    assert [decode_audio_frame(f) for f in frames] == [(24000, b"pcm")]
+    assert remainder is None
+
+
+def test_split_audio_keeps_other_content() -> None:
+    """Text parts and turn markers stay in the JSON remainder."""
+    message = {
+        "serverContent": {
+            "modelTurn": {"parts": [_audio_part(b"pcm"), {"text": "hola"}]},
+            "turnComplete": True,
+        }
+    }
+    frames, remainder = split_audio(message)
+    assert len(frames) == 1
+    assert remainder == {
+        "serverContent": {
+            "modelTurn": {"parts": [{"text": "hola"}]},
+            "turnComplete": True,
+        }
+    }
+
+
+def test_split_audio_passes_through_control_messages() -> None:
+    """Messages without audio are returned unchanged."""
+    message = {"toolCall": {"functionCalls": []}}
+    assert split_audio(message) == ([], message)
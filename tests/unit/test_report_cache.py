@@ -0,0 +1,107 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.interview_agent import InterviewAgent
+from app.report_cache import ReportCache
+
+
+def test_concurrent_threads_share_one_generation() -> None:
+    """Identical requests from several threads call the model once."""
+    cache = ReportCache()
+    calls = []
+    started = threading.Event()
+
+    def generate() -> str:
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "informe"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(cache.get_or_create, "k", generate)
+        started.wait()
+        others = [pool.submit(cache.get_or_create, "k", generate) for _ in range(3)]
+        results = [first.result()] + [f.result() for f in others]
+
+    assert results == ["informe"] * 4
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_coroutines_share_one_generation() -> None:
+    """Coroutines share a generation that is cancelled with its last waiter."""
+    cache = ReportCache()
+    calls = []
+    release = asyncio.Event()
+
+    async def generate() -> str:
+        calls.append(1)
+        await release.wait()
+        return "informe"
+
+    first = asyncio.create_task(cache.aget_or_create("k", generate))
+    second = asyncio.create_task(cache.aget_or_create("k", generate))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == "informe"
+    assert len(calls) == 1
+    assert cache.get("k") == "informe"
+
+    abandoned = asyncio.create_task(cache.aget_or_create("other", generate))
+    release.clear()
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await abandoned
+    await asyncio.sleep(0)
+    assert cache.get("other") is None
+
+
+def test_disk_store_is_bounded(tmp_path: Path) -> None:
+    """Least recently used reports are evicted, the rest survive a restart."""
+    cache = ReportCache(tmp_path, max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    reopened = ReportCache(tmp_path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("b") is None
+    assert reopened.get("c") == "C"
+
+
+def test_repeated_report_is_not_regenerated() -> None:
+    """The same collected information reuses the cached report."""
+    cache = ReportCache()
+    model = FakeListChatModel(responses=["Primero", "Segundo"])
+    reports = []
+    for _ in range(2):
+        agent = InterviewAgent(model=model, report_cache=cache)
+        for turn in range(10):
+            agent.process_response(f"Respuesta {turn}")
+        reports.append(agent.final_report)
+
+    assert reports == ["Primero", "Primero"]
+    assert cache.hits == 1
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.retry import RetryCoordinator
+
+
+def test_run_sync_retries_throttling_errors() -> None:
+    """Throttled calls are retried until they succeed."""
+    coordinator = RetryCoordinator(base_delay=0.001, max_delay=0.001)
+    calls = []
+
+    def flaky() -> str:
+        calls.append(1)
+        if len(calls) < 3:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+    assert coordinator.run_sync(flaky) == "ok"
+    assert len(calls) == 3
+    assert not coordinator.is_open
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    """Enough consecutive failures open the shared circuit for every caller."""
+    coordinator = RetryCoordinator(
+        failure_threshold=2, reset_timeout=60, base_delay=0.001
+    )
+
+    def throttled() -> None:
+        raise google_exceptions.ResourceExhausted("quota")
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        coordinator.run_sync(throttled, max_tries=2)
+    assert coordinator.is_open
+    assert coordinator.backoff_delay(1) > 1
+
+
+def test_non_retryable_errors_propagate() -> None:
+    """Errors that are not throttling are raised on the first attempt."""
+    coordinator = RetryCoordinator()
+    calls = []
+
+    def broken() -> None:
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        coordinator.run_sync(broken)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_reports_backoff() -> None:
+    """The async variant reports each backoff before waiting."""
+    coordinator = RetryCoordinator(base_delay=0.001, max_delay=0.001)
+    backoffs = []
+    attempts = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise google_exceptions.ServiceUnavailable("busy")
+        return "ok"
+
+    async def on_backoff(details: dict) -> None:
+        backoffs.append(details)
+
+    assert await coordinator.run(flaky, on_backoff=on_backoff) == "ok"
+    assert backoffs[0]["tries"] == 1
@@ -58,7 +58,7 @@ def mock_dependencies() -> Generator[None, None, None]:
     """
     with (
         patch("app.server.genai_client") as mock_genai,
-        patch("app.server.tool_functions") as mock_tools,
+        patch("app.server.get_tool_functions") as mock_tools,
     ):
         mock_genai.aio.live.connect = AsyncMock()
         mock_tools.return_value = {}
@@ -94,15 +94,15 @@ async def test_websocket_endpoint() -> None:
         mock_genai.aio.live.connect.return_value.__aenter__.return_value = mock_session
         client = TestClient(app)
         with client.websocket_connect("/ws") as websocket:
-            # Test initial connection message
-            data = websocket.receive_json()
-            assert data["status"] == "Backend is ready for conversation"
-
-            # Test sending a message
+            # The setup message comes first
             websocket.send_json(
                 {"setup": {"run_id": "test-run", "user_id": "test-user"}}
             )
 
+            # Test initial connection message
+            data = websocket.receive_json()
+            assert data["status"] == "Backend is ready for conversation"
+
             # Test sending audio stream
             dummy_audio = bytes([0] * 1024)  # 1KB of silence
             websocket.send_json(
@@ -138,6 +138,208 @@ async def test_websocket_error_handling() -> None:
 
         client = TestClient(app)
         with pytest.raises(Exception) as exc:
-            with client.websocket_connect("/ws"):
-                pass
+            with client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"setup": {"run_id": "r", "user_id": "u"}})
+                websocket.receive_json()
         assert str(exc.value) == "Connection failed"
+
+
+@pytest.mark.asyncio
+async def test_dropped_session_is_not_retried() -> None:
+    """A session Gemini drops after connecting is neither replayed nor counted."""
+    from starlette.websockets import WebSocketDisconnect
+    from websockets.exceptions import ConnectionClosedError
+
+    from app.drain import TRY_AGAIN_LATER
+    from app.retry import RetryCoordinator
+    from app.server import app
+
+    mock_session = AsyncMock()
+    mock_session._ws.recv.side_effect = ConnectionClosedError(None, None)
+    coordinator = RetryCoordinator(failure_threshold=1)
+
+    with (
+        patch("app.server.genai_client") as mock_genai,
+        patch("app.server.gemini_retry", coordinator),
+    ):
+        mock_genai.aio.live.connect.return_value.__aenter__.return_value = mock_session
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"setup": {"run_id": "r", "user_id": "u"}})
+            assert websocket.receive_json()["status"] == (
+                "Backend is ready for conversation"
+            )
+            assert "resuming" in websocket.receive_json()["status"]
+            with pytest.raises(WebSocketDisconnect) as exc:
+                websocket.receive_json()
+        assert exc.value.code == TRY_AGAIN_LATER
+        mock_genai.aio.live.connect.assert_called_once()
+        assert not coordinator.is_open
+
+
+@pytest.mark.asyncio
+async def test_websocket_requires_setup() -> None:
+    """A client that sends something else first is told and disconnected."""
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.server import POLICY_VIOLATION, app
+
+    with patch("app.server.genai_client") as mock_genai:
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"realtimeInput": {"mediaChunks": []}})
+            assert "No setup message" in websocket.receive_json()["status"]
+            with pytest.raises(WebSocketDisconnect) as exc:
+                websocket.receive_json()
+        assert exc.value.code == POLICY_VIOLATION
+        mock_genai.aio.live.connect.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_websocket_builds_candidate_instruction() -> None:
+    """A setup message sent on connect selects the session's candidate."""
+    from app.server import app
+
+    mock_session = AsyncMock()
+    mock_session._ws = AsyncMock()
+    mock_session._ws.recv.side_effect = [None]
+
+    with patch("app.server.genai_client") as mock_genai:
+        mock_genai.aio.live.connect.return_value.__aenter__.return_value = mock_session
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json(
+                {
+                    "setup": {
+                        "run_id": "test-run",
+                        "user_id": "test-user",
+                        "cv": "Ana García. 2020-2024: desarrolladora Go.",
+                        "job_offer": "Desarrolladora Go senior",
+                    }
+                }
+            )
+            data = websocket.receive_json()
+            assert data["status"] == "Backend is ready for conversation"
+
+        config = mock_genai.aio.live.connect.call_args.kwargs["config"]
+        instruction = config.system_instruction.parts[0].text
+        assert "Ana García" in instruction
+        assert "Desarrolladora Go senior" in instruction
+
+
+@pytest.mark.asyncio
+async def test_run_until_first_completed_cancels_others() -> None:
+    """When the client side ends, the Gemini side is cancelled."""
+    import asyncio
+
+    from app.server import run_until_first_completed
+
+    cancelled = asyncio.Event()
+
+    async def client_side() -> None:
+        await asyncio.sleep(0)
+
+    async def gemini_side() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    await asyncio.wait_for(run_until_first_completed(client_side(), gemini_side()), 1)
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_websocket_refused_while_draining() -> None:
+    """A draining instance turns new sessions away with code 1013."""
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.server import app, session_registry
+
+    with patch.object(session_registry, "draining", True):
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as websocket:
+            assert "restarting" in websocket.receive_json()["status"]
+            with pytest.raises(WebSocketDisconnect) as exc:
+                websocket.receive_json()
+        assert exc.value.code == 1013
+
+
+def test_client_key_uses_the_proxy_appended_address() -> None:
+    """Rate limits key on the address the proxy saw, not on client input."""
+    from app.server import client_key
+
+    websocket = MagicMock()
+    websocket.client.host = "169.254.1.1"
+    websocket.headers = {"x-forwarded-for": "1.2.3.4, 203.0.113.7"}
+    websocket.query_params = {"user_id": "someone-else"}
+    assert client_key(websocket) == "203.0.113.7"
+
+    websocket.headers = {}
+    assert client_key(websocket) == "169.254.1.1"
+
+
+@pytest.mark.asyncio
+async def test_bulk_feedback_and_stats() -> None:
+    """Bulk feedback is queued, written behind and aggregated."""
+    from app.feedback_store import FeedbackStore, FeedbackWriter
+    from app.server import app
+
+    writer = FeedbackWriter(FeedbackStore(":memory:"), struct_logger=MagicMock())
+    with patch("app.server.feedback_writer", writer):
+        client = TestClient(app)
+        response = client.post(
+            "/feedback/bulk",
+            json=[
+                {"score": 4, "run_id": "r1", "user_id": "u1"},
+                {"score": 2, "run_id": "r1", "user_id": "u2"},
+            ],
+        )
+        assert response.json() == {"accepted": 2}
+        ndjson = '{"score": 5, "run_id": "r2", "user_id": "u1"}\n\n'
+        response = client.post(
+            "/feedback/bulk",
+            content=ndjson,
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert response.json() == {"accepted": 1}
+        assert client.post("/feedback/bulk", json=[{"score": 1}]).status_code == 422
+        single = {"score": 3, "run_id": "r3", "user_id": None}
+        assert client.post("/feedback", json=single).status_code == 200
+
+        assert await writer.flush() == 4
+        run = client.get("/feedback/stats", params={"run_id": "r1"}).json()
+        user = client.get("/feedback/stats", params={"user_id": "u1"}).json()
+        overall = client.get("/feedback/stats").json()
+        both = client.get("/feedback/stats", params={"run_id": "r1", "day": "x"})
+
+    assert (run["count"], run["mean_score"]) == (2, 3.0)
+    assert (user["count"], user["min_score"], user["max_score"]) == (2, 4.0, 5.0)
+    assert overall["count"] == 4
+    assert both.status_code == 400
+
+
+def test_transcripts_require_the_recruiter_token() -> None:
+    """Transcripts are only served to recruiter tools with the token."""
+    from app.server import app
+    from app.transcript_store import TranscriptStore
+
+    client = TestClient(app)
+    with patch("app.server.transcript_store", TranscriptStore(":memory:")):
+        assert client.get("/transcripts/search?q=python").status_code == 404
+        with patch("app.server.RECRUITER_API_TOKEN", "secreto"):
+            assert client.get("/transcripts/search?q=python").status_code == 401
+            headers = {"Authorization": "Bearer otro"}
+            assert client.get("/transcripts/r1", headers=headers).status_code == 401
+
+            headers = {"Authorization": "Bearer secreto"}
+            response = client.get("/transcripts/search?q=python", headers=headers)
+            assert response.status_code == 200
+            assert response.json() == []
+            for limit in (-1, 0, 101):
+                response = client.get(
+                    f"/transcripts/search?q=python&limit={limit}", headers=headers
+                )
+                assert response.status_code == 422
+            assert client.get("/transcripts/r1", headers=headers).status_code == 404
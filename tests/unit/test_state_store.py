@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+import time
+from types import ModuleType
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.interview_agent import InterviewAgent
+from app.state_store import InMemoryStateStore, get_state_store
+
+
+def test_in_memory_store_roundtrip_and_ttl() -> None:
+    """Values are returned until their TTL expires."""
+    store = InMemoryStateStore()
+    store.set("a", {"x": 1})
+    store.set("b", {"y": 2}, ttl=1)
+    assert store.get("a") == {"x": 1}
+    assert store.get("b") == {"y": 2}
+
+    store._data["b"] = (store._data["b"][0], time.monotonic() - 1)
+    assert store.get("b") is None
+
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_get_state_store_rejects_unknown_url() -> None:
+    """Only memory:// and Redis URLs are supported."""
+    assert isinstance(get_state_store("memory://"), InMemoryStateStore)
+    with pytest.raises(ValueError):
+        get_state_store("postgres://localhost")
+
+
+def test_interview_agent_state_survives_store() -> None:
+    """An agent restored from a JSON snapshot continues the same interview."""
+    model = FakeListChatModel(responses=["informe"])
+    agent = InterviewAgent(model=model)
+    agent.process_response("Soy desarrollador backend")
+    agent.estados["presentacion"]["completado"] = True
+    agent.current_question_index = 2
+
+    snapshot = json.loads(json.dumps(agent.to_dict()))
+    restored = InterviewAgent(model=model)
+    restored.load_dict(snapshot)
+
+    assert restored.to_dict() == agent.to_dict()
+    assert restored.estados["presentacion"]["completado"] is True
+    assert restored.messages()[-1].content == agent.messages()[-1].content
+
+
+@pytest.mark.asyncio
+async def test_interview_turn_does_not_hold_the_store_lock(
+    agent_module: ModuleType,
+) -> None:
+    """Other workers can use the store while a turn waits on the model."""
+    from app.state_store import current_run_id
+
+    run_id = "lock-free-turn"
+    current_run_id.set(run_id)
+    interview_agent, _ = agent_module.load_interview_turn(run_id)
+    lock_free = []
+
+    async def turn(answer: str) -> dict:
+        def take_lock() -> None:
+            with agent_module.state_store.lock(f"interview:{run_id}"):
+                lock_free.append(True)
+
+        thread = threading.Thread(target=take_lock, daemon=True)
+        thread.start()
+        await asyncio.to_thread(thread.join, 1)
+        return {"question": "Siguiente"}
+
+    interview_agent.aprocess_response = turn
+    assert await agent_module.developer_interview("Hola") == {"question": "Siguiente"}
+    assert lock_free == [True]
+    agent_module.release_interview_agent(run_id)
+
+
+@pytest.mark.asyncio
+async def test_interview_turn_that_lost_a_race_is_not_saved(
+    agent_module: ModuleType,
+) -> None:
+    """A turn does not overwrite a newer state saved by another worker."""
+    from app.state_store import current_run_id
+
+    run_id = "raced-turn"
+    current_run_id.set(run_id)
+    interview_agent, version = agent_module.load_interview_turn(run_id)
+    other = InterviewAgent(model=FakeListChatModel(responses=["informe"]))
+    other.process_response("Respuesta de otro worker")
+    newer = {"version": version + 1, "agent": other.to_dict()}
+    agent_module.state_store.set(f"interview:{run_id}", newer)
+
+    interview_agent.process_response("Respuesta perdida")
+    assert not agent_module.commit_interview_turn(run_id, interview_agent, version)
+    assert agent_module.state_store.get(f"interview:{run_id}") == newer
+
+    # The next turn continues from the other worker's state
+    reloaded, reloaded_version = agent_module.load_interview_turn(run_id)
+    assert reloaded is not interview_agent
+    assert reloaded_version == version + 1
+    assert reloaded.pregunta_actual() == other.pregunta_actual()
+    agent_module.release_interview_agent(run_id)
+
+
+@pytest.mark.asyncio
+async def test_releasing_a_session_cancels_its_pending_scores(
+    agent_module: ModuleType,
+) -> None:
+    """Released, drained or reaped sessions stop scoring their answers."""
+    run_id = "released-turn"
+    interview_agent, _ = agent_module.load_interview_turn(run_id)
+    tarea = asyncio.get_running_loop().create_task(asyncio.sleep(60))
+    interview_agent._evaluaciones[tarea] = None
+
+    agent_module.release_interview_agent(run_id)
+    await asyncio.gather(tarea, return_exceptions=True)
+
+    assert tarea.cancelled()
+    assert not interview_agent._evaluaciones
@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+
+import pytest
+
+from app.tools import ToolRegistry
+
+
+def make_registry() -> ToolRegistry:
+    registry = ToolRegistry(vertexai=True)
+
+    @registry.register
+    def lookup(query: str) -> dict[str, str]:
+        """
+        Looks documents up.
+
+        Args:
+            query: What to look for.
+
+        Returns:
+            The documents found.
+        """
+        return {"output": query}
+
+    @registry.register(blocking=True)
+    def where(anwser: str) -> dict[str, str]:
+        """Reports the thread it runs in.
+
+        Args:
+            anwser: Ignored.
+        """
+        return {"thread": threading.current_thread().name}
+
+    @registry.register(timeout=0.01)
+    async def slow(anwser: str) -> dict[str, str]:
+        """Never answers in time."""
+        await asyncio.sleep(1)
+        return {}
+
+    return registry
+
+
+def test_declaration_built_from_docstring() -> None:
+    """The description and parameter descriptions come from the docstring."""
+    declaration = make_registry()["lookup"].declaration
+    assert declaration.name == "lookup"
+    assert declaration.description == "Looks documents up."
+    assert declaration.parameters.properties["query"].description == (
+        "What to look for."
+    )
+
+
+def test_tool_sets_are_built_once() -> None:
+    """Sets for the same tools are the same cached object."""
+    registry = make_registry()
+    sets = registry.tool_sets({"a": ["lookup", "where"], "b": ("lookup", "where")})
+    assert sets["a"] is sets["b"]
+    assert sets["a"] is registry.tool_set(("lookup", "where"))
+    names = [d.name for d in sets["a"].tools[0].function_declarations]
+    assert names == ["lookup", "where"]
+    assert list(sets["a"].functions) == ["lookup", "where"]
+
+
+def test_registering_invalidates_sets() -> None:
+    """A set built before a tool was registered is rebuilt."""
+    registry = make_registry()
+    before = registry.tool_set(("lookup",))
+
+    @registry.register
+    def extra() -> dict[str, str]:
+        """Extra tool."""
+        return {}
+
+    assert registry.tool_set(("lookup",)) is not before
+    assert "extra" in registry
+
+
+def test_duplicate_registration_fails() -> None:
+    """Two tools cannot share a name."""
+    registry = make_registry()
+
+    def lookup(query: str) -> dict[str, str]:
+        """Another lookup."""
+        return {}
+
+    with pytest.raises(ValueError):
+        registry.register(lookup)
+
+
+def test_unknown_tool_fails() -> None:
+    """A set cannot name a tool that was not registered."""
+    with pytest.raises(KeyError):
+        make_registry().tool_set(("missing",))
+
+
+@pytest.mark.asyncio
+async def test_handlers_run_with_their_hints() -> None:
+    """Blocking tools run in a thread, and timed out tools answer an error."""
+    functions = make_registry().tool_set(("lookup", "where", "slow")).functions
+    assert await functions["lookup"](query="q") == {"output": "q"}
+    where = await functions["where"](anwser="")
+    assert where["thread"] != threading.current_thread().name
+    assert await functions["slow"](anwser="") == {"error": "slow timed out"}
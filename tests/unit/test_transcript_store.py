@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.interview_agent import InterviewAgent
+from app.transcript_store import TranscriptStore, match_expression, snippet
+from app.turn_log import TurnLog
+
+# The opening question and the nine scripted ones
+ANSWERS_PER_INTERVIEW = 10
+
+
+def question_text(phase: int, question: int) -> str:
+    return f"Pregunta {phase}.{question}"
+
+
+def phase_name(phase: int) -> str:
+    return f"fase {phase}"
+
+
+def test_turns_are_written_incrementally(tmp_path: Path) -> None:
+    """Only new turns and newly answered ones are written."""
+    store = TranscriptStore(tmp_path / "transcripts.db")
+    turns = TurnLog()
+    turns.ask(0, 0, now=1.0)
+    assert store.record_turns("r1", turns, question_text, phase_name) == 1
+    turns.answer("Trabajo con Kubernetes", now=2.0)
+    turns.ask(0, 1, now=3.0)
+    assert store.record_turns("r1", turns, question_text, phase_name) == 2
+
+    transcript = store.transcript("r1")
+    assert transcript["started_at"] == 1.0
+    assert transcript["turns"][0] == {
+        "phase": "fase 0",
+        "question": "Pregunta 0.0",
+        "answer": "Trabajo con Kubernetes",
+        "asked_at": 1.0,
+        "answered_at": 2.0,
+    }
+    assert transcript["turns"][1]["answer"] is None
+    assert store.search("kubernetes")[0]["run_id"] == "r1"
+    assert store.transcript("missing") is None
+
+
+def test_search_ranks_interviews(tmp_path: Path) -> None:
+    """Interviews matching all words come back once, best match first."""
+    store = TranscriptStore(tmp_path / "transcripts.db")
+    answers = {
+        "r1": ["Uso Python y FastAPI a diario", "También Python para datos"],
+        "r2": ["Sobre todo Java", "Algo de Python"],
+        "r3": ["Diseño de interfaces"],
+    }
+    for run_id, texts in answers.items():
+        turns = TurnLog()
+        for i, text in enumerate(texts):
+            turns.ask(0, i, now=float(i))
+            turns.answer(text, now=float(i))
+        store.record_turns(run_id, turns, question_text, phase_name)
+
+    results = store.search("python")
+    assert [result["run_id"] for result in results] == ["r1", "r2"]
+    assert results[0]["hits"] == 2
+    assert "[Python]" in results[0]["snippet"]
+    assert [result["run_id"] for result in store.search("python fastapi")] == ["r1"]
+    assert [result["run_id"] for result in store.search("interfac*")] == ["r3"]
+    # Query syntax in user input is searched as text
+    assert store.search('C++ "OR') == []
+    assert store.search("  ") == []
+
+
+def test_match_expression_quotes_words() -> None:
+    assert match_expression("node.js C++ dev*") == '"node.js" "C++" "dev"*'
+    assert match_expression('say "hi"') == '"say" """hi"""'
+
+
+def test_snippet_highlights_like_the_index() -> None:
+    """Matches ignore case and accents, and honor prefixes."""
+    text = "Desplegué servicios en Kubernetes con Helm"
+    assert snippet(text, "desplegue kube*") == (
+        "[Desplegué] servicios en [Kubernetes] con Helm"
+    )
+    assert snippet(" ".join(["palabra"] * 30 + ["Rust"]), "rust", words=4) == (
+        "...palabra palabra palabra [Rust]"
+    )
+    assert snippet(text, "python") is None
+
+
+def test_agent_saves_transcript_and_report() -> None:
+    """A complete interview is stored with its report."""
+    store = TranscriptStore(":memory:")
+    agent = InterviewAgent(model=FakeListChatModel(responses=["Informe"]))
+    for turn in range(ANSWERS_PER_INTERVIEW):
+        agent.process_response(f"Respuesta {turn}")
+        agent.guardar_transcripcion(store, "r1")
+
+    transcript = store.transcript("r1")
+    assert transcript["report"] == "Informe"
+    assert transcript["completed_at"] is not None
+    assert transcript["turns"][0]["phase"] == "intro"
+    answers = [turn["answer"] for turn in transcript["turns"] if turn["answer"]]
+    assert answers == [f"Respuesta {turn}" for turn in range(ANSWERS_PER_INTERVIEW)]
@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.turn_log import INTRO_PHASE, TurnLog
+
+
+def _question_text(phase: int, question: int) -> str:
+    return f"P{phase}.{question}"
+
+
+def test_ask_and_answer() -> None:
+    """Asking the same question twice keeps one turn; answering it again adds one."""
+    log = TurnLog()
+    log.ask(0, 0, now=1.0)
+    log.ask(0, 0, now=2.0)
+    log.answer("a", now=3.0)
+    log.answer("b", now=4.0)
+    log.ask(1, 0, now=5.0)
+
+    assert [(t.phase, t.question, t.answer) for t in log] == [
+        (0, 0, "a"),
+        (0, 0, "b"),
+        (1, 0, None),
+    ]
+    assert log.turns[0].asked_at == 1.0
+    assert log.answers(0) == ["a", "b"]
+    assert log.answers(1) == []
+    assert log.last_answer() == "b"
+
+
+def test_to_messages_is_lazy_conversion() -> None:
+    """The intro becomes a system message, the rest human messages."""
+    log = TurnLog()
+    log.ask(INTRO_PHASE, 0)
+    log.answer("hola")
+    log.ask(0, 1)
+
+    messages = log.to_messages(_question_text)
+
+    assert [type(m) for m in messages] == [SystemMessage, HumanMessage, HumanMessage]
+    assert [m.content for m in messages] == ["P-1.0", "hola", "P0.1"]
+
+
+def test_round_trip_through_json() -> None:
+    """Serialized rows rebuild an identical log."""
+    log = TurnLog()
+    log.ask(0, 0, now=1.0)
+    log.answer("respuesta", now=2.0)
+
+    restored = TurnLog.from_dict(json.loads(json.dumps(log.to_dict())))
+
+    assert restored.to_dict() == log.to_dict()
+    assert restored.last.answered_at == 2.0
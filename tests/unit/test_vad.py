@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+
+import numpy as np
+
+from app.vad import SilenceFilter, contains_speech
+
+RATE = 16000
+MIME = f"audio/pcm;rate={RATE}"
+
+
+def _chunk(amplitude: float, seconds: float = 0.1) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    samples = amplitude * 32767 * np.sin(2 * np.pi * 220 * t)
+    return samples.astype("<i2").tobytes()
+
+
+def _b64(pcm: bytes) -> str:
+    return base64.b64encode(pcm).decode()
+
+
+def test_contains_speech() -> None:
+    """Loud tones count as speech, digital silence does not."""
+    assert contains_speech(_chunk(0.3), RATE)
+    assert not contains_speech(bytes(3200), RATE)
+
+
+def test_silence_dropped_after_hangover() -> None:
+    """Silence is forwarded during the hangover and dropped afterwards."""
+    audio_filter = SilenceFilter(hangover_ms=300)
+    silence = _b64(bytes(3200))  # 100 ms
+
+    # Leading silence is dropped
+    assert not audio_filter.should_forward(silence, MIME)
+    assert audio_filter.should_forward(_b64(_chunk(0.3)), MIME)
+    forwarded = [audio_filter.should_forward(silence, MIME) for _ in range(6)]
+    assert forwarded == [True, True, True, False, False, False]
+
+    stats = audio_filter.stats()
+    assert stats["audio_chunks_dropped"] == 4
+    assert stats["audio_bytes_saved"] == 4 * len(silence)
+
+
+def test_undecodable_chunks_are_forwarded() -> None:
+    """Chunks that are not valid base64 are left for Gemini to handle."""
+    assert SilenceFilter().should_forward("not base64!", MIME)
@@ -0,0 +1,149 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+
+from app.embeddings import get_embedding
+from app.vector_store import (
+    BYTES_PER_VALUE,
+    DEFAULT_CORPUS,
+    VectorStoreManager,
+    load_corpora,
+    resident_bytes,
+)
+
+CORPORA = {
+    DEFAULT_CORPUS: ["mlops"],
+    "acme": ["acme"],
+    "globex": ["globex"],
+}
+TEXTS = {
+    "mlops": ["Monitoring model drift in production.", "Feature stores for ML."],
+    "acme": ["Acme builds rockets with Python.", "Acme hires backend engineers."],
+    "globex": ["Globex sells databases.", "Globex runs on Kubernetes."],
+}
+
+
+def load_documents(urls: list[str]) -> list[Document]:
+    return [Document(page_content=text) for url in urls for text in TEXTS[url]]
+
+
+def make_manager(tmp_path: Path, **kwargs) -> VectorStoreManager:
+    return VectorStoreManager(
+        CORPORA,
+        embedding_factory=lambda: get_embedding("local"),
+        persist_root=tmp_path / "store",
+        **kwargs,
+    )
+
+
+def test_corpora_are_loaded_lazily_and_shared(tmp_path: Path) -> None:
+    """Each corpus is built on its first query and reused afterwards."""
+    manager = make_manager(tmp_path)
+    with patch("app.vector_store.load_and_split_documents", side_effect=load_documents):
+        assert manager.resident() == []
+        acme = manager.get("acme")
+        assert manager.get("acme") is acme
+        assert manager.resident() == ["acme"]
+        assert manager.loads == 1
+
+    result = acme.similarity_search("rockets", k=1)[0]
+    assert result.page_content == TEXTS["acme"][0]
+    assert Path(manager.persist_path("acme")).exists()
+    assert manager.persist_path(DEFAULT_CORPUS) == str(tmp_path / "store")
+
+
+def test_least_recently_used_corpus_is_unloaded(tmp_path: Path) -> None:
+    """Past the memory budget, stores are unloaded and reopened from disk."""
+    with patch("app.vector_store.load_and_split_documents", side_effect=load_documents):
+        manager = make_manager(tmp_path)
+        manager.get(DEFAULT_CORPUS)
+        manager.get("acme")
+        manager.get(DEFAULT_CORPUS)
+        manager.max_bytes = manager.resident_bytes
+        manager.get("globex")
+
+    assert manager.resident() == [DEFAULT_CORPUS, "globex"]
+    # Reopened from its persisted file, without loading documents
+    acme = manager.get("acme")
+    assert (
+        acme.similarity_search("backend engineers", k=1)[0].page_content
+        == (TEXTS["acme"][1])
+    )
+    assert manager.resident() == ["globex", "acme"]
+    assert manager.loads == 4
+
+
+def test_most_recent_corpus_is_kept_above_budget(tmp_path: Path) -> None:
+    """A store larger than the budget is still served."""
+    manager = make_manager(tmp_path, max_bytes=0)
+    with patch("app.vector_store.load_and_split_documents", side_effect=load_documents):
+        manager.get("acme")
+        manager.get("globex")
+    assert manager.resident() == ["globex"]
+
+
+def test_concurrent_first_queries_share_one_load(tmp_path: Path) -> None:
+    """Sessions asking for the same corpus at once do not load it twice."""
+    manager = make_manager(tmp_path)
+    results = []
+    with patch("app.vector_store.load_and_split_documents", side_effect=load_documents):
+        threads = [
+            threading.Thread(target=lambda: results.append(manager.get("acme")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert manager.loads == 1
+    assert all(store is results[0] for store in results)
+
+
+def test_store_size_is_recorded_when_built(tmp_path: Path) -> None:
+    """Sizes come from the chunks and dimension, not the store's internals."""
+    manager = make_manager(tmp_path)
+    with patch("app.vector_store.load_and_split_documents", side_effect=load_documents):
+        manager.get("acme")
+
+    persist_path = manager.persist_path("acme")
+    dimension = get_embedding("local").dimension
+    texts = TEXTS["acme"]
+    expected = len(texts) * dimension * BYTES_PER_VALUE + sum(map(len, texts))
+    assert resident_bytes(persist_path) == expected
+    assert manager.resident_bytes == expected
+
+    # Stores persisted before sizes were recorded are sized by their file
+    Path(f"{persist_path}.size.json").unlink()
+    assert resident_bytes(persist_path) == Path(persist_path).stat().st_size
+
+
+def test_load_corpora(tmp_path: Path) -> None:
+    """Configured corpora are added to the default one."""
+    path = tmp_path / "corpora.json"
+    path.write_text('{"acme": ["https://acme.example/docs"]}')
+
+    corpora = load_corpora(["https://default.example"], str(path))
+
+    assert corpora == {
+        DEFAULT_CORPUS: ["https://default.example"],
+        "acme": ["https://acme.example/docs"],
+    }
+    assert "acme" in VectorStoreManager(corpora, get_embedding)
+    assert "initech" not in VectorStoreManager(corpora, get_embedding)
@@ -0,0 +1,55 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import io
+
+import numpy as np
+import pytest
+
+from app.video_filter import FrameFilter
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _jpeg(shift: int = 0) -> str:
+    """Encode a gradient image; ``shift`` moves a dark square across it."""
+    pixels = np.tile(np.linspace(0, 255, 160, dtype=np.uint8), (120, 1))
+    pixels[40:80, 20 + shift : 60 + shift] = 0
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def test_near_duplicates_are_dropped() -> None:
+    """Identical frames are dropped until a refresh is due."""
+    frame_filter = FrameFilter(frames_per_minute=600, refresh_seconds=10)
+    frame = _jpeg()
+
+    assert frame_filter.should_forward(frame, now=0.0)
+    assert not frame_filter.should_forward(frame, now=1.0)
+    assert not frame_filter.should_forward(frame, now=2.0)
+    # Refresh frame, even if nothing changed
+    assert frame_filter.should_forward(frame, now=10.0)
+    assert frame_filter.stats()["video_frames_dropped"] == 2
+
+
+def test_changed_frames_are_forwarded_within_budget() -> None:
+    """Frames that change are forwarded until the per-session budget runs out."""
+    frame_filter = FrameFilter(frames_per_minute=12, refresh_seconds=60)
+
+    assert frame_filter.should_forward(_jpeg(0), now=0.0)
+    # Budget exhausted: one frame every 5 seconds
+    assert not frame_filter.should_forward(_jpeg(80), now=1.0)
+    assert frame_filter.should_forward(_jpeg(80), now=6.0)